@@ -0,0 +1,54 @@
+"""
+基准测试辅助：直接以 ASGI 协议驱动 app，不经过网络栈与额外依赖
+"""
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+async def asgi_request(app, method: str, path: str, query: str = "",
+                       headers: Optional[List[Tuple[str, str]]] = None,
+                       body: bytes = b"") -> Tuple[int, Dict[str, str], bytes]:
+    """发送一次请求，返回 (状态码, 响应头, 响应体)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or [])],
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 5000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status = 0
+    response_headers: Dict[str, str] = {}
+    chunks = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for k, v in message.get("headers", []):
+                response_headers[k.decode().lower()] = v.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
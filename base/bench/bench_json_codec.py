@@ -0,0 +1,92 @@
+"""
+JSON 编解码基准测试
+
+在接近实际的数据上对比已安装的实现（orjson / msgspec / 标准库 json）：
+- page:     jsonserv 列表页（1000 条文章，含中文、嵌套对象、列表）的紧凑编码与解码
+- snapshot: 存储快照（默认 10 万条）的缩进编码（整体 / 分块）与解码
+- record:   单条 WAL 记录的编码与解码
+- response: 列表页渲染为 HTTP 响应体（starlette JSONResponse 与 FastJSONResponse）
+
+用法（在 base/ 目录下）:
+    python bench/bench_json_codec.py [快照条目数]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from starlette.responses import JSONResponse
+
+from module import jsoncodec
+from module.jsoncodec import FastJSONResponse
+
+
+def make_post(i: int) -> dict:
+    return {
+        "id": i,
+        "title": f"第 {i} 篇文章：FastAPI 与 JSON 序列化",
+        "slug": f"post-{i}",
+        "published": i % 3 != 0,
+        "views": random.randint(0, 100000),
+        "score": round(random.random() * 5, 3),
+        "tags": random.sample(["python", "fastapi", "json", "性能", "缓存", "索引"], 3),
+        "author": {"id": i % 50, "name": f"作者{i % 50}", "email": f"user{i % 50}@example.com"},
+        "created_at": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T08:00:00Z",
+        "body": "这是一段正文，用于模拟真实的文章内容。" * 4,
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main_bench():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(42)
+    page = [make_post(i) for i in range(1, 1001)]
+    snapshot = {"data": [make_post(i) for i in range(1, rows + 1)], "primary_key": "id"}
+    record = {"op": "update", "key": 42, "item": make_post(42), "partial": True}
+
+    jsoncodec.configure("json")
+    page_bytes = jsoncodec.dumps(page)
+    snapshot_bytes = jsoncodec.dumps_pretty(snapshot)
+    record_bytes = jsoncodec.dumps(record)
+    print(f"列表页 {len(page_bytes) / 1024:.0f} KB，快照 {rows} 条 {len(snapshot_bytes) / 1024 / 1024:.1f} MB")
+
+    cases = [
+        ("page 编码", lambda: jsoncodec.dumps(page), 20),
+        ("page 解码", lambda: jsoncodec.loads(page_bytes), 20),
+        ("snapshot 缩进编码", lambda: jsoncodec.dumps_pretty(snapshot), 2),
+        ("snapshot 分块编码", lambda: b"".join(jsoncodec.iter_pretty_object(snapshot)), 2),
+        ("snapshot 解码", lambda: jsoncodec.loads(snapshot_bytes), 2),
+        ("record 编码 (µs)", lambda: jsoncodec.dumps(record), 10000),
+        ("record 解码 (µs)", lambda: jsoncodec.loads(record_bytes), 10000),
+        ("response JSONResponse", lambda: JSONResponse(page), 20),
+        ("response FastJSONResponse", lambda: FastJSONResponse(page), 20),
+    ]
+    backends = jsoncodec.available()
+    if "msgspec" not in backends:
+        print("（未安装 msgspec）")
+    print(f"{'':28s}" + "".join(f"{name:>12s}" for name in backends))
+    results = {}
+    for name in backends:
+        jsoncodec.configure(name)
+        assert jsoncodec.loads(jsoncodec.dumps(page)) == page
+        assert b"".join(jsoncodec.iter_pretty_object(snapshot)) == jsoncodec.dumps_pretty(snapshot)
+        for label, fn, repeat in cases:
+            elapsed = timed(fn, repeat)
+            results[label, name] = elapsed * 1000 if "µs" in label else elapsed
+    for label, _, _ in cases:
+        unit = "" if "µs" in label else " ms"
+        print(f"{label:28s}" + "".join(f"{results[label, name]:12.2f}" for name in backends) + unit)
+    jsoncodec.configure("auto")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,95 @@
+"""
+jsonserv 路由匹配基准测试
+
+N 个资源时请求最后注册的资源（最坏情况），对比：
+- routes:   每个资源注册 8 条路由（此前的方式，Starlette 按顺序逐条匹配）
+- dispatch: 单个 /api/jsonserv/{resource:path} 分发路由 + 资源表查找
+
+用法（在 base/ 目录下）:
+    python bench/bench_jsonserv_dispatch.py [每轮请求数]
+"""
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from asgi_client import asgi_request
+
+from fastapi import FastAPI, Request
+
+from service.jsonserv.core import JSONDataStore
+from service.jsonserv.router import ResourceRegistry, register_routes
+
+
+def routes_app(stores) -> FastAPI:
+    """每个资源注册与此前相同的 8 条路由（处理函数从存储读取）"""
+    app = FastAPI()
+    for name, store in stores.items():
+        def bind(store=store, name=name):
+            prefix = f"/api/jsonserv/{name}"
+
+            async def get_list(request: Request):
+                return (await store.aquery_page())[1]
+
+            async def item(item_id: str):
+                return await store.aget_item(item_id)
+
+            async def field(item_id: str, field: str):
+                return {field: await store.aget_field(item_id, field)}
+
+            app.get(prefix)(get_list)
+            app.post(prefix)(get_list)
+            app.post(prefix + "/_bulk")(get_list)
+            app.get(prefix + "/{item_id}")(item)
+            app.put(prefix + "/{item_id}")(item)
+            app.patch(prefix + "/{item_id}")(item)
+            app.delete(prefix + "/{item_id}")(item)
+            app.get(prefix + "/{item_id}/{field}")(field)
+        bind()
+    return app
+
+
+def dispatch_app(stores) -> FastAPI:
+    app = FastAPI()
+    registry = ResourceRegistry()
+    for name, store in stores.items():
+        registry.add_store(name, store)
+    register_routes(app, registry)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    """顺序请求，返回每秒请求数"""
+    for _ in range(50):
+        await asgi_request(app, "GET", path)
+    started = time.perf_counter()
+    for _ in range(requests):
+        status, _, _ = await asgi_request(app, "GET", path)
+        assert status == 200
+    return requests / (time.perf_counter() - started)
+
+
+def main_bench():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    logging.getLogger("baseplatform").setLevel(logging.WARNING)
+
+    print(f"GET /api/jsonserv/r{{N-1}}/1 x {requests}")
+    print(f"{'资源数':>8s}{'routes':>14s}{'dispatch':>14s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (1, 10, 100, 500):
+            stores = {}
+            for i in range(count):
+                json_file = Path(tmp) / f"r{count}_{i}.json"
+                json_file.write_text(json.dumps([{"id": "1", "title": "hello"}]), encoding="utf-8")
+                stores[f"r{i}"] = JSONDataStore(json_file, "id", batch_writes=False)
+            path = f"/api/jsonserv/r{count - 1}/1"
+            legacy = asyncio.run(measure(routes_app(stores), path, requests))
+            single = asyncio.run(measure(dispatch_app(stores), path, requests))
+            print(f"{count:8d}{legacy:11.0f}/s{single:11.0f}/s")
+
+
+if __name__ == "__main__":
+    main_bench()
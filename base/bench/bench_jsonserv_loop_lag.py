@@ -0,0 +1,117 @@
+"""
+jsonserv 事件循环延迟测试
+
+在约 50 MB 的资源上发起一次写入（触发完整快照的序列化与落盘），同时：
+- 每 1ms 唤醒一次的计时协程记录事件循环的最大延迟
+- 并发的 GET /api/jsonserv/big/1 记录响应延迟
+
+对比：
+- blocking: 在 async 处理函数中直接调用同步存储接口（此前的做法，落盘期间事件循环被阻塞）
+- async:    异步存储接口（解析、序列化、文件锁与 IO 在线程池中进行）
+
+用法（在 base/ 目录下）:
+    python bench/bench_jsonserv_loop_lag.py [条目数]
+"""
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from asgi_client import asgi_request
+
+from fastapi import FastAPI
+
+from service.jsonserv.core import JSONDataStore
+from service.jsonserv.router import ResourceRegistry, register_routes
+
+
+def blocking_app(store: JSONDataStore) -> FastAPI:
+    """对照组：处理函数直接调用同步接口"""
+    app = FastAPI()
+
+    @app.get("/api/jsonserv/big/{item_id}")
+    async def get_item(item_id: str):
+        return store.get_item(item_id)
+
+    @app.post("/api/jsonserv/big")
+    async def create_item(item: Dict[str, Any]):
+        return store.add_item(item)
+
+    return app
+
+
+async def measure(app: FastAPI) -> Dict[str, float]:
+    stop = asyncio.Event()
+    lag = 0.0
+    latencies = []
+
+    async def ticker():
+        nonlocal lag
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - started - 0.001)
+
+    async def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            status, _, _ = await asgi_request(app, "GET", "/api/jsonserv/big/1")
+            assert status == 200
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.005)
+
+    tasks = [asyncio.create_task(ticker()), asyncio.create_task(reader())]
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    status, _, _ = await asgi_request(app, "POST", "/api/jsonserv/big",
+                                      headers=[("content-type", "application/json")], body=b'{"title": "x"}')
+    assert status == 200
+    write = time.perf_counter() - started
+    await asyncio.sleep(0.1)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {
+        "write": write * 1000,
+        "lag": lag * 1000,
+        "reads": len(latencies),
+        "read_max": max(latencies) * 1000,
+    }
+
+
+def main_bench():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    logging.getLogger("baseplatform").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "big.json"
+        json_file.write_text(json.dumps({
+            "data": [{"id": str(i), "title": f"item {i}", "body": "x" * 200} for i in range(1, rows + 1)],
+            "primary_key": "id",
+        }), encoding="utf-8")
+        size = json_file.stat().st_size / 1024 / 1024
+
+        # 同步落盘，写入耗时完全落在请求内
+        store = JSONDataStore(json_file, "id", batch_writes=False)
+        store.load()
+        baseline = asyncio.run(measure(blocking_app(store)))
+
+        store = JSONDataStore(json_file, "id", batch_writes=False)
+        store.load()
+        app = FastAPI()
+        registry = ResourceRegistry()
+        registry.add_store("big", store)
+        register_routes(app, registry)
+        result = asyncio.run(measure(app))
+
+        print(f"{rows} 条（{size:.0f} MB），写入期间：")
+        print(f"{'':10s} {'写入 ms':>10s} {'循环最大延迟 ms':>16s} {'并发读次数':>10s} {'读最大延迟 ms':>14s}")
+        for label, r in (("blocking", baseline), ("async", result)):
+            print(f"{label:10s} {r['write']:10.0f} {r['lag']:16.1f} {r['reads']:10d} {r['read_max']:14.1f}")
+
+
+if __name__ == "__main__":
+    main_bench()
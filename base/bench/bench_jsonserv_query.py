@@ -0,0 +1,100 @@
+"""
+jsonserv 查询基准测试
+
+在合成集合（默认 100 万条）上对比：
+- scan:  逐条校验条件 + 每次请求 sorted()（索引之前的做法）
+- index: JSONDataStore.query（等值/有序索引 + 选择性规划，_sort 复用有序索引）
+
+用法（在 base/ 目录下）:
+    python bench/bench_jsonserv_query.py [条目数] [每个查询的重复次数]
+"""
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from service.jsonserv.core import JSONDataStore
+from service.jsonserv.index import item_sort_key
+from service.jsonserv.query import matches, parse_conditions
+
+
+QUERIES = [
+    ("views_gte=500&views_lte=510", {"views_gte": "500", "views_lte": "510"}, {}),
+    ("role=dev&views_gte=990", {"role": "dev", "views_gte": "990"}, {}),
+    ("role=dev&tags=t3&score_lte=0.01", {"role": "dev", "tags": "t3", "score_lte": "0.01"}, {}),
+    ("_sort=views&_limit=20", {}, {"sort": "views", "page": 1, "limit": 20}),
+    ("_sort=views&_order=desc&_page=1000&_limit=20", {}, {"sort": "views", "order": "desc", "page": 1000, "limit": 20}),
+    ("role=pm&_sort=score&_limit=20", {"role": "pm"}, {"sort": "score", "page": 1, "limit": 20}),
+]
+
+
+def scan_query(items, filters, sort=None, order="asc", page=None, limit=None):
+    """对照组：逐条过滤并排序"""
+    conditions = parse_conditions(filters)
+    result = [item for item in items if all(matches(item, c) for c in conditions)]
+    if sort:
+        result = sorted(result, key=lambda item: item_sort_key(item, sort), reverse=(order == "desc"))
+    if page is not None and limit is not None:
+        result = result[(page - 1) * limit:page * limit]
+    return result
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main_bench():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    logging.getLogger("baseplatform").setLevel(logging.WARNING)
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "items.json"
+        json_file.write_text(json.dumps({
+            "data": [
+                {
+                    "id": i,
+                    "role": random.choice(["dev", "ops", "pm", "qa"]),
+                    "views": random.randint(0, 999),
+                    "score": random.random(),
+                    "tags": random.sample(["t1", "t2", "t3", "t4", "t5", "t6"], 2),
+                }
+                for i in range(1, rows + 1)
+            ],
+            "primary_key": "id",
+        }), encoding="utf-8")
+
+        started = time.perf_counter()
+        store = JSONDataStore(json_file, "id", batch_writes=False)
+        items = store.get_items()
+        store.query(filters={"id": "1"})
+        print(f"{rows} 条，加载 {time.perf_counter() - started:.2f}s")
+
+        print(f"{'查询':48s} {'scan ms':>10s} {'首次 ms':>10s} {'index ms':>10s} {'提升':>8s}")
+        for label, filters, options in QUERIES:
+            expected = scan_query(items, filters, **options)
+            scan = timed(lambda: scan_query(items, filters, **options), max(1, repeat // 5))
+            # 首次查询包含索引构建
+            first = timed(lambda: store.query(filters=filters, **options), 1)
+            result = store.query(filters=filters, **options)
+            if not options.get("sort"):
+                assert result == expected, label
+            else:
+                sort = options["sort"]
+                assert [item_sort_key(i, sort) for i in result] == [item_sort_key(i, sort) for i in expected], label
+            indexed = timed(lambda: store.query(filters=filters, **options), repeat)
+            print(f"{label:48s} {scan:10.1f} {first:10.1f} {indexed:10.2f} {scan / indexed:7.0f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,94 @@
+"""
+jsonserv 大文件启动基准测试
+
+对比：
+- full: 启动时 json.load 整个文件确定主键，首次访问再完整解析（此前的做法）
+- mmap: 只读取文件头尾确定主键；首次访问时 mmap 扫描记录偏移（首次按主键读取时再建立主键索引，均在线程池中进行），条目按需解码
+
+每个模式在独立子进程中运行，报告耗时与匿名内存（RssAnon，不含可回收的文件映射页）
+
+用法（在 base/ 目录下）:
+    python bench/bench_jsonserv_startup.py [条目数]
+"""
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from service.jsonserv.core import JSONDataStore
+from service.jsonserv.mapped import read_header
+
+
+def rss_anon_mb() -> float:
+    """当前进程的匿名内存（Linux）"""
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("RssAnon:"):
+            return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_mode(json_file: Path, mode: str):
+    logging.getLogger("baseplatform").setLevel(logging.WARNING)
+    baseline = rss_anon_mb()
+    started = time.perf_counter()
+    if mode == "full":
+        with open(json_file, "r", encoding="utf-8") as f:
+            primary_key = json.load(f).get("primary_key", "id")
+    else:
+        primary_key = read_header(json_file).primary_key or "id"
+    store = JSONDataStore(json_file, primary_key, batch_writes=False, mmap_mode=(mode == "mmap"))
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _, items = store.query_page(page=1, limit=20)
+    assert len(list(items)) == 20
+    first_page = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assert store.get_item(12345) is not None
+    first_get = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in range(1000, 2000):
+        store.get_item(key)
+    get = (time.perf_counter() - started) / 1000
+
+    print(json.dumps({
+        "startup": startup * 1000, "first_page": first_page * 1000, "first_get": first_get * 1000,
+        "get": get * 1e6, "rss": rss_anon_mb() - baseline,
+    }))
+
+
+def main_bench():
+    if len(sys.argv) > 2 and sys.argv[1] in ("full", "mmap"):
+        run_mode(Path(sys.argv[2]), sys.argv[1])
+        return
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "big.json"
+        with open(json_file, "w", encoding="utf-8") as f:
+            f.write('{"data": [')
+            for i in range(1, rows + 1):
+                f.write(("," if i > 1 else "") + json.dumps({"id": i, "title": f"item {i}", "body": "x" * 80}))
+            f.write('], "primary_key": "id"}')
+        size = json_file.stat().st_size / 1024 / 1024
+
+        print(f"{rows} 条（{size:.0f} MB）")
+        print(f"{'':6s} {'启动 ms':>10s} {'首页 ms':>10s} {'首次 get ms':>12s} {'get µs':>8s} {'匿名内存 MB':>12s}")
+        for mode in ("full", "mmap"):
+            output = subprocess.run([sys.executable, __file__, mode, str(json_file)],
+                                    capture_output=True, text=True, check=True).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:6s} {r['startup']:10.1f} {r['first_page']:10.1f} {r['first_get']:12.1f} "
+                  f"{r['get']:8.1f} {r['rss']:12.1f}")
+
+
+if __name__ == "__main__":
+    main_bench()
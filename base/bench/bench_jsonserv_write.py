@@ -0,0 +1,68 @@
+"""
+jsonserv 写入基准测试
+
+在临时目录的资源上并发 POST，对比：
+- sync:  每次变更同步写入完整快照
+- batch: 批量写入线程（落盘期间到达的变更合并为一次原子写入，请求等待落盘后返回）
+
+用法（在 base/ 目录下）:
+    python bench/bench_jsonserv_write.py [每轮请求数] [初始条目数]
+"""
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from asgi_client import asgi_request
+
+from fastapi import FastAPI
+
+from service.jsonserv.core import JSONDataStore
+from service.jsonserv.router import ResourceRegistry, register_routes
+
+
+async def run(requests: int, concurrency: int, rows: int, batch: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "posts.json"
+        json_file.write_text(json.dumps({
+            "data": [{"id": i, "title": f"post {i}"} for i in range(1, rows + 1)],
+            "primary_key": "id",
+        }), encoding="utf-8")
+        store = JSONDataStore(json_file, "id", batch_writes=batch)
+        app = FastAPI()
+        registry = ResourceRegistry()
+        registry.add_store("posts", store)
+        register_routes(app, registry)
+        body = json.dumps({"title": "bench"}).encode()
+        headers = [("content-type", "application/json")]
+
+        async def worker(count: int):
+            for _ in range(count):
+                status, _, _ = await asgi_request(app, "POST", "/api/jsonserv/posts", headers=headers, body=body)
+                assert status == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        store.close()
+        assert len(json.loads(json_file.read_text(encoding="utf-8"))["data"]) == rows + requests // concurrency * concurrency
+        return requests // concurrency * concurrency / elapsed
+
+
+def main_bench():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    logging.getLogger("baseplatform").setLevel(logging.WARNING)
+
+    print(f"POST /api/jsonserv/posts x {requests}（初始 {rows} 条）")
+    for concurrency in (1, 16, 64):
+        sync = asyncio.run(run(requests, concurrency, rows, batch=False))
+        batch = asyncio.run(run(requests, concurrency, rows, batch=True))
+        print(f"  并发 {concurrency:3d}: sync {sync:8.1f} req/s   batch {batch:8.1f} req/s   ({batch / sync:.1f}x)")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,56 @@
+"""
+路径安全检查微基准
+
+对比每次请求调用 Path.resolve()（目标与根目录各一次）与 PathGuard
+（根目录预解析 + 词法规范化 + 有界 realpath 缓存）的单次检查耗时
+
+用法（在 base/ 目录下）:
+    python bench/bench_path_guard.py [次数]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from core.path_guard import PathGuard
+
+WEB_DIR = BASE_DIR / "web"
+PATHS = [
+    "index.html",
+    "help/01.md",
+    "manager/user/index.html",
+    "app/index.html",
+    "login/oauth2.py",
+    "a/b/c/d/e/missing.html",
+]
+
+
+def resolve_check(path: str) -> bool:
+    """旧实现：每次解析目标路径与 web 目录"""
+    try:
+        (WEB_DIR / path).resolve().relative_to(WEB_DIR.resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    guard = PathGuard({"web": WEB_DIR})
+
+    for path in PATHS:
+        assert resolve_check(path) == (guard.resolve("web", path) is not None), path
+
+    before = timeit.timeit(lambda: [resolve_check(p) for p in PATHS], number=number)
+    after = timeit.timeit(lambda: [guard.resolve("web", p) for p in PATHS], number=number)
+    checks = number * len(PATHS)
+    print(f"路径安全检查 x {checks}")
+    print(f"  Path.resolve():  {before / checks * 1e6:8.2f} us/次")
+    print(f"  PathGuard:       {after / checks * 1e6:8.2f} us/次")
+    print(f"  提升: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
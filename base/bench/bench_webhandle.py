@@ -0,0 +1,50 @@
+"""
+webhandle 模块缓存基准测试
+
+对比 /api/example/hello 在以下两种情况下的每秒请求数：
+- before: 每次请求前清空模块缓存（等同于旧实现每次请求重新执行模块）
+- after:  启用模块缓存，模块只在文件变化后重新执行
+
+用法（在 base/ 目录下）:
+    python bench/bench_webhandle.py [请求数]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from asgi_client import asgi_request
+
+import main
+
+
+async def run(requests: int, clear_cache: bool) -> float:
+    app = main.app
+    webhandle = main.webhandle
+    # 预热一次，确认接口可用
+    status, _, body = await asgi_request(app, "GET", "/api/example/hello")
+    assert status == 200, body
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        if clear_cache:
+            webhandle.clear_module_cache()
+        await asgi_request(app, "GET", "/api/example/hello")
+    elapsed = time.perf_counter() - started
+    return requests / elapsed
+
+
+def main_bench():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    logging.getLogger("baseplatform").setLevel(logging.WARNING)
+
+    before = asyncio.run(run(requests, clear_cache=True))
+    after = asyncio.run(run(requests, clear_cache=False))
+    print(f"GET /api/example/hello x {requests}")
+    print(f"  before (每次重新执行模块): {before:10.1f} req/s")
+    print(f"  after  (模块缓存):         {after:10.1f} req/s")
+    print(f"  提升: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
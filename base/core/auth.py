@@ -0,0 +1,46 @@
+"""
+API 认证
+security.api_auth_enabled 为 true 时，/api/* 请求（web/ API 与 jsonserv）需携带系统级 Token：
+Header Authorization: Bearer <token> 或查询参数 token=
+"""
+from fastapi import HTTPException, Request
+
+
+def _is_system_token(config, token: str) -> bool:
+    """是否为 security.system_tokens 中的 Token"""
+    system_tokens = config.get("security.system_tokens", [])
+    for sys_token in system_tokens:
+        if sys_token.get("token") == token:
+            return True
+    return False
+
+
+def check_api_auth(request: Request, config):
+    """
+    校验 /api/* 请求的 Token，未通过时抛出 401
+
+    Args:
+        request: 当前请求
+        config: 配置对象；为 None 时不校验（如基准测试中未挂载配置的应用）
+    """
+    if config is None or not config.get("security.api_auth_enabled", True):
+        return
+
+    # Token 验证（从 request 中获取 authorization header）
+    auth_header = request.headers.get("authorization")
+    if auth_header and isinstance(auth_header, str) and auth_header.startswith("Bearer "):
+        if _is_system_token(config, auth_header[7:]):
+            return
+
+    # 也可以从查询参数获取 token
+    token = request.query_params.get("token")
+    if token and _is_system_token(config, token):
+        return
+
+    # TODO: 检查登录 Token（需要实现 Session 管理）
+    raise HTTPException(status_code=401, detail="需要认证")
+
+
+async def require_api_auth(request: Request):
+    """路由依赖：按 app.state.config 校验 Token（jsonserv 路由在 /api/{path:path} 之前注册，需单独校验）"""
+    check_api_auth(request, getattr(request.app.state, "config", None))
@@ -0,0 +1,79 @@
+"""
+目录默认文件解析
+按 config.yaml 的 default_files 顺序查找目录下的默认文件，结果按目录缓存；
+web/ 文件变更（FileWatcher 回调）和配置重新加载时清除缓存
+"""
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.route_index import RouteIndex, RouteMatch, KIND_DIR
+
+
+DEFAULT_FILES = ["index.html", "index.md", "index.py"]
+
+# 缓存中表示“目录下没有默认文件”
+_MISSING = object()
+
+
+class DefaultFileResolver:
+    """目录 -> 默认文件 解析器"""
+
+    def __init__(self, config, route_index: RouteIndex):
+        self.config = config
+        self.route_index = route_index
+        self._cache: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._default_files: Optional[List[str]] = None
+
+    @property
+    def default_files(self) -> List[str]:
+        if self._default_files is None:
+            self._default_files = list(self.config.get("default_files", DEFAULT_FILES))
+        return self._default_files
+
+    def resolve(self, directory: str) -> Optional[Tuple[str, RouteMatch]]:
+        """
+        查找目录的默认文件
+
+        Args:
+            directory: 相对 web/ 的目录路径（根目录为空字符串）
+
+        Returns:
+            (默认文件的 web 路径, 路由匹配结果)，没有默认文件返回 None
+        """
+        directory = directory.strip('/')
+        cached = self._cache.get(directory)
+        if cached is not None:
+            return None if cached is _MISSING else cached
+
+        result = None
+        for default_file in self.default_files:
+            web_path = f"{directory}/{default_file}" if directory else default_file
+            match = self.route_index.match(web_path)
+            if match is not None and match.kind != KIND_DIR:
+                result = (web_path, match)
+                break
+
+        with self._lock:
+            self._cache[directory] = _MISSING if result is None else result
+        return result
+
+    def invalidate(self, file_path: Path):
+        """FileWatcher 回调：清除变更文件所在目录及其子目录的缓存"""
+        try:
+            relative = Path(file_path).relative_to(self.route_index.web_dir).as_posix()
+        except ValueError:
+            return
+        parent = relative.rsplit('/', 1)[0] if '/' in relative else ''
+        prefix = relative + '/'
+        with self._lock:
+            self._cache.pop(parent, None)
+            for key in [k for k in self._cache if k == relative or k.startswith(prefix)]:
+                del self._cache[key]
+
+    def clear(self):
+        """清除全部缓存（配置重新加载时调用）"""
+        with self._lock:
+            self._cache.clear()
+            self._default_files = None
@@ -20,13 +20,17 @@ class FileWatcherHandler(FileSystemEventHandler):
         if not event.is_directory:
             self.watcher.on_file_changed(event.src_path)
     
+    # 目录的创建、删除和移动同样转发，目录内的文件可能不会单独产生事件
     def on_created(self, event):
-        if not event.is_directory:
-            self.watcher.on_file_created(event.src_path)
+        self.watcher.on_file_created(event.src_path)
     
     def on_deleted(self, event):
-        if not event.is_directory:
-            self.watcher.on_file_deleted(event.src_path)
+        self.watcher.on_file_deleted(event.src_path)
+    
+    def on_moved(self, event):
+        # 编辑器常以“写临时文件 + 重命名”方式保存，视为删除旧路径并创建新路径
+        self.watcher.on_file_deleted(event.src_path)
+        self.watcher.on_file_created(event.dest_path)
 
 
 class FileWatcher:
@@ -43,6 +47,8 @@ class FileWatcher:
             'plugin': [],
             'service': [],
             'config': [],
+            'web': [],
+            'etc': [],
         }
     
     def add_callback(self, category: str, callback: Callable):
@@ -77,6 +83,13 @@ class FileWatcher:
                 self.watched_dirs.append(service_dir)
                 self.logger.info(f"监控目录: {service_dir}")
             
+            # 监控 web 目录（web/*.py 模块缓存失效、路由索引更新）
+            web_dir = self.base_dir / "web"
+            if web_dir.exists():
+                self.observer.schedule(handler, str(web_dir), recursive=True)
+                self.watched_dirs.append(web_dir)
+                self.logger.info(f"监控目录: {web_dir}")
+            
             # 监控 etc 目录（配置文件）
             etc_dir = self.base_dir / "etc"
             if etc_dir.exists():
@@ -100,7 +113,10 @@ class FileWatcher:
     def on_file_changed(self, file_path: str):
         """文件变更处理"""
         path = Path(file_path)
-        relative_path = path.relative_to(self.base_dir)
+        try:
+            relative_path = path.relative_to(self.base_dir)
+        except ValueError:
+            return
         
         # 判断文件类型并触发相应回调
         if relative_path.parts[0] == "module":
@@ -109,8 +125,12 @@ class FileWatcher:
             self._trigger_callbacks('plugin', path)
         elif relative_path.parts[0] == "service":
             self._trigger_callbacks('service', path)
-        elif relative_path.parts[0] == "etc" and path.name == "config.yaml":
-            self._trigger_callbacks('config', path)
+        elif relative_path.parts[0] == "web":
+            self._trigger_callbacks('web', path)
+        elif relative_path.parts[0] == "etc":
+            self._trigger_callbacks('etc', path)
+            if path.name == "config.yaml":
+                self._trigger_callbacks('config', path)
     
     def on_file_created(self, file_path: str):
         """文件创建处理"""
@@ -118,8 +138,8 @@ class FileWatcher:
     
     def on_file_deleted(self, file_path: str):
         """文件删除处理"""
-        # 可以在这里处理文件删除逻辑
-        pass
+        # 回调方通过文件是否存在区分删除与修改
+        self.on_file_changed(file_path)
     
     def _trigger_callbacks(self, category: str, file_path: Path):
         """触发回调函数"""
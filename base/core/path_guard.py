@@ -0,0 +1,107 @@
+"""
+路径安全检查
+根目录在启动时解析一次；请求路径先做词法规范化并拒绝越界（..、绝对路径、NUL），
+再通过有界缓存的 realpath 校验符号链接没有指向根目录之外
+"""
+import os
+import posixpath
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+
+class PathGuard:
+    """按根目录校验请求路径"""
+
+    def __init__(self, roots: Dict[str, Path], cache_size: int = 4096):
+        """
+        Args:
+            roots: 根目录名 -> 目录路径（如 {"web": web_dir, "etc": etc_dir}）
+            cache_size: realpath 缓存条目上限
+        """
+        self.roots = {name: Path(root) for name, root in roots.items()}
+        # 根目录真实路径只解析一次
+        self._real_roots = {name: os.path.realpath(root) for name, root in self.roots.items()}
+        self._cache_size = cache_size
+        self._realpath = lru_cache(maxsize=cache_size)(self._resolve_real)
+        # 经过符号链接解析（真实路径与词法路径不同）的缓存条目，删除/移走其路径或上级目录时需要失效
+        self._linked: Set[str] = set()
+
+    def _resolve_real(self, path: str) -> str:
+        real = os.path.realpath(path)
+        if real != os.path.abspath(path):
+            self._linked.add(os.path.abspath(path))
+        return real
+
+    @staticmethod
+    def normalize(path: str) -> Optional[str]:
+        """
+        词法规范化相对路径
+
+        Returns:
+            规范化后的相对路径（根目录为空字符串）；越界或非法时返回 None
+        """
+        if "\x00" in path:
+            return None
+        path = path.replace("\\", "/")
+        if path.startswith("/"):
+            path = path.lstrip("/")
+        if not path:
+            return ""
+        normalized = posixpath.normpath(path)
+        if normalized == ".":
+            return ""
+        if normalized == ".." or normalized.startswith("../") or normalized.startswith("/"):
+            return None
+        return normalized
+
+    def resolve(self, root: str, path: str) -> Optional[Path]:
+        """
+        校验并返回 root 下的文件路径
+
+        Args:
+            root: 根目录名
+            path: 相对根目录的请求路径
+
+        Returns:
+            安全的绝对路径（未解析符号链接）；越界返回 None
+        """
+        normalized = self.normalize(path)
+        if normalized is None:
+            return None
+        base = self.roots[root]
+        target = base / normalized if normalized else base
+        if not self.is_within(root, target):
+            return None
+        return target
+
+    def is_within(self, root: str, target: Path) -> bool:
+        """检查 target 的真实路径（解析符号链接后）是否位于根目录内"""
+        real_root = self._real_roots[root]
+        real = self._realpath(str(target))
+        return real == real_root or real.startswith(real_root + os.sep)
+
+    def clear(self, *args):
+        """清除 realpath 缓存"""
+        self._realpath.cache_clear()
+        self._linked = set()
+
+    def on_file_event(self, file_path: Path):
+        """
+        FileWatcher 回调：只在可能改变路径解析结果的变化时清除缓存
+        - 新建/修改的是符号链接或目录（目录移入时其中可能含符号链接）
+        - 删除/移走的路径是已缓存的符号链接解析路径或其上级目录
+        普通文件的写入、替换与删除（如 jsonserv 落盘的 .tmp / .lock / .wal）不影响缓存
+        """
+        path = Path(file_path)
+        if path.is_symlink() or path.is_dir():
+            self.clear()
+            return
+        if path.exists() or not self._linked:
+            return
+        removed = os.path.abspath(path)
+        prefix = removed + os.sep
+        if len(self._linked) > self._cache_size or any(
+            linked == removed or linked.startswith(prefix) for linked in self._linked
+        ):
+            self.clear()
@@ -0,0 +1,230 @@
+"""
+web/ 路由索引
+启动时扫描 web/ 目录构建前缀树，请求时通过一次树查找得到 (文件, sub_path, 类型)，
+不再逐级调用 exists()/is_dir()；文件变化由 FileWatcher 回调增量更新
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional
+
+
+# 文件类型
+KIND_PY = "py"
+KIND_MD = "md"
+KIND_HTML = "html"
+KIND_STATIC = "static"
+KIND_DIR = "dir"
+
+_SUFFIX_KINDS = {
+    ".py": KIND_PY,
+    ".md": KIND_MD,
+    ".markdown": KIND_MD,
+    ".html": KIND_HTML,
+}
+
+
+class RouteMatch(NamedTuple):
+    """路由匹配结果"""
+    file: Path
+    sub_path: str
+    kind: str
+
+
+class _Node:
+    """前缀树节点，对应 web/ 下的一级路径"""
+
+    __slots__ = ("children", "file", "kind", "module")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # 节点本身是文件或目录时记录路径与类型
+        self.file: Optional[Path] = None
+        self.kind: Optional[str] = None
+        # 存在同名 .py 文件（{prefix}.py）时记录其路径，供 /api/{prefix}/... 匹配
+        self.module: Optional[Path] = None
+
+
+def _split(path: str):
+    """拆分请求路径，忽略空段和 '.'"""
+    return [part for part in path.replace("\\", "/").split("/") if part and part != "."]
+
+
+class RouteIndex:
+    """web/ 目录前缀树索引"""
+
+    def __init__(self, web_dir: Path):
+        self.web_dir = web_dir
+        self.logger = logging.getLogger("baseplatform.route_index")
+        self._lock = threading.RLock()
+        self._root = _Node()
+        self.build()
+
+    def build(self):
+        """全量扫描 web/ 目录重建索引"""
+        root = _Node()
+        root.file = self.web_dir
+        root.kind = KIND_DIR
+        count = 0
+        if self.web_dir.is_dir():
+            for dirpath, dirnames, filenames in os.walk(self.web_dir):
+                dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+                directory = Path(dirpath)
+                for name in dirnames:
+                    self._insert(root, directory / name, KIND_DIR)
+                for name in filenames:
+                    self._insert(root, directory / name, self._kind_of(name))
+                    count += 1
+        with self._lock:
+            self._root = root
+        self.logger.info(f"web 路由索引已构建: {count} 个文件")
+
+    @staticmethod
+    def _kind_of(name: str) -> str:
+        return _SUFFIX_KINDS.get(os.path.splitext(name)[1].lower(), KIND_STATIC)
+
+    def _parts(self, file_path: Path):
+        try:
+            return Path(file_path).relative_to(self.web_dir).parts
+        except ValueError:
+            return None
+
+    def _insert(self, root: _Node, file_path: Path, kind: str):
+        parts = self._parts(file_path)
+        if not parts:
+            return
+        node = root
+        for i, part in enumerate(parts[:-1]):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Node()
+            if child.kind is None:
+                child.file = self.web_dir.joinpath(*parts[:i + 1])
+                child.kind = KIND_DIR
+            node = child
+
+        name = parts[-1]
+        child = node.children.get(name)
+        if child is None:
+            child = node.children[name] = _Node()
+        child.file = file_path
+        child.kind = kind
+
+        # {prefix}.py 同时登记到 {prefix} 节点
+        if kind == KIND_PY and name.endswith(".py"):
+            stem = name[:-3]
+            module_node = node.children.get(stem)
+            if module_node is None:
+                module_node = node.children[stem] = _Node()
+            module_node.module = file_path
+
+    def add(self, file_path: Path):
+        """登记文件或目录（目录会递归扫描）"""
+        file_path = Path(file_path)
+        with self._lock:
+            if file_path.is_dir():
+                self._insert(self._root, file_path, KIND_DIR)
+                for dirpath, dirnames, filenames in os.walk(file_path):
+                    dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+                    directory = Path(dirpath)
+                    for name in dirnames:
+                        self._insert(self._root, directory / name, KIND_DIR)
+                    for name in filenames:
+                        self._insert(self._root, directory / name, self._kind_of(name))
+            elif file_path.is_file():
+                self._insert(self._root, file_path, self._kind_of(file_path.name))
+
+    def remove(self, file_path: Path):
+        """移除文件或目录（含其下全部条目）"""
+        parts = self._parts(file_path)
+        if not parts:
+            return
+        with self._lock:
+            trail = [self._root]
+            for part in parts[:-1]:
+                node = trail[-1].children.get(part)
+                if node is None:
+                    return
+                trail.append(node)
+            parent = trail[-1]
+            name = parts[-1]
+            node = parent.children.get(name)
+            if node is None or node.kind is None:
+                return
+
+            node.file = None
+            node.kind = None
+            node.children.clear()
+            if name.endswith(".py"):
+                module_node = parent.children.get(name[:-3])
+                if module_node is not None:
+                    module_node.module = None
+                    self._prune(parent, name[:-3])
+            self._prune(parent, name)
+
+    @staticmethod
+    def _prune(parent: _Node, name: str):
+        node = parent.children.get(name)
+        if node is not None and node.kind is None and node.module is None and not node.children:
+            del parent.children[name]
+
+    def on_file_event(self, file_path: Path):
+        """FileWatcher 回调：按文件当前状态增量更新索引"""
+        file_path = Path(file_path)
+        if "__pycache__" in file_path.parts:
+            return
+        if file_path.exists():
+            self.add(file_path)
+        else:
+            self.remove(file_path)
+
+    def iter_files(self, kind: Optional[str] = None) -> Iterator[Path]:
+        """遍历索引中的文件，可按类型过滤"""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for child in list(node.children.values()):
+                if child.kind is not None and child.kind != KIND_DIR and (kind is None or child.kind == kind):
+                    yield child.file
+                stack.append(child)
+
+    def _find(self, parts) -> Optional[_Node]:
+        node = self._root
+        for part in parts:
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def match(self, path: str) -> Optional[RouteMatch]:
+        """
+        精确匹配 web 路径
+
+        Returns:
+            RouteMatch(file, '', kind)，kind 为 py/md/html/static/dir；不存在返回 None
+        """
+        node = self._find(_split(path))
+        if node is None or node.kind is None:
+            return None
+        return RouteMatch(node.file, "", node.kind)
+
+    def match_module(self, path: str) -> Optional[RouteMatch]:
+        """
+        匹配 /api/{path} 对应的 Python 文件
+        优先精确匹配 {path}.py，否则取最长的父路径 {prefix}.py，剩余部分作为 sub_path
+        """
+        parts = _split(path)
+        node = self._root
+        found: Optional[Path] = None
+        depth = 0
+        for i, part in enumerate(parts):
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.module is not None:
+                found = node.module
+                depth = i + 1
+        if found is None:
+            return None
+        return RouteMatch(found, "/".join(parts[depth:]), KIND_PY)
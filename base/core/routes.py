@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 from typing import Optional
 from fastapi import FastAPI, Request, HTTPException, Depends, Header
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import aiofiles
 import json
@@ -13,7 +13,13 @@ import json
 from module.config import Config
 from module.webhandle import WebHandle
 from module.markdown import MarkdownRenderer
+from module.static import StaticServer
 from module.logger import setup_logger
+from module.jsoncodec import FastJSONResponse
+from core.route_index import KIND_DIR, KIND_PY, KIND_MD, KIND_HTML
+from core.default_files import DefaultFileResolver
+from core.path_guard import PathGuard
+from core.auth import check_api_auth
 
 
 security = HTTPBearer(auto_error=False)
@@ -68,65 +74,41 @@ def setup_routes(
     config: Config,
     webhandle: WebHandle,
     markdown_renderer: MarkdownRenderer,
-    logger
+    logger,
+    default_resolver: Optional[DefaultFileResolver] = None,
+    path_guard: Optional[PathGuard] = None
 ):
     """设置核心路由"""
     
     base_dir = Path(__file__).parent.parent
     web_dir = base_dir / "web"
+    route_index = webhandle.route_index
+    static_server = StaticServer(config)
+    if default_resolver is None:
+        default_resolver = DefaultFileResolver(config, route_index)
+    if path_guard is None:
+        path_guard = PathGuard({"web": web_dir, "etc": base_dir / "etc"})
+    
+    def _refresh_index(file_path: Path):
+        """文件经由 /raw、/tree 修改后立即更新路由索引与默认文件缓存"""
+        route_index.on_file_event(file_path)
+        default_resolver.invalidate(file_path)
+        path_guard.clear()
     
     # 根路径路由（必须在 /{path:path} 之前注册）
     @app.get("/")
     async def root_path_handler(request: Request):
-        """根路径处理器 - 优先匹配 /"""
-        logger.info("根路径处理器被调用")
-        # 从配置读取默认文件列表
-        default_files = config.get("default_files", ["index.html", "index.md", "index.py"])
-        logger.info(f"默认文件列表: {default_files}")
-        
-        # 依次查找默认文件
-        for default_file in default_files:
-            default_path = web_dir / default_file
-            logger.info(f"检查默认文件: {default_path}, 存在: {default_path.exists()}")
-            
-            if default_path.exists():
-                logger.info(f"找到默认文件: {default_file}, 类型: {default_path.suffix}")
-                
-                # 根据文件类型处理
-                if default_path.suffix == '.md':
-                    html = markdown_renderer.render_file(default_path)
-                    if html:
-                        logger.info(f"成功渲染 Markdown 文件: {default_file}")
-                        return HTMLResponse(content=html)
-                elif default_path.suffix == '.html':
-                    async with aiofiles.open(default_path, 'r', encoding='utf-8') as f:
-                        content = await f.read()
-                    logger.info(f"成功读取 HTML 文件: {default_file}")
-                    return HTMLResponse(content=content)
-                elif default_path.suffix == '.py':
-                    result = await webhandle.handle_request(request, str(default_path.relative_to(web_dir))[:-3])
-                    logger.info(f"成功执行 Python 文件: {default_file}")
-                    return result
-        
-        # 没有找到任何默认文件
-        logger.error("未找到任何默认文件")
-        raise HTTPException(status_code=404, detail="目录下没有默认文件")
+        """根路径处理器 - 按 default_files 返回首页"""
+        return await web_handler("", request)
     
     def _resolve_raw_path(path: str) -> Path:
         """解析 /raw/ 路径，返回安全的文件路径"""
         if path.startswith("etc/"):
-            file_path = base_dir / path
-            etc_dir = base_dir / "etc"
-            try:
-                file_path.resolve().relative_to(etc_dir.resolve())
-            except ValueError:
-                raise HTTPException(status_code=403, detail="访问被拒绝")
+            file_path = path_guard.resolve("etc", path[4:])
         else:
-            file_path = web_dir / path
-            try:
-                file_path.resolve().relative_to(web_dir.resolve())
-            except ValueError:
-                raise HTTPException(status_code=403, detail="访问被拒绝")
+            file_path = path_guard.resolve("web", path)
+        if file_path is None:
+            raise HTTPException(status_code=403, detail="访问被拒绝")
         return file_path
 
     @app.get("/raw/{path:path}")
@@ -171,12 +153,13 @@ def setup_routes(
             
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(content)
+            _refresh_index(file_path)
             
             if path == "etc/config.yaml":
                 config.reload()
                 logger.info("配置文件已更新并重新加载")
             
-            return JSONResponse(content={"success": True, "message": "文件保存成功"})
+            return FastJSONResponse(content={"success": True, "message": "文件保存成功"})
         except Exception as e:
             logger.error(f"写入文件失败: {str(e)}")
             raise HTTPException(status_code=500, detail=f"写入文件失败: {str(e)}")
@@ -194,12 +177,9 @@ def setup_routes(
         DELETE: 删除文件或目录
         """
         # TODO: 添加权限检查
-        target_path = web_dir / path
-        
         # 安全检查
-        try:
-            target_path.resolve().relative_to(web_dir.resolve())
-        except ValueError:
+        target_path = path_guard.resolve("web", path)
+        if target_path is None:
             raise HTTPException(status_code=403, detail="访问被拒绝")
         
         if request.method == "GET":
@@ -217,7 +197,7 @@ def setup_routes(
                         "modified": item.stat().st_mtime
                     })
             
-            return JSONResponse(content={"path": path, "items": items})
+            return FastJSONResponse(content={"path": path, "items": items})
         
         elif request.method == "POST":
             # 创建文件或目录
@@ -231,8 +211,9 @@ def setup_routes(
                 target_path.parent.mkdir(parents=True, exist_ok=True)
                 async with aiofiles.open(target_path, 'w', encoding='utf-8') as f:
                     await f.write(content)
+            _refresh_index(target_path)
             
-            return JSONResponse(content={"message": "创建成功", "path": path})
+            return FastJSONResponse(content={"message": "创建成功", "path": path})
         
         elif request.method == "PUT":
             # 重命名
@@ -243,7 +224,9 @@ def setup_routes(
             
             new_path = target_path.parent / new_name
             target_path.rename(new_path)
-            return JSONResponse(content={"message": "重命名成功"})
+            _refresh_index(target_path)
+            _refresh_index(new_path)
+            return FastJSONResponse(content={"message": "重命名成功"})
         
         elif request.method == "DELETE":
             # 删除
@@ -253,7 +236,8 @@ def setup_routes(
                     shutil.rmtree(target_path)
                 else:
                     target_path.unlink()
-                return JSONResponse(content={"message": "删除成功"})
+                _refresh_index(target_path)
+                return FastJSONResponse(content={"message": "删除成功"})
             else:
                 raise HTTPException(status_code=404, detail="路径不存在")
        
@@ -263,34 +247,8 @@ def setup_routes(
         API 执行接口
         查找 web/{path}.py 文件，存在则加载运行
         """
-        # 检查是否启用 API 认证
-        api_auth_enabled = config.get("security.api_auth_enabled", True)
-        
-        if api_auth_enabled:
-            # Token 验证（从 request 中获取 authorization header）
-            auth_header = request.headers.get("authorization")
-            is_authenticated = False
-            if auth_header and isinstance(auth_header, str) and auth_header.startswith("Bearer "):
-                token = auth_header[7:]
-                # 检查系统级 Token
-                system_tokens = config.get("security.system_tokens", [])
-                for sys_token in system_tokens:
-                    if sys_token.get("token") == token:
-                        is_authenticated = True
-                        break
-            
-            # 也可以从查询参数获取 token
-            if not is_authenticated:
-                token = request.query_params.get("token")
-                if token:
-                    system_tokens = config.get("security.system_tokens", [])
-                    for sys_token in system_tokens:
-                        if sys_token.get("token") == token:
-                            is_authenticated = True
-                            break
-            
-            if not is_authenticated:
-                raise HTTPException(status_code=401, detail="需要认证")
+        # API 认证（security.api_auth_enabled，与 jsonserv 路由共用）
+        check_api_auth(request, config)
         
         # 移除扩展名（如果有）
         if path.endswith('.py'):
@@ -303,7 +261,7 @@ def setup_routes(
     async def openapi_schema():
         """OpenAPI 文档（自动生成）"""
         # TODO: 自动扫描 web/ 目录下的 Python 文件并生成 OpenAPI 文档
-        return JSONResponse(content=app.openapi())
+        return FastJSONResponse(content=app.openapi())
         
     @app.get("/{path:path}")
     async def web_handler(path: str, request: Request):
@@ -313,101 +271,51 @@ def setup_routes(
         如果 path 是 Python 文件，执行并返回结果
         如果 path 是 Markdown 文件，渲染为 HTML
         """
-        # 处理根路径：直接查找并处理默认文件
-        path = path.strip('/')
-        
-        # 如果是根路径（空路径），直接查找并处理默认文件
-        if not path:
-            logger.info("web_handler 处理根路径请求")
-            logger.info(f"处理根路径请求，从配置读取默认文件列表")
-            # 从配置读取默认文件列表
-            default_files = config.get("default_files", ["index.html", "index.md", "index.py"])
-            logger.info(f"默认文件列表: {default_files}")
-            
-            # 依次查找默认文件
-            for default_file in default_files:
-                default_path = web_dir / default_file
-                logger.info(f"检查默认文件: {default_path}, 存在: {default_path.exists()}")
-                
-                if default_path.exists():
-                    logger.info(f"找到默认文件: {default_file}, 类型: {default_path.suffix}")
-                    
-                    # 根据文件类型处理
-                    if default_path.suffix == '.md':
-                        html = markdown_renderer.render_file(default_path)
-                        if html:
-                            logger.info(f"成功渲染 Markdown 文件: {default_file}")
-                            return HTMLResponse(content=html)
-                        else:
-                            logger.warning(f"Markdown 渲染失败: {default_file}")
-                    elif default_path.suffix == '.html':
-                        async with aiofiles.open(default_path, 'r', encoding='utf-8') as f:
-                            content = await f.read()
-                        logger.info(f"成功读取 HTML 文件: {default_file}")
-                        return HTMLResponse(content=content)
-                    elif default_path.suffix == '.py':
-                        result = await webhandle.handle_request(request, str(default_path.relative_to(web_dir))[:-3])
-                        logger.info(f"成功执行 Python 文件: {default_file}")
-                        return result
-            
-            # 没有找到任何默认文件
-            logger.error("未找到任何默认文件")
-            raise HTTPException(status_code=404, detail="目录下没有默认文件")
-        
-        # 构建目标路径
-        target_path = web_dir / path
-        
-        # 安全检查：确保路径在 web_dir 内
-        try:
-            resolved_target = target_path.resolve()
-            resolved_web = web_dir.resolve()
-            relative_path = resolved_target.relative_to(resolved_web)
-            # 额外检查：确保没有路径遍历攻击
-            if '..' in str(relative_path):
-                raise HTTPException(status_code=403, detail="访问被拒绝")
-        except ValueError:
+        # 安全检查：词法规范化并拒绝越界路径，符号链接经缓存的 realpath 校验
+        normalized = path_guard.normalize(path)
+        if normalized is None or (normalized and not path_guard.is_within("web", web_dir / normalized)):
             logger.error(f"路径安全检查失败: path={path}")
             raise HTTPException(status_code=403, detail="访问被拒绝")
+        path = normalized
+        
+        # 通过路由索引确定文件类型，不再逐次访问文件系统
+        match = route_index.match(path)
+        if match is None:
+            # {path}.py 不存在时仍交给 webhandle，按父路径匹配 sub_path
+            if path.endswith('.py'):
+                return await webhandle.handle_request(request, path[:-3])
+            raise HTTPException(status_code=404, detail="文件不存在")
         
         # 如果是目录，查找默认文件
-        if target_path.exists() and target_path.is_dir():
-            default_files = config.get("default_files", ["index.html", "index.md", "index.py"])
-            for default_file in default_files:
-                default_path = target_path / default_file
-                if default_path.exists():
-                    # 构建新的路径
-                    new_path = f"{path.rstrip('/')}/{default_file}".lstrip('/')
-                    # 递归处理默认文件
-                    return await web_handler(new_path, request)
-            raise HTTPException(status_code=404, detail="目录下没有默认文件")
+        if match.kind == KIND_DIR:
+            default = default_resolver.resolve(path)
+            if default is None:
+                raise HTTPException(status_code=404, detail="目录下没有默认文件")
+            path, match = default
         
         # 如果是 Python 文件，执行
-        if target_path.suffix == '.py':
-            result = await webhandle.handle_request(request, str(target_path.relative_to(web_dir))[:-3])
+        if match.kind == KIND_PY:
+            result = await webhandle.handle_request(request, path[:-3])
             return result
         
         # 如果是 Markdown 文件，渲染
-        elif target_path.suffix in ['.md', '.markdown']:
-            html = markdown_renderer.render_file(target_path)
+        elif match.kind == KIND_MD:
+            # 大文件流式输出，首字节时间不随文档大小增长
+            if markdown_renderer.should_stream(match.file):
+                return StreamingResponse(markdown_renderer.render_stream(match.file), media_type="text/html")
+            html = await markdown_renderer.render_file_async(match.file)
             if html:
-                return HTMLResponse(content=html)
+                etag = markdown_renderer.cached_etag(match.file)
+                return HTMLResponse(content=html, headers={"etag": etag} if etag else None)
             else:
                 raise HTTPException(status_code=500, detail="渲染失败")
         
-        # 如果是 HTML 文件，直接返回
-        elif target_path.suffix == '.html':
-            if target_path.exists():
-                async with aiofiles.open(target_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                return HTMLResponse(content=content)
-            else:
-                raise HTTPException(status_code=404, detail="文件不存在")
-        
-        # 其他文件，尝试作为静态文件返回
-        elif target_path.exists() and target_path.is_file():
-            return FileResponse(target_path)
+        # 如果是 HTML 文件，按静态文件返回（支持 304 / Range / 预压缩）
+        elif match.kind == KIND_HTML:
+            return static_server.serve(request, match.file, media_type="text/html")
         
+        # 其他文件，作为静态文件返回
         else:
-            raise HTTPException(status_code=404, detail="文件不存在")
+            return static_server.serve(request, match.file)
     
 
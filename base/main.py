@@ -4,12 +4,11 @@ Base Platform 主程序入口
 import os
 import sys
 from pathlib import Path
-from fastapi import FastAPI, Request, Response, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-import aiofiles
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -23,16 +22,22 @@ from module.config import Config
 from module.logger import setup_logger
 from module.webhandle import WebHandle
 from module.markdown import MarkdownRenderer
+from module.compression import CompressionMiddleware
+from module import jsoncodec
+from module.jsoncodec import FastJSONResponse
 from plugin.router import PluginManager
 from service.jsonserv.router import setup_jsonserv
 from service.datasource import DataSourceManager
 from service.cron import CronManager
 from core.file_watcher import FileWatcher
 from core.routes import setup_routes
+from core.default_files import DefaultFileResolver
+from core.path_guard import PathGuard
 
 # 初始化配置
 config = Config()
 logger = setup_logger(config)
+jsoncodec.configure(config.get("json.codec", "auto"))
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -40,6 +45,7 @@ app = FastAPI(
     version=config.get("app.version", "1.0.0"),
     docs_url=None,  # 禁用默认的 /docs
     redoc_url=None,  # 禁用默认的 /redoc
+    default_response_class=FastJSONResponse,  # 使用 orjson / msgspec（已安装时）编码响应
 )
 
 # 将 config 挂载到 app.state，供 web 模块使用
@@ -54,14 +60,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩中间件（gzip / brotli）
+app.add_middleware(CompressionMiddleware, config=config)
+
 # 初始化组件
 webhandle = WebHandle(app, config)
-markdown_renderer = MarkdownRenderer()
+markdown_renderer = MarkdownRenderer(config)
+default_resolver = DefaultFileResolver(config, webhandle.route_index)
+path_guard = PathGuard(
+    {"web": BASE_DIR / "web", "etc": BASE_DIR / "etc"},
+    cache_size=config.get("security.realpath_cache_size", 4096),
+)
 plugin_manager = PluginManager(config)
 jsonserv_manager = None
 datasource_manager = DataSourceManager(config)
 cron_manager = CronManager(config)
 file_watcher = FileWatcher(config, logger)
+file_watcher.add_callback('web', webhandle.invalidate_module)
+file_watcher.add_callback('web', webhandle.route_index.on_file_event)
+file_watcher.add_callback('web', markdown_renderer.invalidate)
+file_watcher.add_callback('web', default_resolver.invalidate)
+file_watcher.add_callback('web', path_guard.on_file_event)
+file_watcher.add_callback('etc', path_guard.on_file_event)
+config.add_reload_callback(default_resolver.clear)
 
 # 健康检查（必须在 setup_routes 之前注册，避免被 /{path:path} 匹配）
 @app.get("/health")
@@ -69,52 +90,15 @@ async def health():
     """健康检查接口"""
     return {"status": "ok", "service": "baseplatform"}
 
-# 根路径路由（必须在 setup_routes 之前注册，确保优先匹配）
-@app.get("/")
-async def root_handler(request: Request):
-    """根路径处理器 - 从配置读取默认文件并依次查找"""
-    logger.info("根路径处理器被调用")
-    from pathlib import Path
-    web_dir = Path(__file__).parent / "web"
-    
-    # 从配置读取默认文件列表
-    default_files = config.get("default_files", ["index.html", "index.md", "index.py"])
-    logger.info(f"默认文件列表: {default_files}")
-    
-    # 依次查找默认文件
-    for default_file in default_files:
-        default_path = web_dir / default_file
-        logger.info(f"检查默认文件: {default_path}, 存在: {default_path.exists()}")
-        
-        if default_path.exists():
-            logger.info(f"找到默认文件: {default_file}, 类型: {default_path.suffix}")
-            
-            # 根据文件类型处理
-            if default_path.suffix == '.md':
-                html = markdown_renderer.render_file(default_path)
-                if html:
-                    logger.info(f"成功渲染 Markdown 文件: {default_file}")
-                    return HTMLResponse(content=html)
-            elif default_path.suffix == '.html':
-                async with aiofiles.open(default_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                logger.info(f"成功读取 HTML 文件: {default_file}")
-                return HTMLResponse(content=content)
-            elif default_path.suffix == '.py':
-                result = await webhandle.handle_request(request, str(default_path.relative_to(web_dir))[:-3])
-                logger.info(f"成功执行 Python 文件: {default_file}")
-                return result
-    
-    # 没有找到任何默认文件
-    logger.error("未找到任何默认文件")
-    raise HTTPException(status_code=404, detail="目录下没有默认文件")
-
-# 设置路由
-setup_routes(app, config, webhandle, markdown_renderer, logger)
-
-# 设置 jsonserv
+# 设置 jsonserv（分发路由必须在 setup_routes 之前注册，避免被 /api/{path:path} 匹配）
 if config.get("jsonserv.enabled", True):
     jsonserv_manager = setup_jsonserv(app, config)
+    if config.get("jsonserv.auto_reload", False):
+        # 数据目录下的 JSON 文件增删时热注册/注销资源
+        file_watcher.add_callback('etc', jsonserv_manager.on_file_event)
+
+# 设置路由
+setup_routes(app, config, webhandle, markdown_renderer, logger, default_resolver, path_guard)
 
 # 启动时初始化
 @app.on_event("startup")
@@ -125,6 +109,14 @@ async def startup_event():
     # 加载插件
     await plugin_manager.load_plugins()
     
+    # 预加载 web/ 处理模块（可选）
+    if config.get("webhandle.preload.enabled", False):
+        report = await webhandle.preload_modules(
+            workers=config.get("webhandle.preload.workers", 4),
+            trace_memory=config.get("webhandle.preload.trace_memory", True),
+        )
+        logger.info(f"web 模块预加载完成: {report['total']} 个, 失败 {report['failed']} 个, 耗时 {report['seconds']:.3f}s")
+    
     # 加载数据源
     await datasource_manager.load_datasources()
     
@@ -144,6 +136,14 @@ async def shutdown_event():
     # 停止文件监控
     file_watcher.stop()
     
+    # 关闭 web 处理函数与 Markdown 渲染线程池
+    webhandle.shutdown()
+    markdown_renderer.shutdown()
+    
+    # 压缩 jsonserv 的 WAL 并停止后台线程
+    if jsonserv_manager:
+        jsonserv_manager.close()
+    
     # 停止计划任务
     await cron_manager.stop()
     
@@ -0,0 +1,255 @@
+"""
+响应压缩中间件
+按 Accept-Encoding 使用 brotli（已安装 brotli 包时）或 gzip 压缩响应：
+- 低于 minimum_size 的响应与不在 content_types 白名单中的类型不压缩
+- 流式响应逐块压缩并刷新，不缓冲整个响应体
+- 带强 ETag 的响应（静态文件、缓存的 Markdown 渲染结果）压缩结果按 路径 + ETag + 编码 缓存，
+  重复请求直接返回缓存的压缩字节
+"""
+import zlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只使用 gzip
+    brotli = None
+
+
+DEFAULT_CONTENT_TYPES = [
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+]
+
+
+class _Compressor:
+    """gzip / brotli 流式压缩器"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """gzip / brotli 压缩中间件（纯 ASGI 实现，支持流式响应）"""
+
+    def __init__(self, app, config):
+        self.app = app
+        self.config = config
+        # (路径, ETag, 编码) -> 压缩后的字节
+        self._cache: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._cache_bytes = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.config.get("compression.enabled", True):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    @staticmethod
+    def _choose_encoding(accept_encoding: str) -> Optional[str]:
+        accepted = {}
+        for item in accept_encoding.lower().split(","):
+            name, _, params = item.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip()] = q
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    @property
+    def minimum_size(self) -> int:
+        return self.config.get("compression.minimum_size", 1024)
+
+    @property
+    def content_types(self) -> List[str]:
+        return self.config.get("compression.content_types", DEFAULT_CONTENT_TYPES)
+
+    def level(self, encoding: str) -> int:
+        if encoding == "br":
+            return self.config.get("compression.brotli_quality", 5)
+        return self.config.get("compression.gzip_level", 6)
+
+    def cache_get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+        return body
+
+    @property
+    def cache_max_bytes(self) -> int:
+        return self.config.get("compression.cache_max_bytes", 16 * 1024 * 1024)
+
+    def cache_put(self, key: Tuple[str, str, str], body: bytes):
+        max_bytes = self.cache_max_bytes
+        if len(body) > max_bytes:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= len(old)
+        self._cache[key] = body
+        self._cache_bytes += len(body)
+        while self._cache_bytes > max_bytes and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+
+
+class _CompressionResponder:
+    """包装单个请求的 send，决定是否压缩并改写响应头"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str):
+        self.middleware = middleware
+        self.path = scope.get("path", "")
+        self._send = send
+        self.encoding = encoding
+        self.start_message = None
+        self.mode = None  # passthrough / pending / stream / cached
+        self.cache_key: Optional[Tuple[str, str, str]] = None
+        self.compressor: Optional[_Compressor] = None
+        self.collected: Optional[List[bytes]] = None
+        self.collected_size = 0
+
+    def _compressible(self, status: int, headers: Headers) -> bool:
+        if status < 200 or status in (204, 206, 304):
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if not any(content_type.startswith(prefix) for prefix in self.middleware.content_types):
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.middleware.minimum_size:
+            return False
+        return True
+
+    def _compressed_start(self, content_length: Optional[int]):
+        headers = MutableHeaders(raw=list(self.start_message["headers"]))
+        headers["content-encoding"] = self.encoding
+        vary = headers.get("vary")
+        if not vary:
+            headers["vary"] = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["vary"] = f"{vary}, Accept-Encoding"
+        # 压缩后的表示与原始字节不同，ETag 改为弱校验
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+        if "accept-ranges" in headers:
+            del headers["accept-ranges"]
+        if content_length is None:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["content-length"] = str(content_length)
+        return {**self.start_message, "headers": headers.raw}
+
+    async def send(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if not self._compressible(message["status"], headers):
+                self.mode = "passthrough"
+                await self._send(message)
+                return
+
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/") and self.middleware.config.get("compression.cache", True):
+                self.cache_key = (self.path, etag, self.encoding)
+                cached = self.middleware.cache_get(self.cache_key)
+                if cached is not None:
+                    # 命中压缩缓存：直接发送，忽略应用后续输出的原始响应体
+                    self.mode = "cached"
+                    await self._send(self._compressed_start(len(cached)))
+                    await self._send({"type": "http.response.body", "body": cached, "more_body": False})
+                    return
+            self.mode = "pending"
+            return
+
+        if message_type != "http.response.body" and self.mode == "pending":
+            # 非 body 消息（如 StaticFileResponse 的 http.response.pathsend）：不压缩，先发出原始响应头
+            self.mode = "passthrough"
+            await self._send(self.start_message)
+        if message_type != "http.response.body" or self.mode in ("passthrough", None):
+            await self._send(message)
+            return
+        if self.mode == "cached":
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode == "pending":
+            if not more_body:
+                # 完整响应体一次到达
+                if len(body) < self.middleware.minimum_size:
+                    self.mode = "passthrough"
+                    await self._send(self.start_message)
+                    await self._send(message)
+                    return
+                compressor = _Compressor(self.encoding, self.middleware.level(self.encoding))
+                compressed = compressor.compress(body) + compressor.finish()
+                if self.cache_key is not None:
+                    self.middleware.cache_put(self.cache_key, compressed)
+                await self._send(self._compressed_start(len(compressed)))
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+
+            # 流式响应：逐块压缩
+            self.mode = "stream"
+            self.compressor = _Compressor(self.encoding, self.middleware.level(self.encoding))
+            if self.cache_key is not None:
+                self.collected = []
+            await self._send(self._compressed_start(None))
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+        if self.collected is not None:
+            self.collected_size += len(chunk)
+            if self.collected_size > self.middleware.cache_max_bytes:
+                # 超过缓存上限，不会被缓存，不再保留已压缩的块
+                self.collected = None
+            else:
+                self.collected.append(chunk)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if not more_body and self.collected is not None:
+            self.middleware.cache_put(self.cache_key, b"".join(self.collected))
+            self.collected = None
@@ -4,7 +4,7 @@
 import os
 import yaml
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 from dotenv import load_dotenv
 import threading
 from watchdog.observers import Observer
@@ -34,6 +34,7 @@ class Config:
         self._config: Dict[str, Any] = {}
         self._lock = threading.RLock()
         self.observer = None
+        self._reload_callbacks: List[Callable[[], None]] = []
         
         # 加载配置
         self.load()
@@ -80,8 +81,16 @@ class Config:
     def reload(self):
         """重新加载配置"""
         self.load()
-        # 触发配置变更事件（如果需要）
-        # 这里可以添加配置变更回调
+        # 触发配置变更回调
+        for callback in list(self._reload_callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"配置变更回调执行失败: {e}")
+    
+    def add_reload_callback(self, callback: Callable[[], None]):
+        """添加配置重新加载后的回调"""
+        self._reload_callbacks.append(callback)
     
     def get(self, key: str, default: Any = None) -> Any:
         """
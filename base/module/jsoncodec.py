@@ -0,0 +1,150 @@
+"""
+JSON 编解码
+已安装 orjson 或 msgspec 时使用其实现，否则使用标准库 json；
+快速实现不支持的值（非字符串键、超出 64 位的整数等）自动回退到标准库，输出一致（UTF-8、不转义非 ASCII）
+"""
+import json
+import logging
+from typing import Any, Iterator, List, Optional
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec 为可选依赖
+    msgspec = None
+
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+logger = logging.getLogger("baseplatform")
+
+
+def available() -> List[str]:
+    """已安装的实现（按优先级）"""
+    return [name for name in BACKENDS if name == "json" or globals()[name] is not None]
+
+
+class _Codec:
+    """当前实现的编解码函数"""
+
+    def __init__(self, name: str):
+        self.name = name
+        if name == "orjson":
+            self.dumps = orjson.dumps
+            self.dumps_pretty = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+            self.loads = orjson.loads
+            self.decode_error = orjson.JSONDecodeError
+        elif name == "msgspec":
+            encoder = msgspec.json.Encoder()
+            self.dumps = encoder.encode
+            self.dumps_pretty = lambda obj: msgspec.json.format(encoder.encode(obj), indent=2)
+            self.loads = msgspec.json.decode
+            self.decode_error = msgspec.DecodeError
+        else:
+            self.dumps = _std_dumps
+            self.dumps_pretty = _std_dumps_pretty
+            self.loads = json.loads
+            self.decode_error = json.JSONDecodeError
+
+
+def _std_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _std_dumps_pretty(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+_codec = _Codec(available()[0])
+
+
+def configure(name: Optional[str] = "auto") -> str:
+    """
+    选择实现：auto（按 orjson、msgspec、json 的顺序取已安装的）或指定名称
+    指定的实现未安装时回退到 auto
+
+    Returns:
+        实际使用的实现名称
+    """
+    global _codec
+    installed = available()
+    if name not in (None, "auto") and name not in installed:
+        logger.warning(f"JSON 实现 {name} 不可用，已安装: {', '.join(installed)}")
+        name = None
+    if name in (None, "auto"):
+        name = installed[0]
+    _codec = _Codec(name)
+    return name
+
+
+def backend() -> str:
+    """当前使用的实现名称"""
+    return _codec.name
+
+
+def dumps(obj: Any) -> bytes:
+    """编码为紧凑的 UTF-8 JSON"""
+    try:
+        return _codec.dumps(obj)
+    except (TypeError, ValueError, OverflowError):
+        return _std_dumps(obj)
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    """编码为两空格缩进的 UTF-8 JSON"""
+    try:
+        return _codec.dumps_pretty(obj)
+    except (TypeError, ValueError, OverflowError):
+        return _std_dumps_pretty(obj)
+
+
+def loads(data: Any) -> Any:
+    """解码 JSON（bytes 或 str）"""
+    try:
+        return _codec.loads(data)
+    except _codec.decode_error:
+        # 快速实现不接受的输入（如超出 64 位的整数）交给标准库，确实无效时由标准库报错
+        if _codec.name == "json":
+            raise
+        return json.loads(data)
+
+
+def iter_pretty_object(obj: dict, chunk_items: int = 1000) -> Iterator[bytes]:
+    """
+    分块编码对象（两空格缩进，与 dumps_pretty 输出一致）：列表值每 chunk_items 条编码一次，
+    大数据量落盘时不会长时间持有 GIL
+    """
+    if not obj:
+        yield b"{}"
+        return
+    yield b"{\n"
+    for position, (key, value) in enumerate(obj.items()):
+        yield b"  " + dumps(str(key)) + b": "
+        yield from iter_pretty_member(value, chunk_items)
+        yield b",\n" if position < len(obj) - 1 else b"\n}"
+
+
+def iter_pretty_member(value: Any, chunk_items: int = 1000) -> Iterator[bytes]:
+    """分块编码根对象成员的值（缩进一层，拼接到 '  "key": ' 之后）"""
+    if isinstance(value, list) and value:
+        yield b"[\n"
+        for start in range(0, len(value), chunk_items):
+            # 单独编码的片段去掉外层括号，缩进加深一层
+            chunk = dumps_pretty(value[start:start + chunk_items])
+            yield (b",\n" if start else b"") + b"  " + chunk[2:-2].replace(b"\n", b"\n  ")
+        yield b"\n  ]"
+    else:
+        yield dumps_pretty(value).replace(b"\n", b"\n  ")
+
+
+class FastJSONResponse(JSONResponse):
+    """使用当前 JSON 实现渲染的 JSONResponse（可作为 FastAPI 的 default_response_class）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,20 +1,52 @@
 """
 Markdown 渲染器模块
 """
+import asyncio
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import markdown
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
 from pygments import highlight
 from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
 import re
 
 
+_PAGE_TAIL = """
+</body>
+</html>
+"""
+
+# 流式渲染时的代码块围栏与列表项（用于判断分块边界）
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_CONTINUATION_RE = re.compile(r"^(\s|[-*+]\s|\d+[.)]\s|>)")
+# 链接引用定义 [id]: url "title"，预先收集以便各分块都能解析引用式链接
+_REFERENCE_RE = re.compile(r"""^ {0,3}\[([^\[\]]+)\]:\s*<?([^\s>]+)>?(?:\s+["'(](.*)["')])?\s*$""")
+
+
 class MarkdownRenderer:
-    """Markdown 渲染器"""
+    """
+    Markdown 渲染器
+    
+    - 渲染结果按 路径 + mtime/size 缓存，按字节预算 LRU 淘汰，文件变更时由 FileWatcher 回调清除
+    - markdown.Markdown 实例保存 toc、脚注等状态，不能跨线程共享，每个线程各持有一个实例
+    """
     
-    def __init__(self):
-        self.md = markdown.Markdown(
+    def __init__(self, config=None):
+        self.config = config
+        self._local = threading.local()
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], str, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+        workers = config.get("markdown.render_workers", 4) if config else 4
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="markdown")
+    
+    @staticmethod
+    def _create_markdown() -> markdown.Markdown:
+        return markdown.Markdown(
             extensions=[
                 'extra',
                 'codehilite',
@@ -34,6 +66,20 @@ class MarkdownRenderer:
             }
         )
     
+    @property
+    def md(self) -> markdown.Markdown:
+        """当前线程的 Markdown 实例"""
+        md = getattr(self._local, "md", None)
+        if md is None:
+            md = self._local.md = self._create_markdown()
+        return md
+    
+    @property
+    def cache_max_bytes(self) -> int:
+        if self.config is None:
+            return 32 * 1024 * 1024
+        return self.config.get("markdown.cache_max_bytes", 32 * 1024 * 1024)
+    
     def render(self, content: str, title: Optional[str] = None) -> str:
         """
         渲染 Markdown 内容为 HTML
@@ -45,10 +91,16 @@ class MarkdownRenderer:
         Returns:
             HTML 字符串
         """
-        html = self.md.convert(content)
+        md = self.md
+        md.reset()
+        html = md.convert(content)
         
         # 生成完整的 HTML 页面
-        html_template = f"""
+        return f"{self._page_head(title)}{html}{_PAGE_TAIL}"
+    
+    def _page_head(self, title: Optional[str] = None) -> str:
+        """页面头部（<head> 与样式，截止到 <body> 内容之前）"""
+        return f"""
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -119,15 +171,11 @@ class MarkdownRenderer:
     </style>
 </head>
 <body>
-    {html}
-</body>
-</html>
-"""
-        return html_template
+    """
     
     def render_file(self, file_path: Path) -> Optional[str]:
         """
-        渲染 Markdown 文件
+        渲染 Markdown 文件（带缓存）
         
         Args:
             file_path: Markdown 文件路径
@@ -135,38 +183,205 @@ class MarkdownRenderer:
         Returns:
             HTML 字符串，文件不存在返回 None
         """
-        if not file_path.exists():
+        try:
+            st = file_path.stat()
+        except OSError:
             return None
+        signature = (st.st_mtime_ns, st.st_size)
+        
+        html = self._cache_get(str(file_path), signature)
+        if html is not None:
+            return html
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
             title = file_path.stem
-            return self.render(content, title)
+            html = self.render(content, title)
+            self._cache_put(str(file_path), signature, html)
+            return html
         
         except Exception as e:
             print(f"渲染 Markdown 文件失败 {file_path}: {e}")
             return None
     
+    async def render_file_async(self, file_path: Path) -> Optional[str]:
+        """
+        渲染 Markdown 文件，命中缓存直接返回，否则在渲染线程池中执行，不阻塞事件循环
+        """
+        try:
+            st = file_path.stat()
+        except OSError:
+            return None
+        html = self._cache_get(str(file_path), (st.st_mtime_ns, st.st_size))
+        if html is not None:
+            return html
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.render_file, file_path)
+    
+    def should_stream(self, file_path: Path) -> bool:
+        """文件大小达到 markdown.stream_threshold 时使用流式渲染（0 表示不启用）"""
+        threshold = self.config.get("markdown.stream_threshold", 1024 * 1024) if self.config else 1024 * 1024
+        if not threshold:
+            return False
+        try:
+            return file_path.stat().st_size >= threshold
+        except OSError:
+            return False
+    
+    async def render_stream(self, file_path: Path) -> AsyncIterator[str]:
+        """
+        流式渲染 Markdown 文件
+        先输出页面头部与样式，再按块读取、转换并输出正文，内存占用与文件大小无关
+        
+        引用式链接在渲染前统一收集，可跨块解析；脚注与 [TOC] 仅在各自所在的块内生效
+        """
+        yield self._page_head(file_path.stem)
+        
+        chunk_size = self.config.get("markdown.stream_chunk_size", 64 * 1024) if self.config else 64 * 1024
+        loop = asyncio.get_running_loop()
+        try:
+            references = await loop.run_in_executor(self._executor, self._scan_references, file_path)
+            chunks = self._iter_chunks(file_path, chunk_size)
+            try:
+                while True:
+                    html = await loop.run_in_executor(self._executor, self._convert_next, chunks, references)
+                    if html is None:
+                        break
+                    yield html + "\n"
+            finally:
+                chunks.close()
+        except Exception as e:
+            # 响应头已发送，只能记录错误并结束页面
+            print(f"流式渲染 Markdown 文件失败 {file_path}: {e}")
+        
+        yield _PAGE_TAIL
+    
+    @staticmethod
+    def _scan_references(file_path: Path) -> Dict[str, Tuple[str, Optional[str]]]:
+        """收集文件中代码块以外的链接引用定义"""
+        references = {}
+        fence = None
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                match = _FENCE_RE.match(line)
+                if match:
+                    marker = match.group(1)
+                    if fence is None:
+                        fence = marker
+                    elif marker[0] == fence[0] and len(marker) >= len(fence):
+                        fence = None
+                    continue
+                if fence is None:
+                    match = _REFERENCE_RE.match(line)
+                    if match:
+                        references.setdefault(match.group(1).lower(), (match.group(2), match.group(3)))
+        return references
+    
+    @staticmethod
+    def _iter_chunks(file_path: Path, chunk_size: int) -> Iterator[str]:
+        """
+        按块读取 Markdown 源文件
+        累计达到 chunk_size 后，在代码块以外的空行处切分；下一行是缩进、列表项或引用时顺延，
+        避免把同一个列表或代码块拆开
+        """
+        pending = []
+        pending_size = 0
+        fence = None
+        split_ready = False
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if split_ready and line.strip():
+                    if not _CONTINUATION_RE.match(line):
+                        yield "".join(pending)
+                        pending = []
+                        pending_size = 0
+                    split_ready = False
+                
+                pending.append(line)
+                pending_size += len(line)
+                
+                match = _FENCE_RE.match(line)
+                if match:
+                    marker = match.group(1)
+                    if fence is None:
+                        fence = marker
+                    elif marker[0] == fence[0] and len(marker) >= len(fence):
+                        fence = None
+                elif fence is None and not line.strip() and pending_size >= chunk_size:
+                    split_ready = True
+        if pending:
+            yield "".join(pending)
+    
+    def _convert_next(self, chunks: Iterator[str], references: Dict[str, Tuple[str, Optional[str]]]) -> Optional[str]:
+        """读取并转换下一块，没有更多内容时返回 None"""
+        chunk = next(chunks, None)
+        if chunk is None:
+            return None
+        md = self.md
+        md.reset()
+        md.references.update(references)
+        return md.convert(chunk)
+    
+    def cached_etag(self, file_path: Path) -> Optional[str]:
+        """
+        返回已缓存渲染结果的 ETag（由源文件 mtime_ns + size 生成），未缓存返回 None
+        供压缩中间件按 ETag 缓存压缩结果
+        """
+        with self._cache_lock:
+            entry = self._cache.get(str(file_path))
+        if entry is None:
+            return None
+        mtime_ns, size = entry[0]
+        return f'"md-{mtime_ns:x}-{size:x}"'
+    
+    def _cache_get(self, key: str, signature: Tuple[int, int]) -> Optional[str]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] != signature:
+                self._cache_remove(key)
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+    
+    def _cache_put(self, key: str, signature: Tuple[int, int], html: str):
+        size = sys.getsizeof(html)
+        max_bytes = self.cache_max_bytes
+        if size > max_bytes:
+            return
+        with self._cache_lock:
+            self._cache_remove(key)
+            self._cache[key] = (signature, html, size)
+            self._cache_bytes += size
+            # 超出字节预算时按 LRU 淘汰
+            while self._cache_bytes > max_bytes and self._cache:
+                _, (_, _, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted
+    
+    def _cache_remove(self, key: str):
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._cache_bytes -= entry[2]
+    
+    def invalidate(self, file_path: Path):
+        """清除文件的渲染缓存（FileWatcher 回调）"""
+        with self._cache_lock:
+            self._cache_remove(str(file_path))
+    
+    def clear_cache(self):
+        """清除全部渲染缓存"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+    
     def reset(self):
         """重置 Markdown 解析器（用于重新加载）"""
-        self.md = markdown.Markdown(
-            extensions=[
-                'extra',
-                'codehilite',
-                'toc',
-                'tables',
-                'fenced_code',
-                'nl2br',
-            ],
-            extension_configs={
-                'codehilite': {
-                    'css_class': 'highlight',
-                    'use_pygments': True,
-                },
-                'toc': {
-                    'permalink': True,
-                }
-            }
-        )
+        self._local = threading.local()
+        self.clear_cache()
+    
+    def shutdown(self):
+        """关闭渲染线程池"""
+        self._executor.shutdown(wait=False)
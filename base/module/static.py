@@ -0,0 +1,270 @@
+"""
+静态文件服务模块
+支持 ETag / Last-Modified 条件请求（304）、Range 分段请求（206/416）、
+预压缩文件（.br/.gz）协商，以及大文件的零拷贝发送
+"""
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiofiles
+from fastapi import Request, HTTPException
+from fastapi.responses import Response
+
+
+# 预压缩文件后缀，按优先级排列
+PRECOMPRESSED = [("br", ".br"), ("gzip", ".gz")]
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """解析 Accept-Encoding，返回 编码 -> q 值"""
+    encodings = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 比较（弱比较）"""
+    if header.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    解析 Range 头
+
+    Returns:
+        [(start, end)] 闭区间列表；格式不支持时返回 None（按完整文件响应），
+        所有区间都无法满足时返回空列表（416）
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    result = []
+    for item in ranges.split(","):
+        start_text, sep, end_text = item.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if start_text == "":
+                # bytes=-N：最后 N 个字节
+                length = int(end_text)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(start_text)
+                end = int(end_text) if end_text else size - 1
+                if end_text and start > end:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < size:
+            result.append((start, end))
+    return result
+
+
+class StaticFileResponse(Response):
+    """
+    文件响应
+    服务器支持 ASGI pathsend / zerocopy 扩展且文件超过阈值时交由服务器零拷贝发送，
+    否则分块读取发送
+    """
+
+    def __init__(self, path: Path, status_code: int = 200, headers: Optional[Dict[str, str]] = None,
+                 media_type: Optional[str] = None, offset: int = 0, length: int = 0,
+                 sendfile_threshold: int = 1024 * 1024, chunk_size: int = 256 * 1024,
+                 send_body: bool = True):
+        self.path = path
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.offset = offset
+        self.length = length
+        self.sendfile_threshold = sendfile_threshold
+        self.chunk_size = chunk_size
+        self.send_body = send_body
+        self.init_headers(headers)
+        if status_code != 304:
+            self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if not self.send_body or self.length == 0 or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if self.length >= self.sendfile_threshold:
+            whole_file = self.offset == 0 and self.status_code == 200
+            if whole_file and "http.response.pathsend" in extensions:
+                await send({"type": "http.response.pathsend", "path": str(self.path)})
+                return
+            if "http.response.zerocopy" in extensions:
+                with open(self.path, "rb") as file:
+                    await send({
+                        "type": "http.response.zerocopy",
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.length,
+                        "more_body": False,
+                    })
+                return
+
+        async with aiofiles.open(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining > 0:
+                # 文件在发送过程中被截断
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class StaticServer:
+    """静态文件服务"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def _variant(self, file_path: Path, st: os.stat_result,
+                 accept_encoding: str) -> Tuple[Path, Optional[str], os.stat_result]:
+        """按 Accept-Encoding 选择预压缩文件（须不旧于原文件），返回 (文件, 编码, stat)"""
+        if not accept_encoding or not self.config.get("static.precompressed", True):
+            return file_path, None, st
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding, suffix in PRECOMPRESSED:
+            if accepted.get(encoding, accepted.get("*", 0.0)) <= 0:
+                continue
+            candidate = file_path.with_name(file_path.name + suffix)
+            try:
+                candidate_st = candidate.stat()
+            except OSError:
+                continue
+            if candidate_st.st_mtime_ns >= st.st_mtime_ns:
+                return candidate, encoding, candidate_st
+        return file_path, None, st
+
+    def serve(self, request: Request, file_path: Path, media_type: Optional[str] = None) -> Response:
+        """
+        返回文件响应，处理条件请求、Range 与预压缩
+
+        Args:
+            request: FastAPI 请求对象
+            file_path: 文件路径
+            media_type: 内容类型（默认按扩展名推断）
+        """
+        range_header = request.headers.get("range")
+        if media_type is None:
+            media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+
+        try:
+            st = file_path.stat()
+        except OSError:
+            raise HTTPException(status_code=404, detail="文件不存在")
+
+        # Range 请求只针对原始内容，不使用预压缩文件
+        send_path, encoding = file_path, None
+        if not range_header:
+            send_path, encoding, st = self._variant(file_path, st, request.headers.get("accept-encoding", ""))
+
+        # 强 ETag：mtime_ns + size，预压缩版本附加编码后缀以区分表示
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}{"-" + encoding if encoding else ""}"'
+        headers = {
+            "etag": etag,
+            "last-modified": formatdate(st.st_mtime, usegmt=True),
+        }
+        if self.config.get("static.precompressed", True):
+            headers["vary"] = "Accept-Encoding"
+        if encoding:
+            headers["content-encoding"] = encoding
+        else:
+            headers["accept-ranges"] = "bytes"
+        cache_control = self.config.get("static.cache_control")
+        if cache_control:
+            headers["cache-control"] = cache_control
+
+        options = {
+            "media_type": media_type,
+            "sendfile_threshold": self.config.get("static.sendfile_threshold", 1024 * 1024),
+            "chunk_size": self.config.get("static.chunk_size", 256 * 1024),
+        }
+
+        # 条件请求：If-None-Match 优先于 If-Modified-Since
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if _etag_matches(if_none_match, etag):
+                return StaticFileResponse(send_path, 304, headers, send_body=False, **options)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            if if_modified_since:
+                try:
+                    since = parsedate_to_datetime(if_modified_since).timestamp()
+                except (TypeError, ValueError):
+                    since = None
+                if since is not None and int(st.st_mtime) <= since:
+                    return StaticFileResponse(send_path, 304, headers, send_body=False, **options)
+
+        size = st.st_size
+        if range_header and self._if_range_matches(request.headers.get("if-range"), etag, st):
+            ranges = _parse_range(range_header, size)
+            if ranges is not None:
+                if not ranges:
+                    return Response(status_code=416, headers={"content-range": f"bytes */{size}", **headers})
+                # 仅支持单区间，多区间时按完整文件响应
+                if len(ranges) == 1:
+                    start, end = ranges[0]
+                    headers["content-range"] = f"bytes {start}-{end}/{size}"
+                    return StaticFileResponse(send_path, 206, headers, offset=start,
+                                              length=end - start + 1, **options)
+
+        return StaticFileResponse(send_path, 200, headers, length=size, **options)
+
+    @staticmethod
+    def _if_range_matches(if_range: Optional[str], etag: str, st: os.stat_result) -> bool:
+        """If-Range 校验：不匹配时忽略 Range，返回完整文件"""
+        if not if_range:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError):
+            return False
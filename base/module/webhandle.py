@@ -2,14 +2,27 @@
 Web 服务处理模块
 用于处理 web/ 目录下的 Python 文件
 """
+import asyncio
+import contextvars
 import importlib.util
+import inspect
 import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from fastapi import Request, Response, HTTPException
-from fastapi.responses import JSONResponse
 import traceback
 
+from core.route_index import RouteIndex, KIND_PY
+from module.jsoncodec import FastJSONResponse
+
+
+# 当前 WebHandle 实例，供 web/ 下模块通过 `from module.webhandle import webhandle` 使用
+webhandle: Optional["WebHandle"] = None
+
 
 class WebHandle:
     """Web 处理类，用于注册和管理 web/ 目录下的路由"""
@@ -19,8 +32,27 @@ class WebHandle:
         self.config = config
         self.base_dir = Path(__file__).parent.parent
         self.web_dir = self.base_dir / "web"
+        self.route_index = RouteIndex(self.web_dir)
         self.routes: Dict[str, Callable] = {}
         self._loaded_modules: Dict[str, Any] = {}
+        # 模块缓存签名：文件路径 -> (mtime_ns, size, inode)，签名不变则复用已加载模块
+        self._module_stats: Dict[str, Tuple[int, int, int]] = {}
+        # 每个模块一把加载锁，避免并发预加载时重复执行同一模块
+        self._module_locks: Dict[str, threading.Lock] = {}
+        # 最近一次加载失败的错误信息：文件路径 -> 错误
+        self._load_errors: Dict[str, str] = {}
+        # 启动预加载报告（未执行预加载时为 None）
+        self.preload_report: Optional[Dict[str, Any]] = None
+        # 同步处理函数在线程池中执行，避免阻塞事件循环
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.get("webhandle.max_workers", 16),
+            thread_name_prefix="webhandle"
+        )
+        # 路由并发限制：路由 -> (max_concurrency, 事件循环, Semaphore)
+        self._limiters: Dict[str, Tuple[int, Any, asyncio.Semaphore]] = {}
+        
+        global webhandle
+        webhandle = self
     
     def route(self, path: str, methods: list = None):
         """
@@ -34,19 +66,29 @@ class WebHandle:
         if methods is None:
             methods = ["GET", "POST"]
         
+        route_key = path.strip('/')
+        
         def decorator(func: Callable):
+            # 模块重新加载时只替换处理函数，不重复注册 FastAPI 路由
+            registered = path in self.routes
+            self.routes[path] = func
+            if registered:
+                return func
+            
             # 注册路由到 FastAPI
             async def handler(request: Request):
                 try:
-                    result = func(request)
+                    result = await self.call_handler(route_key, self.routes[path], request)
                     if isinstance(result, Response):
                         return result
                     elif isinstance(result, dict) or isinstance(result, list):
-                        return JSONResponse(content=result)
+                        return FastJSONResponse(content=result)
                     else:
-                        return JSONResponse(content={"result": str(result)})
+                        return FastJSONResponse(content={"result": str(result)})
+                except HTTPException:
+                    raise
                 except Exception as e:
-                    return JSONResponse(
+                    return FastJSONResponse(
                         status_code=500,
                         content={"error": str(e), "traceback": traceback.format_exc()}
                     )
@@ -55,15 +97,91 @@ class WebHandle:
             for method in methods:
                 self.app.add_api_route(path, handler, methods=[method])
             
-            self.routes[path] = func
             return func
         
         return decorator
     
+    def _get_limiter(self, route_key: str) -> Tuple[Optional[asyncio.Semaphore], Optional[float]]:
+        """
+        读取 webhandle.routes 中的路由并发配置
+        
+        Returns:
+            (信号量, 排队超时秒数)，未配置 max_concurrency 时信号量为 None
+        """
+        routes_config = self.config.get("webhandle.routes", {}) or {}
+        route_config = routes_config.get(route_key) or {}
+        max_concurrency = route_config.get("max_concurrency")
+        queue_timeout = route_config.get("queue_timeout", self.config.get("webhandle.queue_timeout"))
+        if not max_concurrency:
+            self._limiters.pop(route_key, None)
+            return None, queue_timeout
+        
+        # 配置变更（或事件循环变化）后重建信号量
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(route_key)
+        if limiter is None or limiter[0] != max_concurrency or limiter[1] is not loop:
+            limiter = (max_concurrency, loop, asyncio.Semaphore(max_concurrency))
+            self._limiters[route_key] = limiter
+        return limiter[2], queue_timeout
+    
+    async def _invoke(self, handler: Callable, request: Request) -> Any:
+        """调用处理函数：异步函数在事件循环中执行，同步函数交给线程池"""
+        if asyncio.iscoroutinefunction(handler):
+            result = await handler(request)
+        else:
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            result = await loop.run_in_executor(self._executor, context.run, handler, request)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    async def call_handler(self, route_key: str, handler: Callable, request: Request) -> Any:
+        """
+        按路由并发限制调用处理函数
+        
+        Args:
+            route_key: 路由标识（web/ 下不含扩展名的路径，如 example/hello）
+            handler: 处理函数
+            request: FastAPI 请求对象
+        """
+        semaphore, queue_timeout = self._get_limiter(route_key)
+        if semaphore is None:
+            return await self._invoke(handler, request)
+        
+        try:
+            await asyncio.wait_for(semaphore.acquire(), queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="服务繁忙，请求排队超时")
+        try:
+            return await self._invoke(handler, request)
+        finally:
+            semaphore.release()
+    
+    def shutdown(self):
+        """关闭处理函数线程池"""
+        self._executor.shutdown(wait=False)
+    
+    def _module_name(self, file_path: Path) -> str:
+        """
+        根据相对 web/ 的路径生成稳定且互不冲突的模块名
+        
+        先把 _ 转义为 _5f，再把 / 替换为 __（web/a/b_c.py 与 web/a_b/c.py 不会同名）；
+        web/ 之外的文件使用绝对路径，以 / 开头，编码后不会与 web/ 下的文件同名
+        """
+        try:
+            relative = file_path.relative_to(self.web_dir)
+        except ValueError:
+            relative = file_path
+        name = relative.with_suffix('').as_posix()
+        return "web_" + name.replace('_', '_5f').replace('/', '__')
+    
     def load_module(self, file_path: Path) -> Optional[Any]:
         """
         动态加载 Python 模块
         
+        模块按文件路径缓存，仅当文件的 mtime/size/inode 变化（或被 invalidate_module 清除）时才重新执行
+        
         Args:
             file_path: Python 文件路径（相对于 web/ 目录）
         
@@ -74,11 +192,32 @@ class WebHandle:
         if not file_path.is_absolute():
             file_path = self.web_dir / file_path
         
-        if not file_path.exists() or not file_path.suffix == '.py':
+        if not file_path.suffix == '.py':
+            return None
+        
+        try:
+            st = file_path.stat()
+        except OSError:
             return None
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
         
+        # 命中缓存：文件未变化，直接复用
+        cache_key = str(file_path)
+        module = self._loaded_modules.get(cache_key)
+        if module is not None and self._module_stats.get(cache_key) == signature:
+            return module
+        
+        with self._module_locks.setdefault(cache_key, threading.Lock()):
+            # 等待锁期间可能已由其他线程加载
+            module = self._loaded_modules.get(cache_key)
+            if module is not None and self._module_stats.get(cache_key) == signature:
+                return module
+            return self._exec_module(file_path, cache_key, signature)
+    
+    def _exec_module(self, file_path: Path, cache_key: str, signature: Tuple[int, int, int]) -> Optional[Any]:
+        """执行模块文件并写入缓存"""
         # 生成模块名
-        module_name = f"web_{file_path.stem}_{id(file_path)}"
+        module_name = self._module_name(file_path)
         
         # 如果已加载，先移除
         if module_name in sys.modules:
@@ -99,14 +238,96 @@ class WebHandle:
             # 执行模块
             spec.loader.exec_module(module)
             
-            self._loaded_modules[str(file_path)] = module
+            self._loaded_modules[cache_key] = module
+            self._module_stats[cache_key] = signature
+            self._load_errors.pop(cache_key, None)
             return module
         
         except Exception as e:
+            sys.modules.pop(module_name, None)
+            self._load_errors[cache_key] = f"{type(e).__name__}: {e}"
             print(f"加载模块失败 {file_path}: {e}")
             traceback.print_exc()
             return None
     
+    async def preload_modules(self, workers: int = 4, trace_memory: bool = True) -> Dict[str, Any]:
+        """
+        并发预加载 web/ 下全部 Python 模块，记录每个模块的导入耗时与内存
+        加载失败的模块记录在报告中，不影响启动
+        
+        Args:
+            workers: 并发加载线程数
+            trace_memory: 是否使用 tracemalloc 统计各模块导入后保留的内存
+        
+        Returns:
+            预加载报告
+        """
+        files = sorted(f for f in self.route_index.iter_files(KIND_PY) if f.name != "__init__.py")
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            # 保留完整调用栈，才能把依赖导入产生的分配归属到发起导入的 web 模块
+            tracemalloc.start(64)
+        
+        def load(file_path: Path) -> Dict[str, Any]:
+            started = time.perf_counter()
+            module = self.load_module(file_path)
+            entry = {
+                "path": file_path.relative_to(self.web_dir).as_posix(),
+                "ok": module is not None,
+                "seconds": round(time.perf_counter() - started, 6),
+            }
+            if module is None:
+                entry["error"] = self._load_errors.get(str(file_path), "未知错误")
+            return entry
+        
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="webhandle-preload") as pool:
+            modules: List[Dict[str, Any]] = list(await asyncio.gather(
+                *(loop.run_in_executor(pool, load, file_path) for file_path in files)
+            ))
+        elapsed = time.perf_counter() - started
+        
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            for entry, file_path in zip(modules, files):
+                traces = snapshot.filter_traces([tracemalloc.Filter(True, str(file_path), all_frames=True)])
+                entry["memory_bytes"] = sum(trace.size for trace in traces.traces)
+        
+        self.preload_report = {
+            "finished_at": time.time(),
+            "seconds": round(elapsed, 6),
+            "workers": workers,
+            "total": len(modules),
+            "failed": sum(1 for entry in modules if not entry["ok"]),
+            "modules": modules,
+        }
+        return self.preload_report
+    
+    def invalidate_module(self, file_path: Path):
+        """
+        清除模块缓存（由 FileWatcher 在 web/ 下文件变更时回调）
+        
+        Args:
+            file_path: 变更的文件路径
+        """
+        file_path = Path(file_path)
+        if not file_path.is_absolute():
+            file_path = self.web_dir / file_path
+        if file_path.suffix != '.py':
+            return
+        cache_key = str(file_path)
+        self._module_stats.pop(cache_key, None)
+        if self._loaded_modules.pop(cache_key, None) is not None:
+            sys.modules.pop(self._module_name(file_path), None)
+    
+    def clear_module_cache(self):
+        """清除全部模块缓存"""
+        for cache_key in list(self._loaded_modules):
+            self.invalidate_module(Path(cache_key))
+    
     async def handle_request(self, request: Request, path: str) -> Response:
         """
         处理请求
@@ -118,20 +339,11 @@ class WebHandle:
         Returns:
             FastAPI 响应对象
         """
-        # 先尝试精确匹配
-        file_path = self.web_dir / f"{path}.py"
-        sub_path = ''
-        
-        # 如果精确匹配不存在，尝试向上查找父路径
-        if not file_path.exists():
-            parts = path.split('/')
-            for i in range(len(parts) - 1, 0, -1):
-                parent_path = '/'.join(parts[:i])
-                parent_file = self.web_dir / f"{parent_path}.py"
-                if parent_file.exists():
-                    file_path = parent_file
-                    sub_path = '/'.join(parts[i:])
-                    break
+        # 通过路由索引匹配：优先精确匹配 {path}.py，否则取最长的父路径
+        match = self.route_index.match_module(path)
+        if match is None:
+            raise HTTPException(status_code=404, detail="文件不存在")
+        file_path, sub_path = match.file, match.sub_path
         
         # 将 sub_path 存入 request.state
         request.state.sub_path = sub_path
@@ -157,29 +369,32 @@ class WebHandle:
                 if exports:
                     handler = getattr(module, exports[0])
         
+        # 通过 @webhandle.route 注册的处理函数
+        if handler is None:
+            handler = self.routes.get(f"/{path}")
+        
         if handler is None:
             raise HTTPException(status_code=500, detail="未找到处理函数")
         
+        route_key = file_path.relative_to(self.web_dir).with_suffix('').as_posix()
         try:
-            # 调用处理函数（支持同步和异步）
-            import asyncio
-            if asyncio.iscoroutinefunction(handler):
-                result = await handler(request)
-            else:
-                result = handler(request)
+            # 调用处理函数（异步函数在事件循环中执行，同步函数在线程池中执行）
+            result = await self.call_handler(route_key, handler, request)
             
             # 处理返回值
             if isinstance(result, Response):
                 return result
             elif isinstance(result, dict) or isinstance(result, list):
-                return JSONResponse(content=result)
+                return FastJSONResponse(content=result)
             elif isinstance(result, str):
                 return Response(content=result, media_type="text/plain")
             else:
-                return JSONResponse(content={"result": str(result)})
+                return FastJSONResponse(content={"result": str(result)})
         
+        except HTTPException:
+            raise
         except Exception as e:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=500,
                 content={
                     "error": str(e),
@@ -189,6 +404,5 @@ class WebHandle:
     
     def reload_module(self, file_path: Path):
         """重新加载模块"""
-        if str(file_path) in self._loaded_modules:
-            del self._loaded_modules[str(file_path)]
+        self.invalidate_module(file_path)
         return self.load_module(file_path)
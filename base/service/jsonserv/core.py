@@ -2,205 +2,1071 @@
 jsonserv 核心逻辑
 JSON 读写、查询过滤算法
 """
-import json
+import asyncio
+import os
+import threading
+import time
 import uuid
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from concurrent.futures import Future
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple
 from filelock import FileLock
 import logging
 
+from module import jsoncodec
+from service.jsonserv.index import HashIndex, SortedIndex, TextIndex, item_matches, item_sort_key, search_terms
+from service.jsonserv.mapped import MappedArray, read_header
+from service.jsonserv.query import (
+    Condition, OP_EQ, OP_RANGE, decode_cursor, encode_cursor, matches, parse_conditions,
+)
+from service.jsonserv.wal import WriteAheadLog
+from service.jsonserv.writer import BatchWriter
+
+if TYPE_CHECKING:
+    from service.jsonserv.objectfile import ObjectFile
+
+
+# 快照中保存数字 ID 计数器的成员（对象模式文件中为 集合名 -> 计数器）
+NEXT_ID_KEY = "next_id"
+# 快照中保存已包含的最后一条 WAL 记录序号的成员
+WAL_SEQ_KEY = "wal_seq"
+
+
+def _stat_version(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+# 当前调用来自异步接口（运行在事件循环中）：不做磁盘读取与同步落盘
+_async_call: ContextVar[bool] = ContextVar("jsonserv_async_call", default=False)
+
+
+def _done_future() -> Future:
+    future = Future()
+    future.set_result(None)
+    return future
+
+
+def write_snapshot(file_path: Path, payload: Iterable[bytes]):
+    """原子写入快照：临时文件 + fsync + os.replace，崩溃时不会留下写了一半的文件"""
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.writelines(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
 
 class JSONDataStore:
     """JSON 数据存储"""
     
-    def __init__(self, file_path: Path, primary_key: str = "id"):
+    def __init__(self, file_path: Path, primary_key: str = "id", config=None,
+                 batch_writes: Optional[bool] = None, indexes: Optional[List[str]] = None,
+                 sort_indexes: Optional[List[str]] = None, mmap_mode: Optional[bool] = None,
+                 collection: Optional[str] = None, shared: Optional["ObjectFile"] = None):
+        """
+        Args:
+            file_path: JSON 文件路径
+            primary_key: 默认主键（文件中声明的 primary_key 优先）
+            config: 配置对象，读取 jsonserv.wal.* / jsonserv.write_batch.* / jsonserv.coherence.*
+                （为 None 时 WAL 与批量写入不启用）
+            batch_writes: 是否启用批量写入线程（None 时按 jsonserv.write_batch.enabled）
+            indexes: 预先建立等值索引的字段
+            sort_indexes: 预先建立有序索引（区间查询、排序）的字段
+            mmap_mode: 是否以内存映射方式只读访问（None 时按 jsonserv.mmap.enabled 与 min_bytes）
+            collection: 对象模式文件中的集合名（根对象的成员）
+            shared: 对象模式文件（ObjectFile），同一文件的集合共享文件锁、WAL、写线程与落盘
+        """
         self.file_path = file_path
         self.primary_key = primary_key
-        self.lock = FileLock(str(file_path) + ".lock")
+        self.collection = collection
+        self.shared = shared
+        self.lock = shared.lock if shared is not None else FileLock(str(file_path) + ".lock")
         self.logger = logging.getLogger("baseplatform.jsonserv")
         self._cache: Optional[Dict[str, Any]] = None
+        # 行号：按插入顺序递增，与 data 列表顺序一致；rowid -> 条目
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._rowids: List[int] = []
+        self._next_rowid = 0
+        # 主键索引：主键值 -> rowid（重复主键取第一条，与线性查找一致）
+        self._index: Dict[Any, int] = {}
+        self._pk_duplicates = False
+        # 二级等值索引：字段 -> HashIndex（声明的字段加载时构建，其余字段首次过滤时构建）
+        self.index_fields: List[str] = list(indexes or [])
+        self.sort_index_fields: List[str] = list(sort_indexes or [])
+        self.auto_index = config.get("jsonserv.auto_index", True) if config is not None else True
+        self._secondary: Dict[str, HashIndex] = {}
+        self._indexed_data: Optional[Dict[str, Any]] = None
+        self._index_key: str = primary_key
+        # 单调递增的数字 ID 计数器（删除后 ID 不复用；快照中以 next_id 保存，重启后延续）
+        self._next_id: int = 1
+        # 内存数据互斥；落盘互斥（加锁顺序固定为 _write_lock -> _mutex，持有 _mutex 时不做 IO）
+        self._mutex = threading.RLock()
+        self._write_lock = shared._write_lock if shared is not None else threading.Lock()
+        # 已应用到内存、尚未落盘的变更及其持久化 Future
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_future: Optional[Future] = None
+        self._inflight_future: Optional[Future] = None
+        self._closed = False
+        
+        # 跨进程一致性：磁盘版本变化（其他进程或同一文件的其他存储写过）时才重新加载
+        self.coherent = config.get("jsonserv.coherence.enabled", True) if config is not None else True
+        self.check_interval = config.get("jsonserv.coherence.check_interval", 0) if config is not None else 0
+        self._version: Optional[tuple] = None
+        self._checked_at = 0.0
+        # 异步接口：同一事件循环内的加载与落盘互斥，阻塞操作在线程池中执行
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # 可选的内存映射模式：大文件只建立记录偏移索引、按需解码，首次变更或过滤/排序查询时转为完整加载
+        if shared is not None:
+            mmap_mode = False
+        elif mmap_mode is None:
+            mmap_mode = config is not None and config.get("jsonserv.mmap.enabled", False)
+            if mmap_mode:
+                min_bytes = config.get("jsonserv.mmap.min_bytes", 100 * 1024 * 1024)
+                mmap_mode = file_path.exists() and file_path.stat().st_size >= min_bytes
+        self.mmap_mode = bool(mmap_mode)
+        self._mapped: Optional[MappedArray] = None
+        
+        # 可选的 WAL 模式：变更追加到 .wal，后台按大小/时间阈值压缩为 JSON 快照
+        self.wal: Optional[WriteAheadLog] = None
+        if shared is not None:
+            self.wal = shared.wal
+        elif config is not None and config.get("jsonserv.wal.enabled", False):
+            self.wal = WriteAheadLog(file_path, fsync=config.get("jsonserv.wal.fsync", True))
+            self.compact_bytes = config.get("jsonserv.wal.compact_bytes", 4 * 1024 * 1024)
+            self.compact_interval = config.get("jsonserv.wal.compact_interval", 60)
+            self._compact_event = threading.Event()
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name=f"jsonserv-compact-{file_path.stem}", daemon=True
+            )
+            self._compactor.start()
+        
+        # 可选的批量写入：窗口内的变更合并为一次落盘，调用方通过 durable() 等待
+        self.writer: Optional[BatchWriter] = None
+        if shared is not None:
+            self.writer = shared.writer
+        elif batch_writes is None:
+            batch_writes = config is not None and config.get("jsonserv.write_batch.enabled", False)
+        if batch_writes and shared is None:
+            self.writer = BatchWriter(
+                self._flush,
+                window=config.get("jsonserv.write_batch.window", 0.005) if config is not None else 0.005,
+                name=f"jsonserv-writer-{file_path.stem}",
+            )
     
     def load(self) -> Dict[str, Any]:
-        """加载 JSON 数据"""
+        """加载 JSON 数据（WAL 模式下加载快照后重放日志；其他进程写过文件时重新加载）"""
         if self._cache is not None:
+            if self.coherent or self._version is None:
+                self._refresh()
             return self._cache
         
+        with self._mutex:
+            if self._cache is not None:
+                return self._cache
+            if self._mapped is not None:
+                self.logger.info(f"{self.file_path.name} 由内存映射模式转为完整加载")
+                # 映射随仍在读取的迭代器释放后关闭
+                self._mapped = None
+            
+            try:
+                with self.lock:
+                    if (self.shared is None and not self.file_path.exists()
+                            and (self.wal is None or self.wal.size == 0)):
+                        # 创建空文件
+                        data = {"data": [], "primary_key": self.primary_key}
+                        self._write_snapshot([self._serialize(data)])
+                        records = []
+                    else:
+                        # 快照不存在但日志存在时从空数据重放
+                        data, records = self._read()
+                    version = self._disk_version()
+                self._adopt(data, records, version)
+                if records:
+                    self.logger.info(f"WAL 重放 {self.file_path.name}: {len(records)} 条记录")
+                return data
+            
+            except Exception as e:
+                self.logger.error(f"加载 JSON 文件失败 {self.file_path}: {e}")
+                return {"data": [], "primary_key": self.primary_key}
+    
+    def _read(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """读取快照与日志记录（调用方持有文件锁，不修改内存状态）"""
+        if self.shared is not None:
+            return self._select(*self.shared.read())
         if not self.file_path.exists():
-            # 创建空文件
             data = {"data": [], "primary_key": self.primary_key}
-            self.save(data)
-            return data
-        
-        try:
-            with self.lock:
-                with open(self.file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+        else:
+            with open(self.file_path, 'rb') as f:
+                data = jsoncodec.loads(f.read())
             
             # 处理数据格式
             if isinstance(data, list):
                 # 场景 A: 列表模式
                 data = {"data": data, "primary_key": self.primary_key}
             elif isinstance(data, dict):
-                # 场景 B: 对象模式
+                # 场景 B: 对象模式（路由层按集合拆分，见 objectfile.py；单独使用时取第一个值）
                 if "data" not in data:
                     # 如果根对象包含多个键，转换为标准格式
                     if "primary_key" not in data:
                         data = {"data": list(data.values())[0] if data else [], "primary_key": self.primary_key}
-            
-            self._cache = data
-            return data
         
-        except Exception as e:
-            self.logger.error(f"加载 JSON 文件失败 {self.file_path}: {e}")
-            return {"data": [], "primary_key": self.primary_key}
+        records = list(self.wal.replay(data.get(WAL_SEQ_KEY, 0))) if self.wal is not None else []
+        return data, records
     
-    def save(self, data: Dict[str, Any]):
-        """保存 JSON 数据"""
+    def _select(self, root: Dict[str, Any], records: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """从对象模式文件的根对象与日志中取出本集合的数据与记录"""
+        items = root.get(self.collection)
+        primary_key = root.get("primary_key")
+        data = {
+            "data": items if isinstance(items, list) else [],
+            "primary_key": primary_key if isinstance(primary_key, str) else self.primary_key,
+        }
+        next_ids = root.get(NEXT_ID_KEY)
+        if isinstance(next_ids, dict) and self.collection in next_ids:
+            data[NEXT_ID_KEY] = next_ids[self.collection]
+        return data, [record for record in records if record.get("collection") == self.collection]
+    
+    def _disk_version(self) -> tuple:
+        """
+        磁盘上的数据版本：快照与日志文件各自的 (mtime_ns, size, inode)
+        快照总是通过 os.replace 整体替换（inode 变化），日志只追加或清空（size 变化）
+        """
+        paths = (self.file_path,) if self.wal is None else (self.file_path, self.wal.path)
+        return tuple(_stat_version(path) for path in paths)
+    
+    def _adopt(self, data: Dict[str, Any], records: List[Dict[str, Any]], version: tuple,
+               local: Iterable[Dict[str, Any]] = ()):
+        """
+        切换到从磁盘读取的数据（调用方持有 _mutex）：重建索引，依次应用日志记录，
+        再在其上重放本进程尚未落盘的变更
+        """
+        self._build_index(data)
+        self._apply_records(data, records)
+        self._apply_records(data, local, local=True)
+        self._cache = data
+        self._version = version
+        if self.wal is not None:
+            self.wal.size = version[1][1] if version[1] is not None else 0
+    
+    def _stale(self) -> bool:
+        """磁盘版本是否与内存数据不同（未变化时只有一次 stat，按 check_interval 节流）"""
+        if self._version is None:
+            # 落盘失败后按磁盘内容重新加载（回滚未落盘的变更）
+            return True
+        if self.check_interval > 0:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+        return self._disk_version() != self._version
+    
+    def _refresh(self):
+        """其他进程写过文件时重新加载"""
+        if self._stale():
+            self._reload()
+    
+    def _reload(self):
+        """按最新磁盘版本重新加载；本进程正在落盘时跳过，落盘前会基于最新版本合并"""
+        if not self._write_lock.acquire(blocking=False):
+            return
         try:
             with self.lock:
-                with open(self.file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            self._cache = data
+                version = self._disk_version()
+                if version == self._version:
+                    return
+                data, records = self._read()
+            with self._mutex:
+                self._adopt(data, records, version, list(self._pending))
+            self.logger.info(f"{self.file_path.name} 已被其他进程修改，重新加载")
         except Exception as e:
-            self.logger.error(f"保存 JSON 文件失败 {self.file_path}: {e}")
-            raise
+            self.logger.error(f"重新加载 JSON 文件失败 {self.file_path}: {e}")
+        finally:
+            self._write_lock.release()
+    
+    def save(self, data: Dict[str, Any]):
+        """保存 JSON 数据（写入完整快照，WAL 模式下同时清空日志；以传入数据为准覆盖磁盘内容）"""
+        with self._mutex:
+            self._cache = data
+            self._version = self._disk_version()
+        if self.shared is not None:
+            self.shared.invalidate(self.collection)
+        self._flush(snapshot=True)
+    
+    @staticmethod
+    def _serialize(data: Dict[str, Any]) -> bytes:
+        return jsoncodec.dumps_pretty(data)
+    
+    @staticmethod
+    def _serialize_chunks(data: Dict[str, Any]) -> Iterator[bytes]:
+        """分块序列化：条目分批编码，大文件落盘时不会长时间持有 GIL"""
+        return jsoncodec.iter_pretty_object(data)
+    
+    def _write_snapshot(self, payload: Iterable[bytes]):
+        write_snapshot(self.file_path, payload)
+    
+    def _record(self, record: Dict[str, Any]):
+        """登记一条已应用到内存的变更（调用方持有 _mutex）"""
+        if self.collection is not None:
+            # 同一文件的集合共用 WAL，记录标明所属集合
+            record["collection"] = self.collection
+        self._pending.append(record)
+        if self._pending_future is None:
+            self._pending_future = Future()
+    
+    def _persist(self):
+        """
+        变更落盘：批量模式通知写线程，否则同步写入（调用方不持有 _mutex）
+        经异步接口调用时不在事件循环中写入，由 adurable() 放到线程池
+        """
+        if self.writer is not None:
+            self.writer.notify()
+        elif not _async_call.get():
+            self._flush()
+    
+    def _flush(self, snapshot: bool = False) -> int:
+        """
+        把待写变更落盘，返回合并的变更数：WAL 模式合并追加到日志，否则（或 snapshot=True）写入完整快照
+        在文件锁内先比对磁盘版本，其他进程写过时读取最新数据并重放本进程的变更（读-改-写）；
+        _mutex 内只取出变更并复制条目列表，序列化与 IO 在 _mutex 之外进行
+        对象模式下由所属文件合并所有集合的变更一起落盘
+        """
+        if self.shared is not None:
+            return self.shared.flush(snapshot)
+        if not self._pending and not snapshot:
+            return 0
+        with self._write_lock:
+            future = None
+            write_snapshot = snapshot or self.wal is None
+            try:
+                with self.lock:
+                    fresh = None
+                    if self.coherent and self._cache is not None:
+                        version = self._disk_version()
+                        if version != self._version:
+                            fresh = self._read() + (version,)
+                    
+                    with self._mutex:
+                        records, future = self._pending, self._pending_future
+                        self._pending, self._pending_future = [], None
+                        if fresh is not None:
+                            self._adopt(*fresh, local=records)
+                            self.logger.info(f"{self.file_path.name} 已被其他进程修改，基于最新版本写入")
+                        if not records and not snapshot:
+                            return 0
+                        # 只在 _mutex 内复制条目列表（条目更新总是替换为新对象），序列化在锁外进行
+                        frozen = None
+                        if write_snapshot and self._cache is not None:
+                            frozen = {**self._cache, "data": list(self._cache.get("data", [])),
+                                      NEXT_ID_KEY: self._next_id}
+                            if self.wal is not None:
+                                frozen[WAL_SEQ_KEY] = self.wal.seq
+                        self._inflight_future = future
+                    
+                    if write_snapshot:
+                        if frozen is not None:
+                            self._write_snapshot(self._serialize_chunks(frozen))
+                        if self.wal is not None:
+                            self.wal.truncate()
+                    else:
+                        self.wal.append(*records)
+                    self._version = self._disk_version()
+            except Exception as e:
+                target = self.wal.path if self.wal is not None and not write_snapshot else self.file_path
+                self.logger.error(f"保存 JSON 文件失败 {target}: {e}")
+                with self._mutex:
+                    if future is None:
+                        # 取出变更前失败（文件锁、读取最新版本）：这些变更同样不会落盘
+                        future = self._pending_future
+                        self._pending, self._pending_future = [], None
+                    self._rollback()
+                if future is not None:
+                    future.set_exception(e)
+                raise
+            finally:
+                self._inflight_future = None
+            
+            if future is not None:
+                future.set_result(None)
+        
+        if self.wal is not None and self.wal.size >= self.compact_bytes:
+            self._compact_event.set()
+        return len(records)
+    
+    def _rollback(self):
+        """
+        丢弃未能落盘的变更（调用方持有 _mutex）：下次访问时按磁盘内容重新加载，
+        只重放此后登记的变更，等待方通过持久化 Future 收到异常
+        """
+        self._version = None
+        self._checked_at = 0.0
+    
+    def durable(self) -> Future:
+        """
+        返回覆盖此前全部变更的持久化 Future
+        批量写入模式下 HTTP 处理函数在返回前等待它完成
+        """
+        with self._mutex:
+            future = self._pending_future or self._inflight_future
+        return future if future is not None else _done_future()
+    
+    def _apply_records(self, data: Dict[str, Any], records: Iterable[Dict[str, Any]], local: bool = False):
+        """
+        按顺序应用变更记录（WAL 重放，或把本进程的变更重放到其他进程写入后的数据上）
+        local=True 时自动生成的数字 ID 若已被其他进程占用则重新分配
+        """
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                item = record["item"]
+                key = item.get(self._index_key)
+                if local and record.get("auto") and isinstance(key, int) and self._rowid(key) is not None:
+                    item[self._index_key] = self._next_id
+                self._apply_add(data, item)
+            elif op == "update":
+                item = record["item"]
+                if record.get("partial"):
+                    # 局部更新记录只含修改的字段，合并到当前条目上
+                    rowid = self._rowid(record["key"])
+                    if rowid is None:
+                        continue
+                    item = {**self._rows[rowid], **item}
+                self._apply_update(data, record["key"], item)
+            elif op == "delete":
+                self._apply_delete(data, record["key"])
+    
+    def compact(self):
+        """将 WAL 压缩为 JSON 快照"""
+        if self.shared is not None:
+            return self.shared.compact()
+        if self.wal is None or self._cache is None:
+            return
+        if self.wal.size == 0 and not self._pending:
+            return
+        self._flush(snapshot=True)
+        self.logger.info(f"WAL 已压缩: {self.file_path.name}")
+    
+    def _compact_loop(self):
+        """后台压缩：日志超过大小阈值时立即压缩，否则按时间间隔压缩"""
+        while not self._closed:
+            self._compact_event.wait(self.compact_interval)
+            self._compact_event.clear()
+            if self._closed:
+                break
+            try:
+                self.compact()
+            except Exception as e:
+                self.logger.error(f"WAL 压缩失败 {self.file_path}: {e}")
+    
+    def close(self, flush: bool = True):
+        """
+        关闭存储：写出待写变更、压缩剩余日志并停止后台线程
+        flush=False 时只停止后台线程（文件已被删除，不重新创建）
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._mapped = None
+        if self.shared is not None:
+            # 写线程与日志属于所属文件，关闭任一集合时整个文件一起关闭
+            self.shared.close(flush)
+            return
+        if self.writer is not None:
+            self.writer.close()
+        if self.wal is not None:
+            self._compact_event.set()
+            self._compactor.join(timeout=5)
+        if not flush:
+            return
+        if self.wal is not None:
+            self.compact()
+        else:
+            self._flush()
+    
+    def _mapping(self, keys: bool = False) -> Optional[MappedArray]:
+        """
+        内存映射视图：首次访问时扫描建立，文件被替换后重建；keys=True 时同时建立主键索引
+        未启用、已完整加载、存在 WAL 记录或文件结构不支持时返回 None（调用方改为完整加载）
+        """
+        if not self.mmap_mode or self._cache is not None:
+            return None
+        mapped = self._mapped
+        if mapped is not None and (_async_call.get() or self._disk_version() == self._version):
+            # 异步接口已由 aload 检查过版本
+            if keys:
+                mapped.index_keys()
+            return mapped
+        with self._mutex:
+            if self._cache is not None:
+                return None
+            try:
+                with self.lock:
+                    version = self._disk_version()
+                    if self._mapped is not None and version == self._version:
+                        if keys:
+                            self._mapped.index_keys()
+                        return self._mapped
+                    if self.wal is not None and version[1] is not None and version[1][1] > 0:
+                        raise ValueError("存在未压缩的 WAL 记录")
+                    header = read_header(self.file_path)
+                    if header.data_offset is None:
+                        raise ValueError("根不是数组或含 data 数组的对象")
+                    mapped = MappedArray(self.file_path, header.data_offset, header.primary_key or self.primary_key)
+                # 映射建立后文件被替换也不影响读取，扫描与主键索引在文件锁之外进行
+                mapped.scan()
+                if keys:
+                    mapped.index_keys()
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"{self.file_path.name} 无法使用内存映射模式，改为完整加载: {e}")
+                self.mmap_mode = False
+                return None
+            self._mapped, self._version = mapped, version
+            self._index_key = mapped.primary_key
+            self.logger.info(f"{self.file_path.name} 内存映射模式: {len(mapped)} 条")
+            return mapped
     
     def get_items(self) -> List[Dict[str, Any]]:
         """获取所有数据项"""
         data = self.load()
         return data.get("data", [])
     
+    def _ensure_index(self) -> Dict[str, Any]:
+        """加载数据并在数据对象变化时重建索引（异步接口已在线程池中加载，不再检查磁盘）"""
+        if _async_call.get() and self._cache is not None:
+            data = self._cache
+        else:
+            data = self.load()
+        if self._indexed_data is not data:
+            self._build_index(data)
+        return data
+    
+    def _build_index(self, data: Dict[str, Any]):
+        """全量构建行号、主键索引、ID 计数器与已声明的二级索引"""
+        primary_key = data.get("primary_key", self.primary_key)
+        items = data.get("data", [])
+        index: Dict[Any, int] = {}
+        max_id = 0
+        for rowid, item in enumerate(items):
+            key = item.get(primary_key)
+            if isinstance(key, int) and key > max_id:
+                max_id = key
+            try:
+                index.setdefault(key, rowid)
+            except TypeError:
+                # 不可哈希的主键值不进入索引
+                pass
+        self._index = index
+        self._pk_duplicates = len(index) < len(items)
+        self._rows = dict(enumerate(items))
+        self._rowids = list(range(len(items)))
+        self._next_rowid = len(items)
+        self._index_key = primary_key
+        self._indexed_data = data
+        # 快照中保存的计数器可能大于现存最大 ID（末尾的条目已删除）
+        saved = data.get(NEXT_ID_KEY)
+        self._next_id = max(max_id + 1, saved if isinstance(saved, int) else 1)
+        self._secondary = {}
+        for field in self.index_fields:
+            self._hash_index(field)
+        for field in self.sort_index_fields:
+            self._sorted_index(field)
+    
+    def _rebuild_primary(self):
+        """重建主键索引（存在重复主键或主键被修改时）"""
+        index: Dict[Any, int] = {}
+        for rowid in self._rowids:
+            try:
+                index.setdefault(self._rows[rowid].get(self._index_key), rowid)
+            except TypeError:
+                pass
+        self._index = index
+        self._pk_duplicates = len(index) < len(self._rowids)
+    
+    def _rowid(self, item_id: Any) -> Optional[int]:
+        try:
+            return self._index.get(item_id)
+        except TypeError:
+            return None
+    
+    def _hash_index(self, field: str) -> HashIndex:
+        """获取字段等值索引，不存在时全量构建（首次使用时构建）"""
+        index = self._secondary.get(("hash", field))
+        if index is None:
+            index = HashIndex(field)
+            index.build(self._rows.items())
+            self._secondary[("hash", field)] = index
+        return index
+    
+    def _sorted_index(self, field: str) -> SortedIndex:
+        """获取字段有序索引，不存在时全量构建"""
+        index = self._secondary.get(("sorted", field))
+        if index is None:
+            index = SortedIndex(field)
+            index.build(self._rows.items())
+            self._secondary[("sorted", field)] = index
+        return index
+    
+    def _text_index(self) -> TextIndex:
+        """获取全文倒排索引，不存在时全量构建"""
+        index = self._secondary.get(("text", ""))
+        if index is None:
+            index = TextIndex()
+            index.build(self._rows.items())
+            self._secondary[("text", "")] = index
+        return index
+    
+    def _has_index(self, kind: str, field: str) -> bool:
+        """字段是否有（或允许自动建立）该类索引"""
+        return self.auto_index or (kind, field) in self._secondary
+    
+    def _apply_add(self, data: Dict[str, Any], item: Dict[str, Any]):
+        """追加数据项并维护索引"""
+        items = data.setdefault("data", [])
+        key = item.get(self._index_key)
+        if isinstance(key, int) and key >= self._next_id:
+            self._next_id = key + 1
+        rowid = self._next_rowid
+        self._next_rowid += 1
+        items.append(item)
+        self._rows[rowid] = item
+        self._rowids.append(rowid)
+        try:
+            if key in self._index:
+                self._pk_duplicates = True
+            else:
+                self._index[key] = rowid
+        except TypeError:
+            pass
+        for index in self._secondary.values():
+            index.add(rowid, item)
+    
+    def _apply_update(self, data: Dict[str, Any], item_id: Any, item: Dict[str, Any]) -> bool:
+        """替换数据项并维护索引"""
+        rowid = self._rowid(item_id)
+        if rowid is None:
+            return False
+        old = self._rows[rowid]
+        data["data"][bisect_left(self._rowids, rowid)] = item
+        self._rows[rowid] = item
+        for index in self._secondary.values():
+            index.remove(rowid, old)
+            index.add(rowid, item)
+        if item.get(self._index_key) != item_id:
+            # 修改了主键
+            self._rebuild_primary()
+        return True
+    
+    def _apply_delete(self, data: Dict[str, Any], item_id: Any) -> bool:
+        """删除数据项并维护索引"""
+        rowid = self._rowid(item_id)
+        if rowid is None:
+            return False
+        position = bisect_left(self._rowids, rowid)
+        data["data"].pop(position)
+        self._rowids.pop(position)
+        item = self._rows.pop(rowid)
+        for index in self._secondary.values():
+            index.remove(rowid, item)
+        del self._index[item_id]
+        if self._pk_duplicates:
+            # 同主键的后续条目接替
+            self._rebuild_primary()
+        return True
+    
     def get_item(self, item_id: Any) -> Optional[Dict[str, Any]]:
         """根据 ID 获取数据项"""
-        items = self.get_items()
-        primary_key = self.load().get("primary_key", self.primary_key)
-        
-        for item in items:
-            if item.get(primary_key) == item_id:
-                return item
-        return None
+        mapped = self._mapping()
+        if mapped is not None:
+            return mapped.get(item_id)
+        self._ensure_index()
+        rowid = self._rowid(item_id)
+        if rowid is None:
+            return None
+        return self._rows.get(rowid)
     
-    def add_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        """添加数据项"""
-        data = self.load()
-        items = data.get("data", [])
-        primary_key = data.get("primary_key", self.primary_key)
+    def _add(self, data: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, Any]:
+        """新增数据项并返回变更记录（调用方持有 _mutex）"""
+        primary_key = self._index_key
         
         # 如果没有 ID，自动生成
+        record = {"op": "add", "item": item}
         if primary_key not in item:
+            record["auto"] = True
             if primary_key == "id":
                 # 生成数字 ID
-                existing_ids = [i.get(primary_key, 0) for i in items if isinstance(i.get(primary_key), int)]
-                item[primary_key] = max(existing_ids, default=0) + 1
+                item[primary_key] = self._next_id
             else:
                 # 生成 UUID
                 item[primary_key] = str(uuid.uuid4())
         
-        items.append(item)
-        data["data"] = items
-        self.save(data)
+        self._apply_add(data, item)
+        return record
+    
+    def _update(self, data: Dict[str, Any], item_id: Any, item: Dict[str, Any],
+                partial: bool) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """更新数据项并返回 (新条目, 变更记录)，不存在时返回 None（调用方持有 _mutex）"""
+        rowid = self._rowid(item_id)
+        if rowid is None:
+            return None
+        if partial:
+            # 部分更新
+            new_item = {**self._rows[rowid], **item}
+            # 只记录修改的字段，与其他进程的写入合并时不覆盖其余字段
+            record = {"op": "update", "key": item_id, "item": dict(item), "partial": True}
+        else:
+            # 全量更新
+            item[self._index_key] = item_id
+            new_item = item
+            record = {"op": "update", "key": item_id, "item": new_item}
+        self._apply_update(data, item_id, new_item)
+        return new_item, record
+    
+    def add_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """添加数据项"""
+        with self._mutex:
+            data = self._ensure_index()
+            self._record(self._add(data, item))
+        self._persist()
         return item
     
     def update_item(self, item_id: Any, item: Dict[str, Any], partial: bool = False) -> Optional[Dict[str, Any]]:
         """更新数据项"""
-        data = self.load()
-        items = data.get("data", [])
-        primary_key = data.get("primary_key", self.primary_key)
-        
-        for i, existing_item in enumerate(items):
-            if existing_item.get(primary_key) == item_id:
-                if partial:
-                    # 部分更新
-                    items[i] = {**existing_item, **item}
-                else:
-                    # 全量更新
-                    item[primary_key] = item_id
-                    items[i] = item
-                data["data"] = items
-                self.save(data)
-                return items[i]
-        return None
+        with self._mutex:
+            data = self._ensure_index()
+            updated = self._update(data, item_id, item, partial)
+            if updated is None:
+                return None
+            new_item, record = updated
+            self._record(record)
+        self._persist()
+        return new_item
     
     def delete_item(self, item_id: Any) -> bool:
         """删除数据项"""
-        data = self.load()
-        items = data.get("data", [])
-        primary_key = data.get("primary_key", self.primary_key)
+        with self._mutex:
+            data = self._ensure_index()
+            if not self._apply_delete(data, item_id):
+                return False
+            self._record({"op": "delete", "key": item_id})
+        self._persist()
+        return True
+    
+    def bulk(self, operations: List[Dict[str, Any]], atomic: bool = False) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        批量变更：整批在一次加锁内应用，合并为一次落盘
+        
+        Args:
+            operations: 操作列表，每项为 {"op": insert|update|patch|delete, "id": 主键, "item": 数据}
+            atomic: 全部成功或全部不生效；任一操作失败时回滚整批
+        
+        Returns:
+            (是否已应用, 每个操作的结果 {"status": 状态码, "item"/"error": ...})
+        """
+        results: List[Dict[str, Any]] = []
+        records: List[Dict[str, Any]] = []
+        with self._mutex:
+            data = self._ensure_index()
+            if atomic:
+                saved_items, saved_next_id = list(data.get("data", [])), self._next_id
+            
+            for operation in operations:
+                result = self._bulk_apply(data, operation, records)
+                results.append(result)
+                if atomic and result["status"] >= 400:
+                    break
+            
+            failed = any(result["status"] >= 400 for result in results)
+            if atomic and failed:
+                # 回滚：恢复条目列表（更新均替换为新对象，原条目未被修改）并重建索引
+                data["data"] = saved_items
+                self._build_index(data)
+                self._next_id = saved_next_id
+                for result in results:
+                    if result["status"] < 400:
+                        result.update(status=424, error="因同批操作失败未执行")
+                        result.pop("item", None)
+                results.extend({"status": 424, "error": "因同批操作失败未执行"}
+                               for _ in range(len(operations) - len(results)))
+                return False, results
+            
+            for record in records:
+                self._record(record)
+        if records:
+            self._persist()
+        return True, results
+    
+    def _bulk_apply(self, data: Dict[str, Any], operation: Any, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """应用单个批量操作，成功时把变更记录追加到 records"""
+        if not isinstance(operation, dict):
+            return {"status": 400, "error": "操作必须是对象"}
+        op = operation.get("op")
+        item = operation.get("item")
+        if op in ("insert", "update", "patch") and not isinstance(item, dict):
+            return {"status": 400, "error": "缺少 item 对象"}
+        if op in ("update", "patch", "delete") and "id" not in operation:
+            return {"status": 400, "error": "缺少 id"}
         
-        for i, item in enumerate(items):
-            if item.get(primary_key) == item_id:
-                items.pop(i)
-                data["data"] = items
-                self.save(data)
-                return True
-        return False
+        if op == "insert":
+            records.append(self._add(data, dict(item)))
+            return {"status": 200, "item": records[-1]["item"]}
+        if op in ("update", "patch"):
+            updated = self._update(data, operation["id"], dict(item), partial=(op == "patch"))
+            if updated is None:
+                return {"status": 404, "error": "资源不存在"}
+            records.append(updated[1])
+            return {"status": 200, "item": updated[0]}
+        if op == "delete":
+            if not self._apply_delete(data, operation["id"]):
+                return {"status": 404, "error": "资源不存在"}
+            records.append({"op": "delete", "key": operation["id"]})
+            return {"status": 200}
+        return {"status": 400, "error": f"不支持的操作: {op}"}
+    
+    def _plan(self, conditions: List[Condition]) -> Optional[Set[int]]:
+        """
+        按条件筛选 rowid（无条件时返回 None 表示全部）
+        可走索引的条件按估算的匹配数从小到大执行：最小的作为驱动集合，
+        其余条件匹配数不大时求交集，否则对驱动集合逐条校验
+        """
+        indexed = []
+        residual = []
+        for condition in conditions:
+            field, op, value = condition
+            if op == OP_EQ and self._has_index("hash", field):
+                index = self._hash_index(field)
+                indexed.append((index.count(value), lambda i=index, v=value: i.lookup(v), condition))
+            elif op == OP_RANGE and self._has_index("sorted", field):
+                index = self._sorted_index(field)
+                start, stop = index.bounds(*value)
+                indexed.append((stop - start, lambda i=index, a=start, b=stop: set(i.rowids(a, b)), condition))
+            else:
+                residual.append(condition)
+        
+        if not indexed and not residual:
+            return None
+        
+        candidates: Optional[Set[int]] = None
+        indexed.sort(key=lambda entry: entry[0])
+        for estimate, fetch, condition in indexed:
+            if candidates is None:
+                candidates = fetch()
+            elif estimate <= len(candidates) * 8:
+                candidates &= fetch()
+            else:
+                residual.append(condition)
+            if not candidates:
+                return set()
+        
+        rows = self._rows
+        if candidates is None:
+            candidates = set(self._rowids)
+        if residual:
+            candidates = {
+                rowid for rowid in candidates
+                if all(matches(rows[rowid], condition) for condition in residual)
+            }
+        return candidates
+    
+    def _search(self, rowids: Optional[Set[int]],
+                search: Optional[str]) -> Tuple[Optional[Set[int]], Optional[Dict[int, float]]]:
+        """
+        全文搜索：有倒排索引时按词定位候选条目并打分，否则逐条子串匹配（两者结果相同）
+        
+        Returns:
+            (筛选后的 rowid, rowid -> 相关度；未走倒排索引时为 None)
+        """
+        terms = search_terms(search) if search else []
+        if not terms:
+            return rowids, None
+        if self._has_index("text", ""):
+            scores = self._text_index().search(terms, self._rows)
+            if scores is not None:
+                return (set(scores) if rowids is None else rowids & scores.keys()), scores
+        # 没有可检索的词（如只有标点）或未启用索引：逐条匹配，结果与索引检索相同
+        rows = self._rows
+        return {
+            rowid for rowid in (self._rowids if rowids is None else rowids)
+            if item_matches(rows[rowid], terms)
+        }, None
+    
+    def _order(self, rowids: Optional[Set[int]], sort: Optional[str], reverse: bool,
+               stop: Optional[int] = None) -> List[int]:
+        """
+        输出顺序：未指定排序时按原始顺序；有有序索引时直接按索引输出
+        （结果集较小时按排序键排序，相同排序键按原始顺序）
+        stop: 只需要前 stop 条时，按索引扫描到足够数量即停止
+        """
+        if not sort:
+            return self._rowids if rowids is None else sorted(rowids)
+        rows = self._rows
+        if self._has_index("sorted", sort):
+            index = self._sorted_index(sort)
+            if rowids is None:
+                return index.rowids(reverse=reverse)
+            if len(rowids) * max(len(rowids).bit_length(), 1) < len(index.entries):
+                return sorted(rowids, key=lambda r: item_sort_key(rows[r], sort) + (r,), reverse=reverse)
+            entries = reversed(index.entries) if reverse else iter(index.entries)
+            matched = (entry[-1] for entry in entries if entry[-1] in rowids)
+            return list(islice(matched, stop))
+        ordered = self._rowids if rowids is None else rowids
+        return sorted(ordered, key=lambda r: item_sort_key(rows[r], sort) + (r,), reverse=reverse)
     
     def query(self, filters: Dict[str, Any] = None, sort: str = None, order: str = "asc", 
               page: int = None, limit: int = None, start: int = None, end: int = None,
               search: str = None) -> List[Dict[str, Any]]:
+        """查询数据（参数见 query_page）"""
+        _, items = self.query_page(filters, sort, order, page, limit, start, end, search)
+        return items if isinstance(items, list) else list(items)
+    
+    def query_page(self, filters: Dict[str, Any] = None, sort: str = None, order: str = "asc",
+                   page: int = None, limit: int = None, start: int = None, end: int = None,
+                   search: str = None) -> Tuple[int, Iterable[Dict[str, Any]]]:
         """
-        查询数据
+        查询数据，返回 (分页前的匹配总数, 当前页条目)
+        当前页条目按需逐条读取（流式响应不复制整个结果列表）
         
         Args:
-            filters: 字段过滤条件
+            filters: 字段过滤条件（值为列表时任一匹配；列表字段按成员匹配；
+                     值按字符串比较，查询字符串中的 true / 3 可匹配布尔值与数字；
+                     支持 field_gte / field_lte / field_ne / field_like / field_in）
             sort: 排序字段
             order: 排序方向 (asc/desc)
             page: 页码（从1开始）
             limit: 每页数量
             start: 起始索引
             end: 结束索引
-            search: 全文搜索关键词
+            search: 全文搜索关键词（各词或"短语"按子串匹配字段值，多个词同时匹配；有倒排索引且未指定排序时按相关度排序）
         """
-        items = self.get_items()
-        
-        # 字段过滤
-        if filters:
-            filtered_items = []
-            for item in items:
-                match = True
-                for key, value in filters.items():
-                    if key.startswith("_"):  # 跳过特殊参数
-                        continue
-                    item_value = item.get(key)
-                    if isinstance(item_value, list):
-                        # 列表包含检查
-                        if value not in item_value:
-                            match = False
-                            break
-                    elif item_value != value:
-                        match = False
-                        break
-                if match:
-                    filtered_items.append(item)
-            items = filtered_items
-        
-        # 全文搜索
-        if search:
-            search_lower = search.lower()
-            items = [
-                item for item in items
-                if any(search_lower in str(v).lower() for v in item.values())
-            ]
-        
-        # 排序
-        if sort:
-            reverse = (order.lower() == "desc")
-            try:
-                items.sort(key=lambda x: x.get(sort, ""), reverse=reverse)
-            except Exception:
-                pass
-        
-        # 分页或切片
+        conditions = parse_conditions(filters)
+        # 分页或切片（_page/_limit 优先，否则 _start/_end）
         if page is not None and limit is not None:
             start = (page - 1) * limit
             end = start + limit
-        elif start is not None:
-            end = end if end is not None else len(items)
         
-        if start is not None and end is not None:
-            items = items[start:end]
+        mapped = self._mapping() if not conditions and not sort and not search else None
+        if mapped is not None:
+            # 内存映射模式：只解码当前页
+            total = len(mapped)
+            first, last = slice(start, end).indices(total)[:2] if start is not None else (0, total)
+            return total, mapped.items(first, max(first, last))
         
-        return items
+        with self._mutex:
+            data = self._ensure_index()
+            rowids, scores = self._search(self._plan(conditions), search)
+            
+            reverse = (order or "asc").lower() == "desc"
+            
+            if rowids is None and not sort:
+                # 使用 _ensure_index 返回的数据（异步接口下不在事件循环中检查磁盘或重新加载）
+                items = data.get("data", [])
+                total = len(items)
+                return total, items[start:end] if start is not None else list(items)
+            
+            total = len(self._rowids) if rowids is None else len(rowids)
+            if scores is not None and not sort:
+                # 未指定排序时按相关度排序，分数相同按原始顺序
+                ordered = sorted(rowids, key=lambda r: (-scores[r], r))
+                if start is not None:
+                    ordered = ordered[start:end]
+                return total, self._iter_rows(ordered)
+            
+            if rowids is None and start is not None and self._has_index("sorted", sort):
+                # 无过滤条件：直接从有序索引截取当前页
+                index = self._sorted_index(sort)
+                first, last = slice(start, end).indices(total)[:2]
+                last = max(first, last)
+                if reverse:
+                    first, last = total - last, total - first
+                return total, self._iter_rows(index.rowids(first, last, reverse))
+            
+            # 排序（索引按 rowid 区分相同排序键，存储中的顺序不变）
+            needed = end if start is not None and start >= 0 and end is not None and end >= 0 else None
+            ordered = self._order(rowids, sort, reverse, needed)
+            if start is not None:
+                ordered = ordered[start:end]
+            elif ordered is self._rowids:
+                ordered = list(ordered)
+            return total, self._iter_rows(ordered)
+    
+    def query_cursor(self, filters: Dict[str, Any] = None, sort: str = None, order: str = "asc",
+                     limit: int = 20, cursor: Optional[str] = None,
+                     search: str = None) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+        """
+        游标（keyset）分页：按 (排序键, 主键) 顺序，从游标位置在有序索引中直接定位下一页，
+        不对整个结果集排序和跳过；翻页期间插入的新条目不会使已有条目重复或遗漏
+        
+        Args:
+            filters / search: 同 query_page
+            sort: 排序字段（默认主键），order: 排序方向；传入游标时以游标中的为准
+            limit: 每页数量
+            cursor: 上一页返回的游标，为空时从第一页开始
+        
+        Returns:
+            (匹配总数, 当前页条目, 下一页游标；没有更多时为 None)
+        
+        Raises:
+            ValueError: 游标无效
+        """
+        anchor = decode_cursor(cursor) if cursor else None
+        if anchor is not None:
+            sort, order = anchor["sort"], anchor["order"]
+        reverse = (order or "asc").lower() == "desc"
+        conditions = parse_conditions(filters)
+        with self._mutex:
+            self._ensure_index()
+            sort = sort or self._index_key
+            rowids, _ = self._search(self._plan(conditions), search)
+            total = len(self._rowids) if rowids is None else len(rowids)
+            
+            entries = self._sorted_index(sort).entries
+            if anchor is None:
+                position = len(entries) if reverse else 0
+            else:
+                key = tuple(anchor["key"])
+                rowid = anchor["rowid"]
+                # 游标条目仍存在且排序键未变时以当前 rowid 为准（进程重启后 rowid 会重新分配）
+                current = self._rowid(anchor["pk"])
+                if current is not None and item_sort_key(self._rows[current], sort) == key:
+                    rowid = current
+                position = (bisect_left if reverse else bisect_right)(entries, key + (rowid,))
+            
+            positions = range(position - 1, -1, -1) if reverse else range(position, len(entries))
+            page: List[int] = []
+            for i in positions:
+                candidate = entries[i][-1]
+                if rowids is None or candidate in rowids:
+                    page.append(candidate)
+                    if len(page) > limit:
+                        break
+            
+            next_cursor = None
+            if len(page) > limit:
+                page = page[:limit]
+                last = self._rows[page[-1]]
+                next_cursor = encode_cursor(sort, "desc" if reverse else "asc",
+                                            item_sort_key(last, sort), last.get(self._index_key), page[-1])
+            rows = self._rows
+            return total, [rows[rowid] for rowid in page], next_cursor
+    
+    def _iter_rows(self, rowids: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """按 rowid 逐条读取条目，跳过读取期间被删除的条目"""
+        rows = self._rows
+        return (item for item in map(rows.get, rowids) if item is not None)
     
     def get_field(self, item_id: Any, field: str) -> Any:
         """获取数据项的特定字段"""
@@ -212,3 +1078,100 @@ class JSONDataStore:
     def set_field(self, item_id: Any, field: str, value: Any) -> Optional[Dict[str, Any]]:
         """设置数据项的特定字段"""
         return self.update_item(item_id, {field: value}, partial=True)
+    
+    # ---- 异步接口：供 async 路由调用，不阻塞事件循环 ----
+    # 内存操作直接在事件循环中执行；JSON 解析、序列化、文件锁与文件 IO 放到线程池
+    
+    def _loop_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._async_lock is None or self._async_loop is not loop:
+            self._async_lock, self._async_loop = asyncio.Lock(), loop
+        return self._async_lock
+    
+    async def aload(self, full: bool = True, keys: bool = False):
+        """
+        首次加载，或磁盘版本变化时重新加载（在线程池中进行）
+        full=False 时内存映射模式下只建立映射视图，keys=True 时同时建立其主键索引
+        """
+        if not full and self._cache is None and self.mmap_mode:
+            mapped = self._mapped
+            if mapped is None or self._disk_version() != self._version or (keys and not mapped.keyed):
+                async with self._loop_lock():
+                    await asyncio.get_running_loop().run_in_executor(None, self._mapping, keys)
+            if self.mmap_mode:
+                return
+        if self._cache is not None and not ((self.coherent or self._version is None) and self._stale()):
+            return
+        lock = self._loop_lock()
+        if self._cache is not None and lock.locked():
+            # 正在加载或落盘：先使用内存中的数据，不排队等待
+            return
+        async with lock:
+            loop = asyncio.get_running_loop()
+            if self._cache is None:
+                await loop.run_in_executor(None, self.load)
+            elif self._disk_version() != self._version:
+                await loop.run_in_executor(None, self._reload)
+    
+    async def _acall(self, method, *args, _full: bool = True, _keys: bool = False, **kwargs):
+        """在事件循环中执行内存操作（数据已由 aload 加载）"""
+        await self.aload(_full, _keys)
+        token = _async_call.set(True)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _async_call.reset(token)
+    
+    async def adurable(self):
+        """等待此前的变更落盘；未启用写线程时在线程池中写入"""
+        if self.writer is None and self._pending:
+            async with self._loop_lock():
+                await asyncio.get_running_loop().run_in_executor(None, self._flush)
+        future = self.durable()
+        if not future.done():
+            await asyncio.wrap_future(future)
+    
+    async def aget_item(self, item_id: Any) -> Optional[Dict[str, Any]]:
+        return await self._acall(self.get_item, item_id, _full=False, _keys=True)
+    
+    async def aget_field(self, item_id: Any, field: str) -> Any:
+        return await self._acall(self.get_field, item_id, field, _full=False, _keys=True)
+    
+    async def aquery_page(self, **kwargs) -> Tuple[int, Iterable[Dict[str, Any]]]:
+        full = bool(parse_conditions(kwargs.get("filters")) or kwargs.get("sort") or kwargs.get("search"))
+        return await self._acall(self.query_page, _full=full, **kwargs)
+    
+    async def aquery_cursor(self, **kwargs) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+        return await self._acall(self.query_cursor, **kwargs)
+    
+    async def aadd_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """添加数据项，落盘后返回"""
+        result = await self._acall(self.add_item, item)
+        await self.adurable()
+        return result
+    
+    async def aupdate_item(self, item_id: Any, item: Dict[str, Any],
+                           partial: bool = False) -> Optional[Dict[str, Any]]:
+        """更新数据项，落盘后返回"""
+        result = await self._acall(self.update_item, item_id, item, partial=partial)
+        if result is not None:
+            await self.adurable()
+        return result
+    
+    async def adelete_item(self, item_id: Any) -> bool:
+        """删除数据项，落盘后返回"""
+        result = await self._acall(self.delete_item, item_id)
+        if result:
+            await self.adurable()
+        return result
+    
+    async def aset_field(self, item_id: Any, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        return await self.aupdate_item(item_id, {field: value}, partial=True)
+    
+    async def abulk(self, operations: List[Dict[str, Any]],
+                    atomic: bool = False) -> Tuple[bool, List[Dict[str, Any]]]:
+        """批量变更，落盘后返回"""
+        applied, results = await self._acall(self.bulk, operations, atomic=atomic)
+        if applied:
+            await self.adurable()
+        return applied, results
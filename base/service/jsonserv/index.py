@@ -0,0 +1,294 @@
+"""
+jsonserv 二级索引
+条目以内部行号（rowid）登记；rowid 按插入顺序递增，与 data 列表顺序一致，
+因此按 rowid 排序即可恢复原始顺序
+"""
+import json
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+def normalize(value: Any) -> str:
+    """
+    把字段值规范化为字符串，便于与查询字符串中的值比较
+    （?published=true 匹配 True，?id=3 匹配 3）
+    """
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def field_keys(item: Dict[str, Any], field: str) -> List[str]:
+    """条目在字段上的索引键：列表字段按元素登记（成员查询），字段不存在时无键"""
+    if field not in item:
+        return []
+    value = item[field]
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    return [normalize(value)]
+
+
+class HashIndex:
+    """字段等值索引：规范化值 -> rowid 集合"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self._map: Dict[str, Set[int]] = {}
+
+    def build(self, rows: Iterable):
+        """rows: (rowid, item) 序列"""
+        self._map.clear()
+        for rowid, item in rows:
+            self.add(rowid, item)
+
+    def add(self, rowid: int, item: Dict[str, Any]):
+        for key in field_keys(item, self.field):
+            bucket = self._map.get(key)
+            if bucket is None:
+                bucket = self._map[key] = set()
+            bucket.add(rowid)
+
+    def remove(self, rowid: int, item: Dict[str, Any]):
+        for key in field_keys(item, self.field):
+            bucket = self._map.get(key)
+            if bucket is not None:
+                bucket.discard(rowid)
+                if not bucket:
+                    del self._map[key]
+
+    def lookup(self, keys: Iterable[str]) -> Set[int]:
+        """任一值匹配的 rowid 集合"""
+        result: Set[int] = set()
+        for key in keys:
+            bucket = self._map.get(key)
+            if bucket:
+                result |= bucket
+        return result
+
+    def count(self, keys: Iterable[str]) -> int:
+        """匹配数量的上界（用于选择最有选择性的索引）"""
+        return sum(len(self._map.get(key, ())) for key in keys)
+
+
+# 字段缺失的条目排在最前（与旧实现按 "" 排序时一致）
+MISSING = (-1,)
+_INF = float("inf")
+
+
+def sort_key(value: Any) -> tuple:
+    """可跨类型比较的排序键：None < 布尔 < 数字 < 字符串 < 其他"""
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (1, int(value))
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, normalize(value))
+
+
+def item_sort_key(item: Dict[str, Any], field: str) -> tuple:
+    return sort_key(item[field]) if field in item else MISSING
+
+
+class SortedIndex:
+    """
+    字段有序索引：按 (排序键..., rowid) 排序的列表
+    区间查询与排序输出都通过 bisect 定位，不逐条比较
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.entries: List[tuple] = []
+
+    def build(self, rows: Iterable):
+        self.entries = sorted(item_sort_key(item, self.field) + (rowid,) for rowid, item in rows)
+
+    def add(self, rowid: int, item: Dict[str, Any]):
+        insort(self.entries, item_sort_key(item, self.field) + (rowid,))
+
+    def remove(self, rowid: int, item: Dict[str, Any]):
+        entry = item_sort_key(item, self.field) + (rowid,)
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            self.entries.pop(position)
+
+    def bounds(self, low: Any = None, high: Any = None):
+        """
+        返回 [low, high] 闭区间在 entries 中的位置范围 (start, stop)
+        区间只在与边界值同类型的值中取（views_gte=10 不会匹配字符串）
+        """
+        rank = sort_key(low if low is not None else high)[0]
+        if low is not None:
+            start = bisect_left(self.entries, sort_key(low))
+        else:
+            start = bisect_left(self.entries, (rank,))
+        if high is not None:
+            stop = bisect_right(self.entries, sort_key(high) + (_INF,))
+        else:
+            stop = bisect_left(self.entries, (rank + 1,))
+        return start, max(start, stop)
+
+    def rowids(self, start: int = 0, stop: Optional[int] = None, reverse: bool = False) -> List[int]:
+        entries = self.entries[start:stop]
+        if reverse:
+            entries.reverse()
+        return [entry[-1] for entry in entries]
+
+
+
+# 中日韩文字按字切分（单字 + 相邻二字），其他文字按词切分
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RE = re.compile(f"[{_CJK}]+|(?:(?![{_CJK}])\\w)+")
+_CJK_RE = re.compile(f"[{_CJK}]")
+
+
+def tokenize(text: str) -> List[str]:
+    """分词：中日韩文字输出单字与二字组，其他文字输出小写单词"""
+    tokens: List[str] = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if not _CJK_RE.match(run) or len(run) == 1:
+            tokens.append(run)
+            continue
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def item_texts(item: Dict[str, Any]) -> List[str]:
+    """条目中参与全文检索的文本：每个字段值的字符串形式（小写；嵌套对象、列表、布尔值同样参与）"""
+    return [str(value).lower() for value in item.values()]
+
+
+def search_terms(search: str) -> List[str]:
+    """
+    解析搜索串：引号内为短语，其余按空白分隔，各项之间为“与”；末尾的 * 可省略（foo* 与 foo 相同）
+    每一项按不区分大小写的子串匹配字段值，单个词与逐条扫描 str(value) 的结果一致
+    """
+    terms = re.findall(r'"([^"]+)"', search)
+    terms += [word.rstrip("*") or word for word in re.sub(r'"[^"]*"', " ", search).split()]
+    return [term.lower() for term in terms]
+
+
+def item_matches(item: Dict[str, Any], terms: List[str]) -> bool:
+    """条目是否包含全部搜索项（未建索引时逐条匹配，建索引时校验候选条目）"""
+    texts = item_texts(item)
+    return all(any(term in text for text in texts) for term in terms)
+
+
+class TextIndex:
+    """
+    倒排索引：词 -> {rowid: 词频}；词表有序保存
+    搜索项按词定位候选条目（两端的词可能只是索引词的一部分：开头的词匹配词尾，结尾的词按前缀用 bisect 定位，
+    只有一个词时匹配包含它的索引词），再逐条校验子串，结果与未建索引时相同
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulary: List[str] = []
+        self.size = 0
+
+    def build(self, rows: Iterable):
+        self._postings = {}
+        self.size = 0
+        for rowid, item in rows:
+            for token, count in Counter(self._tokens(item)).items():
+                self._postings.setdefault(token, {})[rowid] = count
+            self.size += 1
+        self._vocabulary = sorted(self._postings)
+
+    @staticmethod
+    def _tokens(item: Dict[str, Any]) -> List[str]:
+        tokens = []
+        for text in item_texts(item):
+            tokens.extend(tokenize(text))
+        return tokens
+
+    def add(self, rowid: int, item: Dict[str, Any]):
+        for token, count in Counter(self._tokens(item)).items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            posting[rowid] = count
+        self.size += 1
+
+    def remove(self, rowid: int, item: Dict[str, Any]):
+        for token in set(self._tokens(item)):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(rowid, None)
+            if not posting:
+                del self._postings[token]
+                position = bisect_left(self._vocabulary, token)
+                if position < len(self._vocabulary) and self._vocabulary[position] == token:
+                    self._vocabulary.pop(position)
+        self.size -= 1
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        stop = bisect_left(self._vocabulary, prefix + "\U0010ffff")
+        return self._vocabulary[start:stop]
+
+    def _words(self, term: str, run: str, first: bool, last: bool) -> List[str]:
+        """搜索项中的一个（非中日韩）词在文本中可能对应的索引词"""
+        open_start = first and term.startswith(run)
+        open_end = last and term.endswith(run)
+        if open_start and open_end:
+            return [word for word in self._vocabulary if run in word]
+        if open_start:
+            return [word for word in self._vocabulary if word.endswith(run)]
+        if open_end:
+            return self._expand(run)
+        return [run]
+
+    def _score(self, words: Iterable[str]) -> Dict[int, float]:
+        """命中任一索引词的条目及其 TF-IDF 分数"""
+        scores: Dict[int, float] = {}
+        for word in words:
+            posting = self._postings.get(word)
+            if not posting:
+                continue
+            idf = math.log(1 + self.size / len(posting))
+            for rowid, count in posting.items():
+                scores[rowid] = scores.get(rowid, 0.0) + count * idf
+        return scores
+
+    def search(self, terms: List[str], rows: Dict[int, Dict[str, Any]]) -> Optional[Dict[int, float]]:
+        """
+        检索并打分（TF-IDF）
+
+        Returns:
+            rowid -> 分数；搜索项中没有可检索的词（如只有标点）时返回 None
+        """
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            runs = _TOKEN_RE.findall(term)
+            for position, run in enumerate(runs):
+                if _CJK_RE.match(run):
+                    # 中日韩文字：各二字组（单字时为该字）都必须出现
+                    groups = [[run]] if len(run) == 1 else [[run[i:i + 2]] for i in range(len(run) - 1)]
+                else:
+                    groups = [self._words(term, run, position == 0, position == len(runs) - 1)]
+                for words in groups:
+                    run_scores = self._score(words)
+                    if scores is None:
+                        scores = run_scores
+                    else:
+                        scores = {r: s + run_scores[r] for r, s in scores.items() if r in run_scores}
+                    if not scores:
+                        return {}
+        if scores is None:
+            return None
+        return {r: s for r, s in scores.items() if item_matches(rows[r], terms)}
@@ -0,0 +1,210 @@
+"""
+jsonserv 大文件只读访问
+- read_header: 只读取文件头尾确定主键与 data 数组位置，不解析整个文件
+- MappedArray: mmap 映射文件，扫描一次 data 数组记录每条记录的字节区间，按需解码
+"""
+import json
+import mmap
+import re
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+from module import jsoncodec
+
+
+# 文件头/尾读取的字节数
+HEADER_BYTES = 65536
+
+# 正则均为展开写法（字符串整体跳过，其中的括号不计），无回溯
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# 不含嵌套括号的记录（常见情况）：一次匹配一条
+_FLAT_RECORD_RE = re.compile(rb'[\s,]*(\{[^"\[\]{}]*(?:' + _STRING + rb'[^"\[\]{}]*)*\})', re.DOTALL)
+_ARRAY_END_RE = re.compile(rb'\s*\]')
+# 一次匹配：若干非括号字符 + 一个括号，用于含嵌套结构的记录
+_STRUCTURE_RE = re.compile(rb'[^"\[\]{}]*(?:' + _STRING + rb'[^"\[\]{}]*)*[\[\]{}]', re.DOTALL)
+_OPEN = (ord("["), ord("{"))
+_WHITESPACE = " \t\r\n"
+
+
+class Header(NamedTuple):
+    primary_key: Optional[str]   # 文件中声明的主键，未声明时为 None
+    data_offset: Optional[int]   # 记录数组 "[" 的字节偏移（根为数组时为其位置），无法确定时为 None
+
+
+def _skip(text: str, position: int) -> int:
+    while text[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+def _tail_primary_key(path: Path, size: int) -> Optional[str]:
+    """在文件尾部查找根对象的 primary_key（快照按 data、primary_key 的顺序写出）"""
+    with open(path, "rb") as f:
+        f.seek(max(0, size - HEADER_BYTES))
+        tail = f.read().decode("utf-8", errors="ignore")
+    for match in reversed(list(re.finditer(r'"primary_key"\s*:', tail))):
+        # 根对象的最后几个成员补上 "{" 后是合法 JSON；条目内的同名字段后面还有 "]}"，解析失败
+        try:
+            members = json.loads("{" + tail[match.start():])
+        except ValueError:
+            continue
+        value = members.get("primary_key") if isinstance(members, dict) else None
+        return value if isinstance(value, str) else None
+    return None
+
+
+def read_header(path: Path) -> Header:
+    """读取文件头（必要时加上文件尾）确定主键与记录数组位置"""
+    path = Path(path)
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+    text = head.decode("utf-8", errors="ignore")
+    decoder = json.JSONDecoder()
+    primary_key: Optional[str] = None
+    data_offset: Optional[int] = None
+    complete = False
+
+    try:
+        position = _skip(text, 0)
+        if text[position] == "[":
+            return Header(None, len(text[:position].encode("utf-8")))
+        if text[position] != "{":
+            return Header(None, None)
+        position = _skip(text, position + 1)
+        while text[position] != "}":
+            key, position = decoder.raw_decode(text, position)
+            position = _skip(text, position)
+            if text[position] != ":":
+                return Header(None, None)
+            position = _skip(text, position + 1)
+            if key == "data" and text[position] == "[":
+                data_offset = len(text[:position].encode("utf-8"))
+            # 值超出文件头（通常是 data 数组）时改为在文件尾查找
+            value, position = decoder.raw_decode(text, position)
+            if key == "primary_key" and isinstance(value, str):
+                primary_key = value
+            position = _skip(text, position)
+            if text[position] == ",":
+                position = _skip(text, position + 1)
+        complete = True
+    except (IndexError, ValueError):
+        pass
+
+    if primary_key is None and not complete and size > len(head):
+        primary_key = _tail_primary_key(path, size)
+    return Header(primary_key, data_offset)
+
+
+class MappedArray:
+    """data 数组的只读映射：每条记录的字节区间 + 主键到行号的索引，条目按需解码"""
+
+    def __init__(self, path: Path, offset: int, primary_key: str):
+        """
+        Args:
+            path: JSON 文件
+            offset: 记录数组 "[" 的字节偏移
+            primary_key: 主键字段
+        """
+        self.primary_key = primary_key
+        self._offset = offset
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._starts = array("q")
+        self._ends = array("q")
+        self._keys: Optional[Dict[Any, int]] = None
+
+    def scan(self):
+        """扫描记录数组，记录每条记录的起止偏移"""
+        mm = self._mm
+        if mm[self._offset] != ord("["):
+            raise ValueError("记录数组位置无效")
+        starts, ends = self._starts, self._ends
+        position = self._offset + 1
+        while True:
+            match = _FLAT_RECORD_RE.match(mm, position)
+            if match is not None:
+                start, position = match.span(1)
+            elif _ARRAY_END_RE.match(mm, position) is not None:
+                return
+            else:
+                start, position = self._scan_nested(position)
+            starts.append(start)
+            ends.append(position)
+
+    def _scan_nested(self, position: int):
+        """逐个括号扫描一条含嵌套结构的记录，返回 (起始偏移, 结束偏移)"""
+        mm = self._mm
+        depth = 0
+        start = position
+        for match in _STRUCTURE_RE.finditer(mm, position):
+            bracket = match.end() - 1
+            if mm[bracket] in _OPEN:
+                if depth == 0:
+                    start = bracket
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return start, bracket + 1
+                if depth < 0:
+                    break
+        raise ValueError("记录数组不完整")
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def item(self, rowid: int) -> Dict[str, Any]:
+        return jsoncodec.loads(self._mm[self._starts[rowid]:self._ends[rowid]])
+
+    def items(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """按需逐条解码 [start, stop) 的条目"""
+        for rowid in range(start, len(self) if stop is None else stop):
+            yield self.item(rowid)
+
+    def _build_keys(self) -> Dict[Any, int]:
+        """主键 -> 行号（重复主键取第一条）；主键为记录的第一个字段时只解码主键值"""
+        key_re = re.compile(
+            rb'\{\s*' + re.escape(json.dumps(self.primary_key, ensure_ascii=False).encode("utf-8"))
+            + rb'\s*:\s*(-?\d+(?:[.eE][-+\d.eE]*)?|' + _STRING + rb'|true|false|null)\s*[,}]'
+        )
+        match_key = key_re.match
+        mm = self._mm
+        keys: Dict[Any, int] = {}
+        for rowid, start in enumerate(self._starts):
+            match = match_key(mm, start)
+            if match is None:
+                key = self.item(rowid).get(self.primary_key)
+            else:
+                value = match.group(1)
+                if value.isdigit():
+                    key = int(value)
+                elif value[0] == 34 and 92 not in value:  # 不含转义的字符串
+                    key = value[1:-1].decode("utf-8")
+                else:
+                    key = json.loads(value)
+            try:
+                keys.setdefault(key, rowid)
+            except TypeError:
+                pass
+        return keys
+
+    @property
+    def keyed(self) -> bool:
+        """主键索引是否已建立"""
+        return self._keys is not None
+
+    def index_keys(self):
+        """建立主键索引（异步接口在线程池中预先建立，按主键读取时不在事件循环中扫描整个文件）"""
+        if self._keys is None:
+            self._keys = self._build_keys()
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """按主键获取条目"""
+        self.index_keys()
+        try:
+            rowid = self._keys.get(key)
+        except TypeError:
+            return None
+        return None if rowid is None else self.item(rowid)
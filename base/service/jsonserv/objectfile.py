@@ -0,0 +1,271 @@
+"""
+jsonserv 对象模式文件
+根对象的每个列表成员是一个集合（场景 B：{"posts": [], "comments": []}），路由为 /api/jsonserv/{文件}/{集合}；
+每个集合一个 JSONDataStore（各自的内存索引），同一文件的集合共享文件锁、WAL 与写线程：
+一次落盘合并所有集合的变更，写快照时未变化的集合复用上次编码的字节
+"""
+import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from filelock import FileLock
+
+from module import jsoncodec
+from service.jsonserv.core import NEXT_ID_KEY, WAL_SEQ_KEY, JSONDataStore, _stat_version, write_snapshot
+from service.jsonserv.wal import WriteAheadLog
+from service.jsonserv.writer import BatchWriter
+
+
+def read_collections(path: Path) -> Optional[List[str]]:
+    """
+    对象模式文件的集合名（根对象中值为列表的成员）
+    根为数组、含 data 成员或没有列表成员时不是对象模式，返回 None
+    """
+    with open(path, "rb") as f:
+        root = jsoncodec.loads(f.read())
+    if not isinstance(root, dict) or "data" in root:
+        return None
+    names = [key for key, value in root.items() if isinstance(value, list)]
+    return names or None
+
+
+class ObjectFile:
+    """对象模式 JSON 文件：多个集合存储共享的持久化"""
+
+    def __init__(self, file_path: Path, config=None, batch_writes: Optional[bool] = None):
+        """
+        Args:
+            file_path: JSON 文件路径
+            config: 配置对象，读取 jsonserv.wal.* / jsonserv.write_batch.*
+            batch_writes: 是否启用批量写入线程（None 时按 jsonserv.write_batch.enabled）
+        """
+        self.file_path = file_path
+        self.config = config
+        self.lock = FileLock(str(file_path) + ".lock")
+        self.logger = logging.getLogger("baseplatform.jsonserv")
+        self.stores: Dict[str, JSONDataStore] = {}
+        # 落盘互斥，各集合共用（加锁顺序 _write_lock -> 单个存储的 _mutex，不同时持有两个存储的 _mutex）
+        self._write_lock = threading.Lock()
+        # 上次读取或写入时的磁盘版本，以及此时快照中各成员的顺序与编码后的值
+        self._version: Optional[tuple] = None
+        self._keys: List[str] = []
+        self._fragments: Dict[str, bytes] = {}
+        # 内存数据与快照片段不一致的集合
+        self._dirty: Set[str] = set()
+        # 各集合的数字 ID 计数器（快照中的 next_id 成员），未加载的集合沿用磁盘上的值
+        self._next_ids: Dict[str, int] = {}
+        self._closed = False
+
+        # 可选的 WAL 模式：各集合的变更追加到同一个 .wal，记录中标明集合
+        self.wal: Optional[WriteAheadLog] = None
+        if config is not None and config.get("jsonserv.wal.enabled", False):
+            self.wal = WriteAheadLog(file_path, fsync=config.get("jsonserv.wal.fsync", True))
+            self.compact_bytes = config.get("jsonserv.wal.compact_bytes", 4 * 1024 * 1024)
+            self.compact_interval = config.get("jsonserv.wal.compact_interval", 60)
+            self._compact_event = threading.Event()
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name=f"jsonserv-compact-{file_path.stem}", daemon=True
+            )
+            self._compactor.start()
+
+        # 可选的批量写入：一个写线程合并窗口内所有集合的变更
+        self.writer: Optional[BatchWriter] = None
+        if batch_writes is None:
+            batch_writes = config is not None and config.get("jsonserv.write_batch.enabled", False)
+        if batch_writes:
+            self.writer = BatchWriter(
+                self.flush,
+                window=config.get("jsonserv.write_batch.window", 0.005) if config is not None else 0.005,
+                name=f"jsonserv-writer-{file_path.stem}",
+            )
+
+    def store(self, collection: str, primary_key: str = "id", **kwargs) -> JSONDataStore:
+        """创建集合的数据存储（kwargs 传给 JSONDataStore，如 indexes / sort_indexes）"""
+        store = JSONDataStore(self.file_path, primary_key, self.config,
+                              collection=collection, shared=self, **kwargs)
+        self.stores[collection] = store
+        return store
+
+    def read(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """读取根对象与全部日志记录（调用方持有文件锁）"""
+        root: Dict[str, Any] = {}
+        if self.file_path.exists():
+            with open(self.file_path, "rb") as f:
+                root = jsoncodec.loads(f.read())
+            if not isinstance(root, dict):
+                raise ValueError("根不是对象")
+        records = list(self.wal.replay(root.get(WAL_SEQ_KEY, 0))) if self.wal is not None else []
+        return root, records
+
+    def _disk_version(self) -> tuple:
+        paths = (self.file_path,) if self.wal is None else (self.file_path, self.wal.path)
+        return tuple(_stat_version(path) for path in paths)
+
+    def invalidate(self, collection: str):
+        """集合的内存数据被整体替换（save），下次写快照时重新编码"""
+        with self._write_lock:
+            self._dirty.add(collection)
+
+    def flush(self, snapshot: bool = False) -> int:
+        """
+        合并落盘所有集合的待写变更，返回合并的变更数：WAL 模式追加到共用日志，否则（或 snapshot=True）写入完整快照
+        磁盘版本变化时读取最新内容，已加载的集合在其上重放本进程的变更（读-改-写）
+        """
+        stores = list(self.stores.values())
+        if not snapshot and not any(store._pending for store in stores):
+            return 0
+        write_full = snapshot or self.wal is None
+        if write_full and self.wal is not None:
+            # 日志中可能有未加载集合的记录，写快照前先加载全部集合
+            for store in stores:
+                if store._cache is None:
+                    store.load()
+
+        with self._write_lock:
+            taken: List[Tuple[JSONDataStore, List[Dict[str, Any]], Optional[Future]]] = []
+            try:
+                with self.lock:
+                    version = self._disk_version()
+                    root: Optional[Dict[str, Any]] = None
+                    records: List[Dict[str, Any]] = []
+                    if version != self._version:
+                        root, records = self.read()
+                        self._keys, self._fragments = list(root), {}
+                        next_ids = root.get(NEXT_ID_KEY)
+                        self._next_ids = dict(next_ids) if isinstance(next_ids, dict) else {}
+
+                    frozen: Dict[str, Any] = {}
+                    for store in stores:
+                        # 未加载的集合没有待写变更，快照中沿用磁盘内容；不取其 _mutex（首次加载时持有它等待文件锁）
+                        if store._cache is None:
+                            continue
+                        name = store.collection
+                        with store._mutex:
+                            pending, future = store._pending, store._pending_future
+                            store._pending, store._pending_future = [], None
+                            store._inflight_future = future
+                            taken.append((store, pending, future))
+                            if root is not None and store.coherent and store._version != version:
+                                store._adopt(*store._select(root, records), version, local=pending)
+                                self._dirty.add(name)
+                                self.logger.info(f"{self.file_path.name} 已被其他进程修改，基于最新版本写入 {name}")
+                            if pending:
+                                self._dirty.add(name)
+                            # 只复制变化集合的条目列表，序列化在 _mutex 之外进行
+                            if write_full and (name in self._dirty or name not in self._fragments):
+                                frozen[name] = list(store._cache.get("data", []))
+                            self._next_ids[name] = store._next_id
+
+                    if not snapshot and not any(pending for _, pending, _ in taken):
+                        return 0
+                    if write_full:
+                        if root is None and any(key not in frozen and key not in self._fragments for key in self._keys):
+                            # 上次只追加了日志，非集合成员尚无片段
+                            root, _ = self.read()
+                        frozen[NEXT_ID_KEY] = dict(self._next_ids)
+                        if self.wal is not None:
+                            frozen[WAL_SEQ_KEY] = self.wal.seq
+                        write_snapshot(self.file_path, self._encode(root, frozen))
+                        self._dirty.difference_update(frozen)
+                        if self.wal is not None:
+                            self.wal.truncate()
+                    else:
+                        self.wal.append(*(record for _, pending, _ in taken for record in pending))
+                    self._version = self._disk_version()
+                    for store, _, _ in taken:
+                        store._version = self._version
+            except Exception as e:
+                # 片段可能只更新了一部分，下次落盘时重新读取
+                self._version = None
+                target = self.wal.path if self.wal is not None and not write_full else self.file_path
+                self.logger.error(f"保存 JSON 文件失败 {target}: {e}")
+                failed = [future for _, _, future in taken]
+                for store in stores:
+                    if store._cache is None:
+                        continue
+                    with store._mutex:
+                        if all(store is not taken_store for taken_store, _, _ in taken):
+                            # 取出变更前失败（文件锁、读取最新版本）：这些变更同样不会落盘
+                            failed.append(store._pending_future)
+                            store._pending, store._pending_future = [], None
+                        store._rollback()
+                for future in failed:
+                    if future is not None:
+                        future.set_exception(e)
+                raise
+            finally:
+                for store, _, _ in taken:
+                    store._inflight_future = None
+
+            for _, _, future in taken:
+                if future is not None:
+                    future.set_result(None)
+
+        if self.wal is not None and self.wal.size >= self.compact_bytes:
+            self._compact_event.set()
+        return sum(len(pending) for _, pending, _ in taken)
+
+    def _encode(self, root: Optional[Dict[str, Any]], frozen: Dict[str, Any]) -> Iterator[bytes]:
+        """
+        逐个成员输出快照（两空格缩进，与单文件快照格式一致）
+        变化的集合重新编码，未加载的集合与其他成员取自磁盘内容，其余复用上次的片段
+        """
+        keys = self._keys + [name for name in frozen if name not in self._keys]
+        members = [key for key in keys
+                   if key in frozen or key in self._fragments or (root is not None and key in root)]
+        if not members:
+            yield b"{}"
+        else:
+            yield b"{\n"
+            for position, key in enumerate(members):
+                if key in frozen or key not in self._fragments:
+                    value = frozen[key] if key in frozen else root[key]
+                    self._fragments[key] = b"".join(jsoncodec.iter_pretty_member(value))
+                yield b"  " + jsoncodec.dumps(key) + b": " + self._fragments[key]
+                yield b",\n" if position < len(members) - 1 else b"\n}"
+        self._keys = members
+
+    def compact(self):
+        """将共用的 WAL 压缩为 JSON 快照"""
+        if self.wal is None:
+            return
+        if self.wal.size == 0 and not any(store._pending for store in self.stores.values()):
+            return
+        self.flush(snapshot=True)
+        self.logger.info(f"WAL 已压缩: {self.file_path.name}")
+
+    def _compact_loop(self):
+        """后台压缩：日志超过大小阈值时立即压缩，否则按时间间隔压缩"""
+        while not self._closed:
+            self._compact_event.wait(self.compact_interval)
+            self._compact_event.clear()
+            if self._closed:
+                break
+            try:
+                self.compact()
+            except Exception as e:
+                self.logger.error(f"WAL 压缩失败 {self.file_path}: {e}")
+
+    def close(self, flush: bool = True):
+        """
+        关闭文件：写出所有集合的待写变更、压缩剩余日志并停止后台线程
+        flush=False 时只停止后台线程（文件已被删除，不重新创建）
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for store in self.stores.values():
+            store._closed = True
+        if self.writer is not None:
+            self.writer.close()
+        if self.wal is not None:
+            self._compact_event.set()
+            self._compactor.join(timeout=5)
+        if not flush:
+            return
+        if self.wal is not None:
+            self.compact()
+        else:
+            self.flush()
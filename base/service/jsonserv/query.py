@@ -0,0 +1,156 @@
+"""
+jsonserv 查询条件
+把过滤参数解析为条件（json-server 风格的 _gte / _lte / _ne / _like / _in 操作符），
+并提供逐条校验用的谓词与分页游标编解码
+"""
+import base64
+import json
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from service.jsonserv.index import MISSING, field_keys, normalize, sort_key
+
+
+OPERATORS = ("_gte", "_lte", "_ne", "_like", "_in")
+
+# 可走索引的条件
+OP_EQ = "eq"        # 等值 / 列表成员，值为规范化字符串列表（任一匹配）
+OP_RANGE = "range"  # 区间，值为 (low, high)，缺省一端为 None
+# 只能逐条校验的条件
+OP_NE = "ne"
+OP_LIKE = "like"
+
+
+class Condition(NamedTuple):
+    field: str
+    op: str
+    value: Any
+
+
+def coerce(text: Any) -> Any:
+    """把查询字符串中的比较值转换为数字/布尔值，无法转换时保留字符串"""
+    if not isinstance(text, str):
+        return text
+    if text == "true":
+        return True
+    if text == "false":
+        return False
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def parse_conditions(filters: Optional[Dict[str, Any]]) -> List[Condition]:
+    """
+    解析过滤参数
+
+    - field=value          等值（值为列表时任一匹配，列表字段按成员匹配）
+    - field_in=a,b         任一匹配（也可重复传参）
+    - field_gte / field_lte 闭区间，同一字段的两端合并为一个条件
+    - field_ne=value       不等于
+    - field_like=pattern   正则匹配（不区分大小写）
+    """
+    conditions: List[Condition] = []
+    ranges: Dict[str, List[Any]] = {}
+    for key, value in (filters or {}).items():
+        if key.startswith("_"):  # 跳过特殊参数
+            continue
+        operator = next((op for op in OPERATORS if key.endswith(op) and len(key) > len(op)), None)
+        if operator is None:
+            conditions.append(Condition(key, OP_EQ, [normalize(v) for v in _as_list(value)]))
+            continue
+
+        field = key[: -len(operator)]
+        if operator == "_in":
+            values = []
+            for v in _as_list(value):
+                values.extend(v.split(",") if isinstance(v, str) else [v])
+            conditions.append(Condition(field, OP_EQ, [normalize(v) for v in values]))
+        elif operator in ("_gte", "_lte"):
+            bounds = ranges.setdefault(field, [None, None])
+            bounds[0 if operator == "_gte" else 1] = coerce(_as_list(value)[-1])
+        elif operator == "_ne":
+            conditions.append(Condition(field, OP_NE, {normalize(v) for v in _as_list(value)}))
+        else:
+            try:
+                patterns = [re.compile(str(v), re.IGNORECASE) for v in _as_list(value)]
+            except re.error as e:
+                raise ValueError(f"{key} 不是有效的正则表达式: {e}") from e
+            conditions.append(Condition(field, OP_LIKE, patterns))
+
+    for field, (low, high) in ranges.items():
+        conditions.append(Condition(field, OP_RANGE, (low, high)))
+    return conditions
+
+
+def matches(item: Dict[str, Any], condition: Condition) -> bool:
+    """逐条校验条目是否满足条件"""
+    field, op, value = condition
+    if op == OP_EQ:
+        return not set(value).isdisjoint(field_keys(item, field))
+    if op == OP_NE:
+        return value.isdisjoint(field_keys(item, field))
+    if op == OP_LIKE:
+        if field not in item:
+            return False
+        text = item[field] if isinstance(item[field], str) else normalize(item[field])
+        return any(pattern.search(text) for pattern in value)
+    # OP_RANGE：只比较与边界值同类型的值
+    if field not in item:
+        return False
+    low, high = value
+    key = sort_key(item[field])
+    rank = sort_key(low if low is not None else high)[0]
+    if key[0] != rank:
+        return False
+    if low is not None and key < sort_key(low):
+        return False
+    if high is not None and key > sort_key(high):
+        return False
+    return True
+
+
+def encode_cursor(sort: str, order: str, key: tuple, pk: Any, rowid: int) -> str:
+    """生成不透明的分页游标：排序字段、方向、最后一条的排序键与主键"""
+    payload = json.dumps([sort, order, list(key), pk, rowid], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_sort_key(key: Any) -> bool:
+    """是否为 sort_key / MISSING 生成的排序键（游标由客户端回传，需按形状校验后才能参与比较）"""
+    if not isinstance(key, list) or not key or type(key[0]) is not int:
+        return False
+    rank = key[0]
+    if len(key) == 1:
+        return rank in (MISSING[0], 0)
+    if len(key) != 2:
+        return False
+    value = key[1]
+    if rank in (1, 2):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return rank in (3, 4) and isinstance(value, str)
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """解析分页游标，无效时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, order, key, pk, rowid = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if (not isinstance(sort, str) or order not in ("asc", "desc") or not _is_sort_key(key)
+                or not isinstance(pk, _SCALARS) or type(rowid) is not int):
+            raise ValueError
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("无效的分页游标")
+    return {"sort": sort, "order": order, "key": key, "pk": pk, "rowid": rowid}
@@ -1,18 +1,33 @@
 """
 jsonserv 路由注册
+资源表（资源名 -> 存储）+ 单个分发路由 /api/jsonserv/{resource}[/{id}[/{field}]]：
+按路径前缀查表，匹配成本与资源数量无关；启用 auto_reload 时随数据目录下 JSON 文件的增删热注册/注销
 """
-import json
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 import logging
 
+from core.auth import require_api_auth
+from module import jsoncodec
+from module.jsoncodec import FastJSONResponse
 from service.jsonserv.core import JSONDataStore
+from service.jsonserv.mapped import read_header
+from service.jsonserv.objectfile import ObjectFile, read_collections
 
 
 logger = logging.getLogger("baseplatform.jsonserv")
-stores: Dict[str, JSONDataStore] = {}
+
+# 流式响应每块的大致字节数
+STREAM_CHUNK_SIZE = 65536
+
+
+def _resource_name(data_path: Path, json_file: Path) -> str:
+    """相对路径（不含 .json）作为资源名"""
+    relative_path = json_file.relative_to(data_path)
+    return str(relative_path).replace("\\", "/").replace(".json", "")
 
 
 def scan_json_files(data_path: Path) -> Dict[str, Path]:
@@ -24,74 +39,310 @@ def scan_json_files(data_path: Path) -> Dict[str, Path]:
         return json_files
     
     for json_file in data_path.rglob("*.json"):
-        # 获取相对路径作为资源名
-        relative_path = json_file.relative_to(data_path)
-        resource_name = str(relative_path).replace("\\", "/").replace(".json", "")
-        json_files[resource_name] = json_file
+        json_files[_resource_name(data_path, json_file)] = json_file
     
     return json_files
 
 
-def setup_jsonserv(app: FastAPI, config) -> Dict[str, JSONDataStore]:
-    """设置 jsonserv 路由"""
+class ResourceRegistry:
+    """jsonserv 资源表：资源名 -> 存储，数据目录下的文件增删时增量更新"""
+    
+    def __init__(self, config=None, data_path: Optional[Path] = None):
+        """
+        Args:
+            config: 配置对象，读取 jsonserv.*（为 None 时使用默认值）
+            data_path: 数据目录（为 None 时只能通过 add_store 注册）
+        """
+        self.config = config
+        self.data_path = data_path.resolve() if data_path is not None else None
+        self.exclude_resources = (config.get("jsonserv.exclude_resources", []) if config is not None else []) or []
+        self.stream_threshold = config.get("jsonserv.stream_threshold", 10000) if config is not None else 10000
+        self.stores: Dict[str, JSONDataStore] = {}
+        # 文件 -> 由其注册的资源名（对象模式文件每个集合一个资源）
+        self._files: Dict[Path, List[str]] = {}
+        self._object_files: Dict[Path, ObjectFile] = {}
+        self._lock = threading.RLock()
+    
+    def scan(self):
+        """扫描数据目录，注册全部资源"""
+        for json_file in scan_json_files(self.data_path).values():
+            self.add(json_file)
+    
+    def add_store(self, resource_name: str, store: JSONDataStore) -> bool:
+        """注册已创建的存储（不对应数据目录下的文件，不随文件监控变化）"""
+        with self._lock:
+            return self._register(resource_name, store)
+    
+    def _index_options(self, resource_name: str) -> Dict[str, Any]:
+        """资源声明的等值索引与有序索引字段"""
+        if self.config is None:
+            return {}
+        return {
+            "indexes": (self.config.get("jsonserv.indexes") or {}).get(resource_name),
+            "sort_indexes": (self.config.get("jsonserv.sort_indexes") or {}).get(resource_name),
+        }
+    
+    def _register(self, resource_name: str, store: JSONDataStore) -> bool:
+        if resource_name in self.exclude_resources:
+            logger.info(f"跳过 jsonserv 资源（已排除）: {resource_name}")
+            return False
+        if resource_name in self.stores:
+            logger.warning(f"jsonserv 资源重名，跳过: {resource_name}")
+            return False
+        self.stores[resource_name] = store
+        logger.info(f"注册 jsonserv 资源: {resource_name}")
+        return True
+    
+    def add(self, json_file: Path) -> List[str]:
+        """注册文件对应的资源（已注册时忽略），返回新注册的资源名"""
+        json_file = json_file.resolve()
+        resource_name = _resource_name(self.data_path, json_file)
+        with self._lock:
+            if json_file in self._files:
+                return []
+            if resource_name in self.exclude_resources:
+                logger.info(f"跳过 jsonserv 资源（已排除）: {resource_name}")
+                return []
+            try:
+                # 只读取文件头尾确定主键，数据在首次访问时加载
+                header = read_header(json_file)
+                primary_key = header.primary_key or "id"
+                
+                # 对象模式（根对象的列表成员为集合）：每个集合一个资源 {文件}/{集合}
+                collections = read_collections(json_file) if header.data_offset is None else None
+                names: List[str] = []
+                if collections:
+                    object_file = ObjectFile(json_file, self.config)
+                    self._object_files[json_file] = object_file
+                    for collection in collections:
+                        name = f"{resource_name}/{collection}"
+                        store = object_file.store(collection, primary_key, **self._index_options(name))
+                        if self._register(name, store):
+                            names.append(name)
+                        else:
+                            del object_file.stores[collection]
+                else:
+                    store = JSONDataStore(json_file, primary_key, self.config, **self._index_options(resource_name))
+                    if self._register(resource_name, store):
+                        names.append(resource_name)
+            except Exception as e:
+                logger.error(f"加载 JSON 文件失败 {json_file}: {e}")
+                return []
+            self._files[json_file] = names
+            return names
+    
+    def remove(self, json_file: Path, flush: bool = False) -> List[str]:
+        """
+        注销文件对应的资源并关闭存储
+        flush=False 时不写出未落盘的变更（文件已被删除，不重新创建）
+        """
+        json_file = json_file.resolve()
+        with self._lock:
+            names = self._files.pop(json_file, None)
+            if names is None:
+                return []
+            closing = [self.stores.pop(name) for name in names if name in self.stores]
+            object_file = self._object_files.pop(json_file, None)
+        # 关闭时会等待后台线程退出，在锁外进行
+        for store in closing:
+            store.close(flush=flush)
+        if object_file is not None:
+            object_file.close(flush=flush)
+        if names:
+            logger.info(f"注销 jsonserv 资源: {', '.join(names)}")
+        return names
+    
+    def _refresh_collections(self, json_file: Path):
+        """对象模式文件被外部修改后，按当前内容增删集合"""
+        object_file = self._object_files.get(json_file)
+        if object_file is None or object_file._disk_version() == object_file._version:
+            return
+        try:
+            collections = read_collections(json_file) or []
+        except ValueError:
+            # 写了一半的文件，等待下一次事件
+            return
+        resource_name = _resource_name(self.data_path, json_file)
+        primary_key = read_header(json_file).primary_key or "id"
+        with self._lock:
+            names = self._files.get(json_file)
+            if names is None:
+                return
+            for collection in collections:
+                name = f"{resource_name}/{collection}"
+                if collection not in object_file.stores and name not in self.stores:
+                    store = object_file.store(collection, primary_key, **self._index_options(name))
+                    if self._register(name, store):
+                        names.append(name)
+                    else:
+                        del object_file.stores[collection]
+            for collection in [c for c in object_file.stores if c not in collections]:
+                # 集合已从文件中删除：不再写回
+                name = f"{resource_name}/{collection}"
+                del object_file.stores[collection]
+                if self.stores.get(name) is not None and self.stores[name].shared is object_file:
+                    del self.stores[name]
+                    names.remove(name)
+                    logger.info(f"注销 jsonserv 资源: {name}")
+    
+    def on_file_event(self, file_path: Path):
+        """FileWatcher 回调（etc 目录）：数据目录下的 JSON 文件增删时注册/注销资源"""
+        if self.data_path is None:
+            return
+        path = Path(file_path).resolve()
+        try:
+            path.relative_to(self.data_path)
+        except ValueError:
+            return
+        if path.is_dir():
+            # 目录移入：目录内的文件不一定单独产生事件
+            for json_file in path.rglob("*.json"):
+                self.add(json_file)
+            return
+        if path.suffix != ".json":
+            if not path.exists():
+                # 目录被删除或移走
+                for json_file in [f for f in list(self._files) if path in f.parents]:
+                    self.remove(json_file)
+            return
+        if not path.exists():
+            self.remove(path)
+        elif path in self._files:
+            self._refresh_collections(path)
+        else:
+            self.add(path)
+    
+    def resolve(self, path: str) -> Optional[Tuple[JSONDataStore, List[str]]]:
+        """
+        按最长前缀匹配资源名，返回 (存储, 剩余路径段)
+        剩余部分最多两段（id、字段），只需查找三个前缀，与资源数量无关
+        """
+        parts = [part for part in path.split("/") if part]
+        for depth in range(len(parts), max(len(parts) - 3, 0), -1):
+            store = self.stores.get("/".join(parts[:depth]))
+            if store is not None:
+                return store, parts[depth:]
+        return None
+    
+    def close(self):
+        """关闭全部存储（写出待写变更、压缩 WAL）"""
+        with self._lock:
+            closing = list(self.stores.values()) + list(self._object_files.values())
+            self.stores.clear()
+            self._files.clear()
+            self._object_files.clear()
+        for store in closing:
+            store.close()
+
+
+def setup_jsonserv(app: FastAPI, config) -> ResourceRegistry:
+    """设置 jsonserv：扫描数据目录建立资源表并注册分发路由"""
     base_dir = Path(__file__).parent.parent.parent
     data_path = base_dir / config.get("jsonserv.data_path", "etc/data")
     
-    # 扫描 JSON 文件
-    json_files = scan_json_files(data_path)
-    exclude_resources = config.get("jsonserv.exclude_resources", [])
+    registry = ResourceRegistry(config, data_path)
+    registry.scan()
+    register_routes(app, registry)
+    return registry
+
+
+def iter_ndjson(items: Iterable[Dict[str, Any]], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """逐条序列化为 NDJSON，按 chunk_size 合并输出"""
+    buffer: List[bytes] = []
+    size = 0
+    for item in items:
+        line = jsoncodec.dumps(item) + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_json_array(items: Iterable[Dict[str, Any]], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """逐条序列化为 JSON 数组，按 chunk_size 分块输出"""
+    buffer: List[bytes] = [b"["]
+    size = 1
+    separator = b""
+    for item in items:
+        text = separator + jsoncodec.dumps(item)
+        separator = b","
+        buffer.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    buffer.append(b"]")
+    yield b"".join(buffer)
+
+
+def _int_param(request: Request, name: str) -> Optional[int]:
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} 必须是整数")
+
+
+async def _json_body(request: Request) -> Any:
+    try:
+        return await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="请求体不是有效的 JSON")
+
+
+async def _item_body(request: Request) -> Dict[str, Any]:
+    body = await _json_body(request)
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="请求体必须是 JSON 对象")
+    return body
+
+
+async def get_list(request: Request, store: JSONDataStore, stream_threshold: int):
+    """获取资源列表"""
+    params = request.query_params
+    page, limit = _int_param(request, "_page"), _int_param(request, "_limit")
+    start, end = _int_param(request, "_start"), _int_param(request, "_end")
+    sort, order, q = params.get("_sort"), params.get("_order", "asc"), params.get("q")
     
-    # 为每个 JSON 文件创建数据存储和路由
-    for resource_name, json_file in json_files.items():
-        if resource_name in exclude_resources:
-            logger.info(f"跳过 jsonserv 资源（已排除）: {resource_name}")
+    # 非特殊参数作为过滤条件，同名参数出现多次时任一匹配（token 为认证参数，见 core/auth.py）
+    filters = {}
+    for key in params.keys():
+        if key.startswith("_") or key in ("q", "token") or key in filters:
             continue
+        values = params.getlist(key)
+        filters[key] = values if len(values) > 1 else values[0]
+    
+    # 游标分页：?_cursor=（空值为第一页）返回下一页游标，翻页时不受新插入条目影响
+    if "_cursor" in params:
         try:
-            # 加载 JSON 文件以确定主键
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 确定主键
-            primary_key = "id"
-            if isinstance(data, dict) and "primary_key" in data:
-                primary_key = data["primary_key"]
-            
-            # 创建数据存储
-            store = JSONDataStore(json_file, primary_key)
-            stores[resource_name] = store
-            
-            # 注册路由
-            register_routes(app, resource_name, store)
-            
-            logger.info(f"注册 jsonserv 资源: {resource_name}")
-        
-        except Exception as e:
-            logger.error(f"加载 JSON 文件失败 {json_file}: {e}")
-    
-    return stores
-
-
-def register_routes(app: FastAPI, resource_name: str, store: JSONDataStore):
-    """为资源注册 CRUD 路由"""
-    
-    # GET /api/jsonserv/{resource_name} - 获取列表
-    @app.get(f"/api/jsonserv/{resource_name}")
-    async def get_list(
-        page: Optional[int] = Query(None, alias="_page"),
-        limit: Optional[int] = Query(None, alias="_limit"),
-        sort: Optional[str] = Query(None, alias="_sort"),
-        order: Optional[str] = Query("asc", alias="_order"),
-        start: Optional[int] = Query(None, alias="_start"),
-        end: Optional[int] = Query(None, alias="_end"),
-        q: Optional[str] = Query(None),
-    ):
-        """获取资源列表"""
-        # 获取查询参数作为过滤条件
-        filters = {}
-        # 这里需要从请求中获取所有非特殊参数作为过滤条件
-        # 实际实现中需要从 Request 对象获取
-        
-        items = store.query(
+            total, items, next_cursor = await store.aquery_cursor(
+                filters=filters,
+                sort=sort,
+                order=order,
+                limit=max(1, limit or 20),
+                cursor=params["_cursor"] or None,
+                search=q
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        headers = {
+            "X-Total-Count": str(total),
+            "Access-Control-Expose-Headers": "X-Total-Count, X-Next-Cursor, Link",
+        }
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+            headers["Link"] = f'<{request.url.include_query_params(_cursor=next_cursor)}>; rel="next"'
+        if "application/x-ndjson" in request.headers.get("accept", ""):
+            return StreamingResponse(iter_ndjson(items), media_type="application/x-ndjson", headers=headers)
+        return FastJSONResponse(content=items, headers=headers)
+    
+    try:
+        total, items = await store.aquery_page(
             filters=filters,
             sort=sort,
             order=order,
@@ -101,65 +352,133 @@ def register_routes(app: FastAPI, resource_name: str, store: JSONDataStore):
             end=end,
             search=q
         )
-        return items
-    
-    # GET /api/jsonserv/{resource_name}/{id} - 获取单条数据
-    @app.get(f"/api/jsonserv/{resource_name}/{{item_id}}")
-    async def get_item(item_id: str):
-        """获取单条数据"""
-        item = store.get_item(item_id)
-        if item is None:
-            raise HTTPException(status_code=404, detail="资源不存在")
-        return item
-    
-    # POST /api/jsonserv/{resource_name} - 新增数据
-    @app.post(f"/api/jsonserv/{resource_name}")
-    async def create_item(item: Dict[str, Any]):
-        """新增数据"""
-        new_item = store.add_item(item)
-        return new_item
-    
-    # PUT /api/jsonserv/{resource_name}/{id} - 全量更新
-    @app.put(f"/api/jsonserv/{resource_name}/{{item_id}}")
-    async def update_item(item_id: str, item: Dict[str, Any]):
-        """全量更新"""
-        updated_item = store.update_item(item_id, item, partial=False)
-        if updated_item is None:
-            raise HTTPException(status_code=404, detail="资源不存在")
-        return updated_item
-    
-    # PATCH /api/jsonserv/{resource_name}/{id} - 局部更新
-    @app.patch(f"/api/jsonserv/{resource_name}/{{item_id}}")
-    async def patch_item(item_id: str, item: Dict[str, Any]):
-        """局部更新"""
-        updated_item = store.update_item(item_id, item, partial=True)
-        if updated_item is None:
-            raise HTTPException(status_code=404, detail="资源不存在")
-        return updated_item
-    
-    # DELETE /api/jsonserv/{resource_name}/{id} - 删除数据
-    @app.delete(f"/api/jsonserv/{resource_name}/{{item_id}}")
-    async def delete_item(item_id: str):
-        """删除数据"""
-        success = store.delete_item(item_id)
-        if not success:
-            raise HTTPException(status_code=404, detail="资源不存在")
-        return {"message": "删除成功"}
-    
-    # GET /api/jsonserv/{resource_name}/{id}/{field} - 获取字段
-    @app.get(f"/api/jsonserv/{resource_name}/{{item_id}}/{{field}}")
-    async def get_field(item_id: str, field: str):
-        """获取字段值"""
-        value = store.get_field(item_id, field)
-        if value is None:
-            raise HTTPException(status_code=404, detail="字段不存在")
-        return {field: value}
-    
-    # PUT /api/jsonserv/{resource_name}/{id}/{field} - 更新字段
-    @app.put(f"/api/jsonserv/{resource_name}/{{item_id}}/{{field}}")
-    async def set_field(item_id: str, field: str, value: Any):
-        """更新字段值"""
-        updated_item = store.set_field(item_id, field, value)
-        if updated_item is None:
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {
+        "X-Total-Count": str(total),
+        "Access-Control-Expose-Headers": "X-Total-Count",
+    }
+    
+    # NDJSON：按 Accept 协商；JSON 数组：_stream=true 或未分页且结果超过阈值时分块输出
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(iter_ndjson(items), media_type="application/x-ndjson", headers=headers)
+    paginated = start is not None or (page is not None and limit is not None)
+    stream = params.get("_stream", "").lower()
+    if stream in ("1", "true") or (stream not in ("0", "false") and not paginated and total > stream_threshold):
+        return StreamingResponse(iter_json_array(items), media_type="application/json", headers=headers)
+    return FastJSONResponse(content=list(items), headers=headers)
+
+
+async def create_item(request: Request, store: JSONDataStore):
+    """新增数据"""
+    new_item = await store.aadd_item(await _item_body(request))
+    return FastJSONResponse(new_item)
+
+
+async def bulk(request: Request, store: JSONDataStore):
+    """
+    批量变更：请求体为操作列表，或 {"operations": [...], "atomic": true}
+    整批一次加锁、一次落盘；atomic 时任一操作失败则整批不生效（返回 409）
+    """
+    atomic = request.query_params.get("_atomic", "").lower() in ("1", "true", "yes", "on")
+    body = await _json_body(request)
+    if isinstance(body, dict):
+        atomic = bool(body.get("atomic", atomic))
+        body = body.get("operations")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="请求体必须是操作列表")
+    
+    applied, results = await store.abulk(body, atomic=atomic)
+    return FastJSONResponse(
+        status_code=200 if applied else 409,
+        content={"applied": applied, "results": results},
+    )
+
+
+async def get_item(request: Request, store: JSONDataStore, item_id: str):
+    """获取单条数据"""
+    item = await store.aget_item(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="资源不存在")
+    return FastJSONResponse(item)
+
+
+async def update_item(request: Request, store: JSONDataStore, item_id: str):
+    """全量更新"""
+    updated_item = await store.aupdate_item(item_id, await _item_body(request), partial=False)
+    if updated_item is None:
+        raise HTTPException(status_code=404, detail="资源不存在")
+    return FastJSONResponse(updated_item)
+
+
+async def patch_item(request: Request, store: JSONDataStore, item_id: str):
+    """局部更新"""
+    updated_item = await store.aupdate_item(item_id, await _item_body(request), partial=True)
+    if updated_item is None:
+        raise HTTPException(status_code=404, detail="资源不存在")
+    return FastJSONResponse(updated_item)
+
+
+async def delete_item(request: Request, store: JSONDataStore, item_id: str):
+    """删除数据"""
+    success = await store.adelete_item(item_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="资源不存在")
+    return FastJSONResponse({"message": "删除成功"})
+
+
+async def get_field(request: Request, store: JSONDataStore, item_id: str, field: str):
+    """获取字段值"""
+    value = await store.aget_field(item_id, field)
+    if value is None:
+        raise HTTPException(status_code=404, detail="字段不存在")
+    return FastJSONResponse({field: value})
+
+
+async def set_field(request: Request, store: JSONDataStore, item_id: str, field: str):
+    """更新字段值（?value=）"""
+    value = request.query_params.get("value")
+    if value is None:
+        raise HTTPException(status_code=422, detail="缺少 value 参数")
+    updated_item = await store.aset_field(item_id, field, value)
+    if updated_item is None:
+        raise HTTPException(status_code=404, detail="资源不存在")
+    return FastJSONResponse(updated_item)
+
+
+# (方法, 资源名之后的路径段数) -> 处理函数
+_HANDLERS = {
+    ("GET", 0): get_list,          # GET    /api/jsonserv/{resource}
+    ("POST", 0): create_item,      # POST   /api/jsonserv/{resource}
+    ("GET", 1): get_item,          # GET    /api/jsonserv/{resource}/{id}
+    ("PUT", 1): update_item,       # PUT    /api/jsonserv/{resource}/{id}
+    ("PATCH", 1): patch_item,      # PATCH  /api/jsonserv/{resource}/{id}
+    ("DELETE", 1): delete_item,    # DELETE /api/jsonserv/{resource}/{id}
+    ("GET", 2): get_field,         # GET    /api/jsonserv/{resource}/{id}/{field}
+    ("PUT", 2): set_field,         # PUT    /api/jsonserv/{resource}/{id}/{field}
+}
+
+
+def register_routes(app: FastAPI, registry: ResourceRegistry):
+    """
+    注册 jsonserv 分发路由（一条路由覆盖全部资源）
+    需在 /api/{path:path} 之前注册，否则 GET/POST/PUT/DELETE 会被 web/ API 路由先匹配
+    """
+    
+    @app.api_route("/api/jsonserv/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+                   dependencies=[Depends(require_api_auth)])
+    async def jsonserv_dispatch(path: str, request: Request):
+        """按资源表分发 jsonserv 请求"""
+        found = registry.resolve(path)
+        if found is None or len(found[1]) > 2:
             raise HTTPException(status_code=404, detail="资源不存在")
-        return updated_item
+        store, rest = found
+        if rest == ["_bulk"] and request.method == "POST":
+            # POST /api/jsonserv/{resource}/_bulk - 批量变更
+            return await bulk(request, store)
+        handler = _HANDLERS.get((request.method, len(rest)))
+        if handler is None:
+            raise HTTPException(status_code=405, detail="Method Not Allowed")
+        if handler is get_list:
+            return await get_list(request, store, registry.stream_threshold)
+        return await handler(request, store, *rest)
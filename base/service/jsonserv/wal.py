@@ -0,0 +1,81 @@
+"""
+jsonserv 预写日志（WAL）
+每次变更以一行 JSON 追加到 JSON 文件旁的 .wal 文件，记录带递增序号 seq；
+启动加载快照后按顺序重放，压缩时写回标准 JSON 快照（记下已包含的最后序号）并清空日志
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from module import jsoncodec
+
+
+class WriteAheadLog:
+    """追加写日志文件"""
+
+    def __init__(self, json_path: Path, fsync: bool = True):
+        """
+        Args:
+            json_path: 对应的 JSON 快照文件
+            fsync: 每次追加后是否 fsync
+        """
+        self.path = Path(json_path).with_suffix(".wal")
+        self.fsync = fsync
+        # 最后一条记录的序号：写快照时保存，重放时跳过快照已包含的记录（快照替换后、清空日志前崩溃）
+        self.seq = 0
+        self.logger = logging.getLogger("baseplatform.jsonserv")
+        try:
+            self.size = self.path.stat().st_size
+        except OSError:
+            self.size = 0
+
+    def append(self, *records: Dict[str, Any]):
+        """追加一条或多条记录（一次写入，调用方持有文件锁；记录被标上序号）"""
+        if not records:
+            return
+        for record in records:
+            self.seq += 1
+            record["seq"] = self.seq
+        payload = b"".join(jsoncodec.dumps(record) + b"\n" for record in records)
+        with open(self.path, "ab") as f:
+            f.write(payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.size += len(payload)
+
+    def replay(self, after: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        按顺序读取日志记录；末尾未写完整的行（崩溃时）被忽略
+        
+        Args:
+            after: 快照已包含的最后序号，序号不大于它的记录被跳过
+        """
+        self.seq = after
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = jsoncodec.loads(line)
+                except ValueError:
+                    self.logger.warning(f"忽略损坏的 WAL 记录 {self.path}:{line_no}")
+                    continue
+                seq = record.get("seq")
+                if isinstance(seq, int):
+                    if seq <= after:
+                        continue
+                    self.seq = max(self.seq, seq)
+                yield record
+
+    def truncate(self):
+        """清空日志（快照写入完成后调用）"""
+        if self.path.exists():
+            with open(self.path, "wb") as f:
+                if self.fsync:
+                    os.fsync(f.fileno())
+        self.size = 0
@@ -0,0 +1,56 @@
+"""
+jsonserv 批量写入线程
+每个存储一个写线程：收到通知立即落盘，落盘期间到达的变更合并到下一次落盘；
+上一次落盘合并了多个变更（有并发写入）时才先等待合并窗口，单个写入方不等待
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class BatchWriter:
+    """单写线程，按时间窗口合并写入"""
+
+    def __init__(self, flush: Callable[[], Optional[int]], window: float = 0.005, name: str = "jsonserv-writer"):
+        """
+        Args:
+            flush: 落盘函数（取出全部待写变更并写入，返回合并的变更数）
+            window: 合并窗口（秒），仅在上一次落盘合并了多个变更时等待
+            name: 线程名
+        """
+        self.flush = flush
+        self.window = window
+        self.logger = logging.getLogger("baseplatform.jsonserv")
+        self._event = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        """有新的待写变更"""
+        self._event.set()
+
+    def _run(self):
+        merged = 0
+        while True:
+            self._event.wait()
+            # 上一次落盘合并了多个变更（并发写入）时，等待合并窗口内继续到达的变更
+            if merged > 1 and self.window > 0 and not self._closed:
+                time.sleep(self.window)
+            self._event.clear()
+            # 清除事件之后再检查：close() 的通知即使被 clear() 清除，也能在这里看到 _closed
+            if self._closed:
+                break
+            try:
+                merged = self.flush() or 0
+            except Exception as e:
+                # 等待方已通过持久化 Future 收到异常，未落盘的变更由存储回滚
+                self.logger.error(f"批量写入失败: {e}")
+                merged = 0
+
+    def close(self):
+        """停止写线程（调用方负责最后一次 flush）"""
+        self._closed = True
+        self._event.set()
+        self._thread.join(timeout=5)
@@ -46,7 +46,8 @@ class UserService:
         users_file.parent.mkdir(parents=True, exist_ok=True)
         if not users_file.exists():
             users_file.write_text('{"data": [], "primary_key": "id"}', encoding="utf-8")
-        self.store = JSONDataStore(users_file, primary_key="id")
+        # 用户服务的调用方是同步的，写入直接落盘，不使用批量写入线程
+        self.store = JSONDataStore(users_file, primary_key="id", config=config, batch_writes=False)
     
     def _password_to_bcrypt_input(self, password: str) -> str:
         """将任意长度密码转为 bcrypt 可接受格式：SHA256 散列后 64 字符，避免 72 字节限制"""
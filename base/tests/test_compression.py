@@ -0,0 +1,70 @@
+"""
+响应压缩中间件：带强 ETag 的响应（静态文件、Markdown）压缩后按 路径 + ETag + 编码 缓存
+
+运行（在 base/ 目录下）:
+    python -m pytest -q tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from module.compression import CompressionMiddleware
+from module.config import Config
+
+
+@pytest.fixture(scope="module")
+def app_client():
+    import main
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("path, file", [
+    ("/help/index.html", "web/help/index.html"),
+    ("/index.html", "web/index.html"),
+])
+def test_static_file_is_compressed_and_cached(app_client, path, file):
+    expected = (BASE_DIR / file).read_bytes()
+    assert len(expected) > 1024
+    for _ in range(2):
+        # 第二次请求命中压缩结果缓存
+        response = app_client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].startswith("W/")
+        assert response.content == expected
+
+
+@pytest.mark.parametrize("path", ["/", "/help/01.md"])
+def test_rendered_pages_are_compressed(app_client, path):
+    first = app_client.get(path, headers={"Accept-Encoding": "gzip"})
+    second = app_client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+
+
+def test_cache_is_bounded(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("compression:\n  cache_max_bytes: 2048\n", encoding="utf-8")
+    config = Config(str(config_file))
+
+    app = FastAPI()
+
+    @app.get("/doc/{n}")
+    async def doc(n: int):
+        return Response(f"document {n} ".encode() * 2000, media_type="text/plain", headers={"ETag": f'"{n}"'})
+
+    middleware = CompressionMiddleware(app, config=config)
+    client = TestClient(middleware)
+    for n in range(50):
+        response = client.get(f"/doc/{n}", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.content == f"document {n} ".encode() * 2000
+    assert middleware._cache_bytes <= 2048
+    assert middleware._cache_bytes == sum(len(body) for body in middleware._cache.values())
@@ -0,0 +1,84 @@
+"""
+jsonserv 分发路由的 API 认证：security.api_auth_enabled 开启时与 /api/{path:path} 一样需要 Token
+
+运行（在 base/ 目录下）:
+    python -m pytest -q tests
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from module.config import Config
+from service.jsonserv.router import ResourceRegistry, register_routes
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def client(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "security:\n"
+        "  api_auth_enabled: true\n"
+        "  system_tokens:\n"
+        f"  - token: {TOKEN}\n"
+        "jsonserv:\n"
+        "  write_batch:\n"
+        "    enabled: false\n",
+        encoding="utf-8",
+    )
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    (data_path / "posts.json").write_text(json.dumps([{"id": "p1", "title": "hello"}]), encoding="utf-8")
+
+    config = Config(str(config_file))
+    registry = ResourceRegistry(config, data_path)
+    registry.scan()
+    app = FastAPI()
+    app.state.config = config
+    register_routes(app, registry)
+    with TestClient(app) as test_client:
+        yield test_client
+    registry.close()
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("GET", "/api/jsonserv/posts", None),
+    ("GET", "/api/jsonserv/posts/p1", None),
+    ("POST", "/api/jsonserv/posts", {"title": "x"}),
+    ("DELETE", "/api/jsonserv/posts/p1", None),
+    ("GET", "/api/jsonserv/missing", None),
+])
+def test_unauthenticated_request_is_rejected(client, method, path, body):
+    response = client.request(method, path, json=body)
+    assert response.status_code == 401
+    assert client.get("/api/jsonserv/posts", headers={"Authorization": f"Bearer {TOKEN}"}).json() == [
+        {"id": "p1", "title": "hello"}
+    ]
+
+
+def test_invalid_token_is_rejected(client):
+    response = client.get("/api/jsonserv/posts", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+
+
+def test_token_from_header_or_query(client):
+    response = client.get("/api/jsonserv/posts/p1", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "hello"
+
+    # ?token= 只用于认证，不作为字段过滤条件
+    response = client.get(f"/api/jsonserv/posts?token={TOKEN}")
+    assert response.status_code == 200
+    assert response.json() == [{"id": "p1", "title": "hello"}]
+
+    response = client.post(f"/api/jsonserv/posts?token={TOKEN}", json={"title": "x"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "x"
@@ -0,0 +1,100 @@
+"""
+jsonserv 列表查询：无效的过滤条件 / 分页游标返回 400
+
+运行（在 base/ 目录下）:
+    python -m pytest -q tests
+"""
+import base64
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from module.config import Config
+from service.jsonserv.router import ResourceRegistry, register_routes
+
+
+@pytest.fixture
+def client(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "security:\n"
+        "  api_auth_enabled: false\n"
+        "jsonserv:\n"
+        "  write_batch:\n"
+        "    enabled: false\n",
+        encoding="utf-8",
+    )
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    posts = [{"id": f"p{n}", "title": f"post {n}"} for n in range(5)]
+    (data_path / "posts.json").write_text(json.dumps(posts), encoding="utf-8")
+
+    config = Config(str(config_file))
+    registry = ResourceRegistry(config, data_path)
+    registry.scan()
+    app = FastAPI()
+    app.state.config = config
+    register_routes(app, registry)
+    with TestClient(app) as test_client:
+        yield test_client
+    registry.close()
+
+
+def test_like_filter(client):
+    response = client.get("/api/jsonserv/posts", params={"title_like": "POST [13]"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == ["p1", "p3"]
+
+
+@pytest.mark.parametrize("params", [
+    {"title_like": "("},
+    {"title_like": "[a-", "_cursor": ""},
+])
+def test_invalid_like_pattern_is_bad_request(client, params):
+    response = client.get("/api/jsonserv/posts", params=params)
+    assert response.status_code == 400
+
+
+def _cursor(payload) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def test_cursor_paging(client):
+    ids, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/api/jsonserv/posts", params={"_cursor": cursor, "_limit": 2, "_sort": "title"})
+        assert response.status_code == 200
+        ids.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+    assert ids == ["p0", "p1", "p2", "p3", "p4"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    _cursor(["id", 1, [3, "p1"], "p1", 0]),
+    _cursor(["id", "sideways", [3, "p1"], "p1", 0]),
+    _cursor(["id", "asc", [2, True], "p1", 0]),
+    _cursor(["id", "asc", [{"a": 1}], "p1", 0]),
+    _cursor(["id", "asc", ["p1"], "p1", 0]),
+    _cursor(["id", "asc", [3, "p1", "x"], "p1", 0]),
+    _cursor(["id", "asc", [3, "p1"], ["p1"], 0]),
+    _cursor(["id", "asc", [3, "p1"], "p1", "0"]),
+])
+def test_invalid_cursor_is_bad_request(client, cursor):
+    response = client.get("/api/jsonserv/posts", params={"_cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_cursor_key_of_another_type(client):
+    # 形状合法但与字段值类型不同的排序键按 None < 布尔 < 数字 < 字符串 的次序定位
+    response = client.get("/api/jsonserv/posts", params={"_cursor": _cursor(["id", "asc", [2, 1], 7, 0])})
+    assert response.status_code == 200
+    assert len(response.json()) == 5
@@ -0,0 +1,223 @@
+"""
+jsonserv 存储：增删改查与 ID 计数器、WAL 重放、批量操作回滚、游标分页、对象模式共享写线程
+
+运行（在 base/ 目录下）:
+    python -m pytest -q tests
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from module.config import Config
+from service.jsonserv.core import JSONDataStore
+from service.jsonserv.objectfile import ObjectFile
+from service.jsonserv.wal import WriteAheadLog
+
+
+def make_config(tmp_path: Path, wal: bool = False) -> Config:
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "jsonserv:\n"
+        "  wal:\n"
+        f"    enabled: {str(wal).lower()}\n"
+        "    fsync: false\n"
+        "    compact_interval: 3600\n"
+        "  write_batch:\n"
+        "    enabled: false\n",
+        encoding="utf-8",
+    )
+    return Config(str(config_file))
+
+
+def ids(store: JSONDataStore) -> list:
+    return [item["id"] for item in store.get_items()]
+
+
+@pytest.mark.parametrize("wal", [False, True])
+def test_crud_and_id_counter_survive_reload(tmp_path, wal):
+    config = make_config(tmp_path, wal)
+    file_path = tmp_path / "posts.json"
+    store = JSONDataStore(file_path, config=config)
+    assert store.add_item({"title": "a"})["id"] == 1
+    assert store.add_item({"title": "b"})["id"] == 2
+    assert store.update_item(1, {"views": 3}, partial=True) == {"id": 1, "title": "a", "views": 3}
+    assert store.update_item(2, {"title": "B"}) == {"id": 2, "title": "B"}
+    assert store.get_item(2) == {"id": 2, "title": "B"}
+    assert store.delete_item(2)
+    assert not store.delete_item(2)
+    assert store.update_item(2, {"title": "x"}) is None
+    store.close()
+
+    store = JSONDataStore(file_path, config=config)
+    assert store.get_items() == [{"id": 1, "title": "a", "views": 3}]
+    # 删除的 ID 不复用
+    assert store.add_item({"title": "c"})["id"] == 3
+    assert store.delete_item(3)
+    store.close()
+
+    store = JSONDataStore(file_path, config=config)
+    assert store.add_item({"title": "d"})["id"] == 4
+    store.close()
+
+
+def test_wal_replay_without_compaction(tmp_path):
+    config = make_config(tmp_path, wal=True)
+    file_path = tmp_path / "posts.json"
+    file_path.write_text(json.dumps([{"id": 1}]), encoding="utf-8")
+    store = JSONDataStore(file_path, config=config)
+    store.add_item({"title": "a"})
+    store.update_item(1, {"title": "first"}, partial=True)
+    store.delete_item(2)
+    store.add_item({"title": "b"})
+    # 模拟进程崩溃：不压缩、不写快照
+    store._closed = True
+    assert json.loads(file_path.read_text(encoding="utf-8")) == [{"id": 1}]
+
+    store = JSONDataStore(file_path, config=config)
+    assert store.get_items() == [{"id": 1, "title": "first"}, {"id": 3, "title": "b"}]
+    assert store.add_item({})["id"] == 4
+    store.close()
+    assert file_path.with_suffix(".wal").stat().st_size == 0
+
+
+def test_wal_replay_after_crash_between_snapshot_and_truncate(tmp_path, monkeypatch):
+    config = make_config(tmp_path, wal=True)
+    file_path = tmp_path / "posts.json"
+    file_path.write_text(json.dumps([{"id": 1}]), encoding="utf-8")
+    store = JSONDataStore(file_path, config=config)
+    store.add_item({"title": "a"})
+    store.update_item(1, {"n": 1}, partial=True)
+
+    def crash(self):
+        raise RuntimeError("crash before truncate")
+
+    # 快照已替换、日志尚未清空时崩溃
+    monkeypatch.setattr(WriteAheadLog, "truncate", crash)
+    with pytest.raises(RuntimeError):
+        store.compact()
+    monkeypatch.undo()
+    store._closed = True
+    assert file_path.with_suffix(".wal").stat().st_size > 0
+
+    # 快照已包含的日志记录不会重复应用
+    store = JSONDataStore(file_path, config=config)
+    assert store.get_items() == [{"id": 1, "n": 1}, {"id": 2, "title": "a"}]
+    store.add_item({"title": "b"})
+    store.close()
+
+    store = JSONDataStore(file_path, config=config)
+    assert ids(store) == [1, 2, 3]
+    store.close()
+
+
+def test_bulk_atomic_rollback(tmp_path):
+    config = make_config(tmp_path)
+    file_path = tmp_path / "posts.json"
+    file_path.write_text(json.dumps([{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]), encoding="utf-8")
+    store = JSONDataStore(file_path, config=config, indexes=["title"])
+    before = file_path.read_bytes()
+
+    applied, results = store.bulk([
+        {"op": "insert", "item": {"title": "c"}},
+        {"op": "patch", "id": 1, "item": {"title": "A"}},
+        {"op": "delete", "id": 2},
+        {"op": "update", "id": 99, "item": {"title": "x"}},
+        {"op": "insert", "item": {"title": "d"}},
+    ], atomic=True)
+    assert not applied
+    assert [result["status"] for result in results] == [424, 424, 424, 404, 424]
+    # 内存数据、索引与 ID 计数器都恢复原状，文件未被改写
+    assert store.get_items() == [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]
+    assert [item["id"] for item in store.query(filters={"title": "a"})] == [1]
+    assert store.query(filters={"title": "A"}) == []
+    assert file_path.read_bytes() == before
+    assert store.add_item({"title": "e"})["id"] == 3
+
+    # 非原子模式：成功的操作生效
+    applied, results = store.bulk([
+        {"op": "delete", "id": 99},
+        {"op": "patch", "id": 1, "item": {"title": "A"}},
+    ])
+    assert applied
+    assert [result["status"] for result in results] == [404, 200]
+    store.close()
+
+    store = JSONDataStore(file_path, config=config)
+    assert store.get_items() == [{"id": 1, "title": "A"}, {"id": 2, "title": "b"}, {"id": 3, "title": "e"}]
+    store.close()
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_paging_is_stable_under_inserts(tmp_path, order):
+    config = make_config(tmp_path)
+    file_path = tmp_path / "posts.json"
+    file_path.write_text(json.dumps([{"id": n, "rank": n * 10} for n in range(1, 11)]), encoding="utf-8")
+    store = JSONDataStore(file_path, config=config)
+
+    seen, cursor, page = [], None, 0
+    while True:
+        total, items, cursor = store.query_cursor(sort="rank", order=order, limit=3, cursor=cursor)
+        seen.extend(item["id"] for item in items)
+        if cursor is None:
+            break
+        # 翻页之间在两端各插入一条，以及一条与游标条目排序键相同的
+        page += 1
+        for rank in (page, items[-1]["rank"], 1000 + page):
+            store.add_item({"rank": rank})
+
+    original = list(range(1, 11))
+    assert len(seen) == len(set(seen))
+    assert [n for n in seen if n <= 10] == (original if order == "asc" else original[::-1])
+    ranks = [store.get_item(n)["rank"] for n in seen]
+    assert ranks == sorted(ranks, reverse=(order == "desc"))
+    store.close()
+
+
+@pytest.mark.parametrize("wal", [False, True])
+def test_object_file_collections_share_one_writer(tmp_path, wal):
+    config = make_config(tmp_path, wal)
+    file_path = tmp_path / "db.json"
+    file_path.write_text(json.dumps({"posts": [{"id": 1}], "tags": [], "meta": {"v": 1}}), encoding="utf-8")
+
+    shared = ObjectFile(file_path, config, batch_writes=True)
+    posts, tags = shared.store("posts"), shared.store("tags")
+    assert posts.writer is tags.writer is shared.writer
+    assert posts.lock is tags.lock
+    assert posts.wal is tags.wal is shared.wal
+
+    posts.add_item({"title": "a"})
+    tags.add_item({"name": "t"})
+    posts.durable().result(timeout=5)
+    tags.durable().result(timeout=5)
+    shared.close()
+
+    root = json.loads(file_path.read_text(encoding="utf-8"))
+    assert root["posts"] == [{"id": 1}, {"id": 2, "title": "a"}]
+    assert root["tags"] == [{"id": 1, "name": "t"}]
+    assert root["meta"] == {"v": 1}
+
+    shared = ObjectFile(file_path, config)
+    posts, tags = shared.store("posts"), shared.store("tags")
+    assert posts.add_item({})["id"] == 3
+    assert tags.add_item({})["id"] == 2
+    shared.close()
+
+
+def test_mmap_mode_reads_then_loads_on_write(tmp_path):
+    config = make_config(tmp_path)
+    file_path = tmp_path / "posts.json"
+    file_path.write_text(json.dumps({"primary_key": "id", "data": [{"id": "p1"}, {"id": "p2", "t": "x"}]}),
+                         encoding="utf-8")
+    store = JSONDataStore(file_path, config=config, mmap_mode=True)
+    assert store.get_item("p2") == {"id": "p2", "t": "x"}
+    assert store._mapped is not None and store._cache is None
+    store.add_item({"id": "p3"})
+    assert store._mapped is None
+    assert ids(store) == ["p1", "p2", "p3"]
+    store.close()
+    assert json.loads(file_path.read_text(encoding="utf-8"))["data"][-1] == {"id": "p3"}
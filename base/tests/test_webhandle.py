@@ -0,0 +1,47 @@
+"""
+web/ 模块加载：不同路径的模块名互不冲突，各自缓存
+
+运行（在 base/ 目录下）:
+    python -m pytest -q tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from module.config import Config
+from module.webhandle import WebHandle
+
+
+@pytest.fixture
+def handle(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("webhandle:\n  max_workers: 1\n", encoding="utf-8")
+    handle = WebHandle(FastAPI(), Config(str(config_file)))
+    handle.web_dir = tmp_path / "web"
+    yield handle
+    handle.clear_module_cache()
+    handle.shutdown()
+
+
+def test_module_names_do_not_collide(handle):
+    files = ["a/b_c.py", "a_b/c.py", "a_/b.py", "a/_b.py", "a__b.py"]
+    for relative in files:
+        path = handle.web_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"NAME = {relative!r}\n", encoding="utf-8")
+
+    names = {handle._module_name(handle.web_dir / relative) for relative in files}
+    assert len(names) == len(files)
+    assert handle._module_name(Path("/elsewhere/a.py")) != handle._module_name(handle.web_dir / "a.py")
+
+    modules = [handle.load_module(Path(relative)) for relative in files]
+    for relative, module in zip(files, modules):
+        assert module.NAME == relative
+        assert sys.modules[module.__name__] is module
+        # 加载其他模块后仍命中缓存
+        assert handle.load_module(Path(relative)) is module
@@ -5,12 +5,13 @@ import urllib.parse
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse, RedirectResponse
 
-from module.config import Config
-from module.logger import setup_logger
+import logging
 
-# 初始化配置和日志
-config = Config()
-logger = setup_logger(config)
+from module.webhandle import webhandle
+
+# 复用应用的配置与日志（不在导入时新建 Config 和日志处理器）
+config = webhandle.config
+logger = logging.getLogger("baseplatform.oauth2")
 
 async def GET(request: Request):
     """
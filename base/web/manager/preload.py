@@ -0,0 +1,22 @@
+"""
+web 模块预加载报告 API
+处理 /api/manager/preload 请求
+"""
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from module.webhandle import webhandle
+
+
+async def handle(request: Request):
+    """返回启动预加载报告（各模块导入耗时、内存、失败原因）"""
+    if request.method != "GET":
+        return JSONResponse(status_code=405, content={"detail": "Method Not Allowed"})
+
+    report = webhandle.preload_report
+    if report is None:
+        return JSONResponse(
+            status_code=404,
+            content={"detail": "未执行预加载，请在 config.yaml 中开启 webhandle.preload.enabled"}
+        )
+    return JSONResponse(content=report)